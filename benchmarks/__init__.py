@@ -0,0 +1 @@
+"""Benchmarks da task_manager_api"""
@@ -0,0 +1,393 @@
+"""
+Teste de carga das rotas da API, com saída em JSON e comparação com um
+resultado anterior (baseline).
+
+Cria um banco SQLite com `--usuarios` usuários e `--tarefas-por-usuario`
+tarefas cada, gera os tokens com `criar_access_token` e mede, rota a rota,
+vazão e p50/p95/p99 com `--clientes` clientes concorrentes. O app pode ser
+chamado no próprio processo (ASGI, sem rede) ou via HTTP contra um uvicorn
+local.
+
+Uso:
+    python -m benchmarks.api executar --modo asgi --saida base.json
+    python -m benchmarks.api executar --modo http --baseline base.json
+    python -m benchmarks.api comparar base.json novo.json --tolerancia 0.1
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from collections import deque
+from datetime import datetime
+from typing import Awaitable, Callable, NamedTuple, Optional
+import httpx
+from sqlmodel import SQLModel, create_engine, insert
+from task_manager_api.migrations import aplicar_migracoes
+from task_manager_api.models.tarefa import Tarefa
+from task_manager_api.models.usuario import Usuario
+from task_manager_api.security import criar_hash_senha
+from task_manager_api.services.token_service import criar_access_token
+from benchmarks.comum import porta_livre, iniciar_servidor, aguardar_servidor, percentis
+
+SENHA = "senha-benchmark"
+ADMIN = "admin"
+TAMANHO_LOTE_BULK = 50
+STATUS = ["pendente", "em_progresso", "concluida"]
+PRIORIDADES = ["baixa", "media", "alta"]
+
+class Dados(NamedTuple):
+    """Dados semeados: usuários comuns têm ids 1..n_usuarios, e as tarefas
+    do usuário u têm ids contíguos."""
+
+    n_usuarios: int
+    tarefas_por_usuario: int
+    tokens: dict[int, str]
+    token_admin: str
+
+    def headers(self, usuario_id: int) -> dict:
+        return {"Authorization": f"Bearer {self.tokens[usuario_id]}"}
+
+    def tarefa_id(self, usuario_id: int, indice: int) -> int:
+        return (usuario_id - 1) * self.tarefas_por_usuario + indice % self.tarefas_por_usuario + 1
+
+def semear_banco(caminho: str, n_usuarios: int, tarefas_por_usuario: int) -> Dados:
+    """Cria o schema (com as migrações) e insere os dados em lote"""
+
+    engine = create_engine(f"sqlite:///{caminho}")
+    SQLModel.metadata.create_all(engine)
+    aplicar_migracoes(engine)
+
+    # Um único hash para todos: o custo do bcrypt fica no login, não na carga
+    senha = criar_hash_senha(SENHA)
+    agora = datetime.now()
+    usuarios = [
+        {"id": i, "username": f"usuario{i}", "nome": f"Usuário {i}", "senha": senha,
+         "email": f"usuario{i}@example.com", "is_admin": False, "data_criacao": agora}
+        for i in range(1, n_usuarios + 1)
+    ]
+    usuarios.append({
+        "id": n_usuarios + 1, "username": ADMIN, "nome": "Administrador", "senha": senha,
+        "email": "admin@example.com", "is_admin": True, "data_criacao": agora,
+    })
+    with engine.begin() as conn:
+        conn.execute(insert(Usuario), usuarios)
+        lote = []
+        for usuario_id in range(1, n_usuarios + 1):
+            for j in range(tarefas_por_usuario):
+                lote.append({
+                    "id": (usuario_id - 1) * tarefas_por_usuario + j + 1,
+                    "titulo": f"Tarefa {j}", "descricao": None,
+                    "status": STATUS[j % 3], "prioridade": PRIORIDADES[j % 3],
+                    "data_criacao": agora, "usuario_id": usuario_id,
+                })
+                if len(lote) == 10_000:
+                    conn.execute(insert(Tarefa), lote)
+                    lote = []
+        if lote:
+            conn.execute(insert(Tarefa), lote)
+    engine.dispose()
+
+    return Dados(
+        n_usuarios=n_usuarios,
+        tarefas_por_usuario=tarefas_por_usuario,
+        tokens={i: criar_access_token({"sub": f"usuario{i}"}) for i in range(1, n_usuarios + 1)},
+        token_admin=criar_access_token({"sub": ADMIN}),
+    )
+
+class Cenario(NamedTuple):
+    rota: str
+    requisicao: Callable[[httpx.AsyncClient, int], Awaitable[Optional[httpx.Response]]]
+
+def montar_cenarios(dados: Dados) -> list[Cenario]:
+    """
+    Uma requisição por rota; `i` é o número sequencial da requisição.
+    Retornar `None` encerra o cenário (sem mais trabalho disponível).
+    """
+
+    criadas: deque[tuple[int, list[int]]] = deque()
+    # Sequência global: o aquecimento também cadastra usuários
+    sequencia = itertools.count()
+    admin = {"Authorization": f"Bearer {dados.token_admin}"}
+
+    def usuario(i: int) -> int:
+        return i % dados.n_usuarios + 1
+
+    def itens_bulk(i: int) -> list[dict]:
+        return [
+            {"titulo": f"Carga {i}-{j}", "status": "pendente", "prioridade": "baixa"}
+            for j in range(TAMANHO_LOTE_BULK)
+        ]
+
+    async def token(client, i):
+        return await client.post("/token", data={"username": f"usuario{usuario(i)}", "password": SENHA})
+
+    async def listar_tarefas(client, i):
+        return await client.get("/tarefas", params={"limite": 50}, headers=dados.headers(usuario(i)))
+
+    async def obter_tarefa(client, i):
+        u = usuario(i)
+        return await client.get(f"/tarefas/{dados.tarefa_id(u, i)}", headers=dados.headers(u))
+
+    async def listar_usuarios(client, i):
+        return await client.get("/usuarios", headers=admin)
+
+    async def cadastrar_usuario(client, i):
+        n = next(sequencia)
+        return await client.post("/usuarios", json={
+            "username": f"cadastro{n}", "nome": f"Cadastro {n}",
+            "senha": SENHA, "email": f"cadastro{n}@example.com",
+        })
+
+    async def atualizar_usuario(client, i):
+        u = usuario(i)
+        return await client.patch(
+            f"/usuarios/{u}",
+            json={"username": f"usuario{u}", "email": f"usuario{u}.{next(sequencia)}@example.com"},
+            headers=dados.headers(u)
+        )
+
+    async def criar_em_lote(client, i):
+        u = usuario(i)
+        r = await client.post("/tarefas/bulk", json={"itens": itens_bulk(i)}, headers=dados.headers(u))
+        if r.status_code == 200:
+            criadas.append((u, [item["id"] for item in r.json()["resultados"] if item["id"]]))
+        return r
+
+    async def atualizar_em_lote(client, i):
+        u = usuario(i)
+        itens = [
+            {"id": dados.tarefa_id(u, i * TAMANHO_LOTE_BULK + j), "status": STATUS[i % 3]}
+            for j in range(min(TAMANHO_LOTE_BULK, dados.tarefas_por_usuario))
+        ]
+        return await client.patch("/tarefas/bulk", json={"itens": itens}, headers=dados.headers(u))
+
+    async def deletar_em_lote(client, i):
+        # Remove as tarefas criadas pelo cenário de POST, sem tocar nas semeadas
+        if not criadas:
+            return None
+        u, ids = criadas.popleft()
+        return await client.request("DELETE", "/tarefas/bulk", json={"ids": ids}, headers=dados.headers(u))
+
+    return [
+        Cenario("POST /token", token),
+        Cenario("GET /tarefas", listar_tarefas),
+        Cenario("GET /tarefas/{id}", obter_tarefa),
+        Cenario("GET /usuarios", listar_usuarios),
+        Cenario("POST /usuarios", cadastrar_usuario),
+        Cenario("PATCH /usuarios/{id}", atualizar_usuario),
+        Cenario("POST /tarefas/bulk", criar_em_lote),
+        Cenario("PATCH /tarefas/bulk", atualizar_em_lote),
+        Cenario("DELETE /tarefas/bulk", deletar_em_lote),
+    ]
+
+async def medir_cenario(client: httpx.AsyncClient, cenario: Cenario, clientes: int, duracao: float) -> dict:
+    latencias: list[float] = []
+    erros = 0
+    contador = 0
+    fim = time.monotonic() + duracao
+
+    async def cliente():
+        nonlocal erros, contador
+        while time.monotonic() < fim:
+            i = contador
+            contador += 1
+            inicio = time.perf_counter()
+            r = await cenario.requisicao(client, i)
+            if r is None:
+                return
+            latencias.append((time.perf_counter() - inicio) * 1000)
+            if r.status_code >= 400:
+                erros += 1
+
+    inicio = time.monotonic()
+    await asyncio.gather(*(cliente() for _ in range(clientes)))
+    decorrido = time.monotonic() - inicio
+
+    return {
+        "requisicoes": len(latencias),
+        "erros": erros,
+        "req/s": len(latencias) / decorrido if decorrido else 0.0,
+        "media": sum(latencias) / len(latencias) if latencias else 0.0,
+        **percentis(latencias),
+    }
+
+async def executar_cenarios(client: httpx.AsyncClient, dados: Dados, args) -> dict:
+    cenarios = montar_cenarios(dados)
+    if args.rotas:
+        cenarios = [c for c in cenarios if c.rota in args.rotas]
+    resultados = {}
+    for cenario in cenarios:
+        # Aquecimento: conexões, caches e código JIT do pydantic
+        for i in range(min(args.clientes, 10)):
+            await cenario.requisicao(client, i)
+        resultados[cenario.rota] = await medir_cenario(client, cenario, args.clientes, args.duracao)
+        print(f"  {formatar_linha(cenario.rota, resultados[cenario.rota])}", file=sys.stderr)
+    return resultados
+
+async def executar_asgi(diretorio: str, dados: Dados, args) -> dict:
+    """Chama o app no próprio processo, sem rede (httpx.ASGITransport)"""
+
+    # O engine do app é criado na importação de `task_manager_api.database`,
+    # com "database.db" relativo ao diretório atual; por isso o app só é
+    # importado aqui, depois do chdir
+    os.chdir(diretorio)
+    from task_manager_api.app import app
+    from task_manager_api.limite_requisicoes import limitador
+
+    # Todos os clientes vêm do mesmo IP: o limite de /token mediria só o 429
+    limitador.ativo = False
+
+    if args.bcrypt_rounds:
+        from task_manager_api.security import get_pwd_context
+        get_pwd_context().update(bcrypt__rounds=args.bcrypt_rounds)
+
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://asgi", timeout=60) as client:
+        return await executar_cenarios(client, dados, args)
+
+async def executar_http(url: str, dados: Dados, args) -> dict:
+    await aguardar_servidor(url)
+    limites = httpx.Limits(max_connections=args.clientes)
+    async with httpx.AsyncClient(base_url=url, limits=limites, timeout=60) as client:
+        return await executar_cenarios(client, dados, args)
+
+def executar(args) -> dict:
+    diretorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory() as diretorio:
+        print(
+            f"Semeando {args.usuarios} usuários x {args.tarefas_por_usuario} tarefas...",
+            file=sys.stderr
+        )
+        dados = semear_banco(os.path.join(diretorio, "database.db"), args.usuarios, args.tarefas_por_usuario)
+
+        print(f"Modo {args.modo}, {args.clientes} clientes, {args.duracao:.0f}s por rota", file=sys.stderr)
+        if args.modo == "asgi":
+            try:
+                rotas = asyncio.run(executar_asgi(diretorio, dados, args))
+            finally:
+                os.chdir(diretorio_original)
+        else:
+            porta = porta_livre()
+            servidor = iniciar_servidor(porta, diretorio, {"LIMITES_REQUISICOES_ATIVOS": False})
+            try:
+                rotas = asyncio.run(executar_http(f"http://127.0.0.1:{porta}", dados, args))
+            finally:
+                servidor.terminate()
+                servidor.wait()
+
+    return {
+        "parametros": {
+            "modo": args.modo,
+            "usuarios": args.usuarios,
+            "tarefas_por_usuario": args.tarefas_por_usuario,
+            "clientes": args.clientes,
+            "duracao": args.duracao,
+            "bcrypt_rounds": args.bcrypt_rounds,
+        },
+        "ambiente": {
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "data": datetime.now().isoformat(timespec="seconds"),
+        },
+        "rotas": rotas,
+    }
+
+def formatar_linha(rota: str, r: dict) -> str:
+    return (
+        f"{rota:<22} {r['req/s']:8.1f} req/s   p50 {r['p50']:7.1f} ms"
+        f"   p95 {r['p95']:7.1f} ms   p99 {r['p99']:7.1f} ms   {r['erros']} erros"
+    )
+
+def comparar(base: dict, novo: dict, tolerancia: float) -> list[str]:
+    """
+    Compara rota a rota e retorna as regressões: vazão menor ou p50/p95/p99
+    maiores que a baseline em mais de `tolerancia` (fração).
+    """
+
+    regressoes = []
+    if base.get("parametros") != novo.get("parametros"):
+        print(f"Atenção: parâmetros diferentes da baseline ({base.get('parametros')})\n")
+    print(f"{'rota':<22} {'métrica':<7} {'baseline':>10} {'atual':>10} {'variação':>9}")
+    for rota, atual in novo["rotas"].items():
+        anterior = base["rotas"].get(rota)
+        if anterior is None:
+            print(f"{rota:<22} (sem baseline)")
+            continue
+        for metrica in ("req/s", "p50", "p95", "p99"):
+            if not anterior[metrica]:
+                continue
+            variacao = (atual[metrica] - anterior[metrica]) / anterior[metrica]
+            # Para a vazão, piorar é diminuir; para as latências, é aumentar
+            piorou = -variacao if metrica == "req/s" else variacao
+            marca = ""
+            if piorou > tolerancia:
+                marca = "  REGRESSÃO"
+                regressoes.append(f"{rota} {metrica}: {anterior[metrica]:.1f} -> {atual[metrica]:.1f}")
+            print(
+                f"{rota:<22} {metrica:<7} {anterior[metrica]:10.1f} {atual[metrica]:10.1f}"
+                f" {variacao:+8.1%}{marca}"
+            )
+    return regressoes
+
+def carregar(caminho: str) -> dict:
+    with open(caminho, encoding="utf-8") as arquivo:
+        return json.load(arquivo)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    p_executar = subparsers.add_parser("executar", help="executa o teste de carga")
+    p_executar.add_argument("--modo", choices=["asgi", "http"], default="asgi")
+    p_executar.add_argument("--usuarios", type=int, default=100)
+    p_executar.add_argument("--tarefas-por-usuario", type=int, default=200)
+    p_executar.add_argument("--clientes", type=int, default=20)
+    p_executar.add_argument("--duracao", type=float, default=5, help="segundos por rota")
+    p_executar.add_argument("--rotas", nargs="+", help='ex.: "GET /tarefas" "POST /token"')
+    p_executar.add_argument(
+        "--bcrypt-rounds", type=int,
+        help="custo do bcrypt para novos hashes (apenas --modo asgi); valores baixos isolam o restante do cadastro"
+    )
+    p_executar.add_argument("--saida", help="arquivo JSON de saída (padrão: stdout)")
+    p_executar.add_argument("--baseline", help="JSON de uma execução anterior para comparar")
+    p_executar.add_argument("--tolerancia", type=float, default=0.10)
+
+    p_comparar = subparsers.add_parser("comparar", help="compara dois resultados JSON")
+    p_comparar.add_argument("baseline")
+    p_comparar.add_argument("atual")
+    p_comparar.add_argument("--tolerancia", type=float, default=0.10)
+
+    args = parser.parse_args()
+    if args.comando == "executar" and args.bcrypt_rounds and args.modo != "asgi":
+        parser.error("--bcrypt-rounds só é suportado com --modo asgi")
+
+    if args.comando == "comparar":
+        base, novo = carregar(args.baseline), carregar(args.atual)
+    else:
+        novo = executar(args)
+        saida = json.dumps(novo, ensure_ascii=False, indent=2)
+        if args.saida:
+            with open(args.saida, "w", encoding="utf-8") as arquivo:
+                arquivo.write(saida + "\n")
+        else:
+            print(saida)
+        if not args.baseline:
+            return
+        base = carregar(args.baseline)
+
+    regressoes = comparar(base, novo, args.tolerancia)
+    if regressoes:
+        print(f"\n{len(regressoes)} regressão(ões) acima de {args.tolerancia:.0%}:")
+        for regressao in regressoes:
+            print(f"  {regressao}")
+        sys.exit(1)
+    print("\nSem regressões.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark da busca textual de tarefas (GET /tarefas/search).
+
+Popula um banco com títulos e descrições gerados a partir de um vocabulário
+(palavras frequentes e raras), constrói o índice FTS5 pela migração e mede a
+latência de `TarefaRepository.buscar_tarefas` para termos frequentes, raros
+e combinados, comparada com a busca por LIKE nas mesmas tarefas.
+
+Uso:
+    python -m benchmarks.busca --tarefas 1000000 --usuarios 1000
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+from sqlmodel import Session, SQLModel, create_engine, select, or_
+from task_manager_api.migrations import aplicar_migracoes
+from task_manager_api.models.tarefa import Tarefa
+from task_manager_api.repositories.tarefa_repository import TarefaRepository
+from benchmarks.comum import percentis
+
+FREQUENTES = [
+    "relatório", "reunião", "cliente", "orçamento", "deploy", "revisar", "enviar",
+    "planilha", "contrato", "fatura", "backup", "servidor", "email", "teste",
+]
+RARAS = [f"projeto{i}" for i in range(5000)]
+
+CONSULTAS = {
+    "termo_frequente": ["relatorio"],
+    "dois_frequentes": ["cliente", "fatura"],
+    "termo_raro": ["projeto17"],
+    "frequente_e_raro": ["revisar", "projeto42"],
+}
+
+def _texto(rnd: random.Random, palavras: int) -> str:
+    return " ".join(
+        rnd.choice(RARAS) if rnd.random() < 0.2 else rnd.choice(FREQUENTES)
+        for _ in range(palavras)
+    )
+
+def popular_banco(caminho: str, n_usuarios: int, n_tarefas: int) -> None:
+    """Insere os dados diretamente via sqlite3 (executemany) para agilizar."""
+
+    conn = sqlite3.connect(caminho)
+    agora = datetime.now()
+    conn.executemany(
+        "INSERT INTO usuario (id, username, nome, senha, email, is_admin, data_criacao) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (
+            (i, f"usuario{i}", f"Usuário {i}", "x", f"usuario{i}@example.com", False, agora)
+            for i in range(1, n_usuarios + 1)
+        ),
+    )
+    rnd = random.Random(42)
+    conn.executemany(
+        "INSERT INTO tarefa (titulo, descricao, status, prioridade, usuario_id, data_criacao) "
+        "VALUES (?, ?, 'PENDENTE', 'MEDIA', ?, ?)",
+        (
+            (_texto(rnd, 4), _texto(rnd, 15), rnd.randint(1, n_usuarios), agora)
+            for _ in range(n_tarefas)
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+def buscar_like(session: Session, usuario_id: int, termos: list[str], limite: int) -> list[Tarefa]:
+    """A mesma busca sem o índice: LIKE em todas as tarefas do usuário."""
+
+    query = select(Tarefa).where(Tarefa.usuario_id == usuario_id)
+    for termo in termos:
+        query = query.where(or_(Tarefa.titulo.icontains(termo), Tarefa.descricao.icontains(termo)))
+    return session.exec(query.order_by(Tarefa.id.desc()).limit(limite)).all()
+
+def medir(engine, usuario_ids: list[int], limite: int) -> dict:
+    resultados = {}
+    with Session(engine) as session:
+        repositorio = TarefaRepository(session)
+        for nome, termos in CONSULTAS.items():
+            for metodo, buscar in (
+                ("fts", lambda u: repositorio.buscar_tarefas(u, termos, limite)),
+                ("like", lambda u: buscar_like(session, u, termos, limite)),
+            ):
+                tempos = []
+                for usuario_id in usuario_ids:
+                    inicio = time.perf_counter()
+                    buscar(usuario_id)
+                    tempos.append((time.perf_counter() - inicio) * 1000)
+                    session.expunge_all()
+                resultados[(nome, metodo)] = percentis(tempos)
+    return resultados
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--usuarios", type=int, default=1000)
+    parser.add_argument("--tarefas", type=int, default=1_000_000)
+    parser.add_argument("--repeticoes", type=int, default=50)
+    parser.add_argument("--limite", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "bench.db")
+        engine = create_engine(f"sqlite:///{caminho}")
+        SQLModel.metadata.create_all(engine)
+
+        inicio = time.perf_counter()
+        popular_banco(caminho, args.usuarios, args.tarefas)
+        print(f"{args.tarefas} tarefas / {args.usuarios} usuários inseridos em {time.perf_counter() - inicio:.1f}s")
+
+        inicio = time.perf_counter()
+        aplicar_migracoes(engine)
+        print(f"índice de busca construído (migrações) em {time.perf_counter() - inicio:.1f}s")
+        inicio = time.perf_counter()
+        with Session(engine) as session:
+            TarefaRepository(session).reconstruir_indice_busca()
+        print(f"índice de busca reconstruído (com optimize) em {time.perf_counter() - inicio:.1f}s")
+
+        rnd = random.Random(7)
+        usuario_ids = [rnd.randint(1, args.usuarios) for _ in range(args.repeticoes)]
+        resultados = medir(engine, usuario_ids, args.limite)
+
+        print(f"\n{'consulta':<20} {'método':<6} {'p50':>9} {'p95':>9} {'p99':>9}")
+        for (nome, metodo), valores in resultados.items():
+            print(
+                f"{nome:<20} {metodo:<6} {valores['p50']:8.2f}ms {valores['p95']:8.2f}ms {valores['p99']:8.2f}ms"
+            )
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
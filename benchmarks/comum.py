@@ -0,0 +1,55 @@
+"""Funções compartilhadas pelos benchmarks que sobem a API com uvicorn."""
+
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import Optional
+import httpx
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def iniciar_servidor(porta: int, diretorio: str, configuracoes: Optional[dict] = None) -> subprocess.Popen:
+    """
+    Sobe a API com uvicorn em um subprocesso, com `diretorio` como cwd
+    (onde fica o `database.db`). `configuracoes` sobrescreve valores de
+    `task_manager_api.config` antes da importação do app.
+    """
+    
+    codigo = "import task_manager_api.config as config;"
+    for nome, valor in (configuracoes or {}).items():
+        codigo += f"config.{nome} = {valor!r};"
+    codigo += (
+        "import uvicorn;"
+        f"uvicorn.run('task_manager_api.app:app', port={porta}, log_level='warning')"
+    )
+    env = dict(os.environ, PYTHONPATH=RAIZ)
+    return subprocess.Popen([sys.executable, "-c", codigo], cwd=diretorio, env=env)
+
+async def aguardar_servidor(url: str, timeout: float = 30) -> None:
+    limite = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=url) as client:
+        while time.monotonic() < limite:
+            try:
+                await client.get("/docs")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError("Servidor não respondeu a tempo")
+
+def percentis(latencias: list[float]) -> dict:
+    """p50/p95/p99 (ms) de uma lista de latências"""
+    
+    if len(latencias) < 2:
+        valor = latencias[0] if latencias else 0.0
+        return {"p50": valor, "p95": valor, "p99": valor}
+    quantis = statistics.quantiles(latencias, n=100)
+    return {"p50": quantis[49], "p95": quantis[94], "p99": quantis[98]}
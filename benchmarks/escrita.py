@@ -0,0 +1,86 @@
+"""
+Teste de carga de escrita: engine padrão x engine com pool e pragmas.
+
+Várias threads inserem tarefas concorrentemente através do
+`TarefaRepository.add_update_tarefa` (um commit por tarefa, como na API).
+
+Uso:
+    python -m benchmarks.escrita --threads 16 --tarefas 200
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, SQLModel, create_engine
+from task_manager_api.database import connect_args, criar_engine
+from task_manager_api.models.tarefa import Tarefa
+from task_manager_api.models.usuario import Usuario
+from task_manager_api.repositories.tarefa_repository import TarefaRepository
+
+def executar(engine, n_threads: int, n_tarefas: int) -> dict:
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        usuario = Usuario(username="carga", nome="Carga", senha="x", email="carga@example.com")
+        session.add(usuario)
+        session.commit()
+        usuario_id = usuario.id
+
+    erros = 0
+    lock = threading.Lock()
+
+    def escritor(numero: int):
+        nonlocal erros
+        with Session(engine) as session:
+            repo = TarefaRepository(session)
+            for i in range(n_tarefas):
+                try:
+                    repo.add_update_tarefa(Tarefa(
+                        titulo=f"Tarefa {numero}-{i}",
+                        status="pendente",
+                        prioridade="media",
+                        usuario_id=usuario_id,
+                    ))
+                except OperationalError:
+                    session.rollback()
+                    with lock:
+                        erros += 1
+
+    threads = [threading.Thread(target=escritor, args=(n,)) for n in range(n_threads)]
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duracao = time.perf_counter() - inicio
+
+    total = n_threads * n_tarefas
+    engine.dispose()
+    return {"escritas/s": (total - erros) / duracao, "erros": erros, "duracao": duracao}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--tarefas", type=int, default=200, help="tarefas por thread")
+    args = parser.parse_args()
+
+    configuracoes = {
+        # configuração anterior: apenas check_same_thread=False
+        "padrao": lambda url: create_engine(url, connect_args=connect_args),
+        "pool + pragmas": lambda url: criar_engine(url),
+    }
+    print(f"{args.threads} threads x {args.tarefas} tarefas (um commit por tarefa)")
+    for nome, fabrica in configuracoes.items():
+        with tempfile.TemporaryDirectory() as diretorio:
+            url = f"sqlite:///{os.path.join(diretorio, 'carga.db')}"
+            resultado = executar(fabrica(url), args.threads, args.tarefas)
+        print(
+            f"  {nome:<16} {resultado['escritas/s']:8.0f} escritas/s"
+            f"   {resultado['erros']:4d} erros 'database is locked'"
+            f"   ({resultado['duracao']:.1f}s)"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark de GET /tarefas/events (SSE) com muitas conexões ociosas.
+
+Sobe a API com uvicorn, abre `--conexoes` streams distribuídos entre
+`--usuarios` usuários e mede a memória do servidor (RSS) antes e depois, o
+uso de CPU do servidor com as conexões ociosas (só heartbeats) e a latência
+entre o POST /tarefas de um usuário e a chegada do evento em todas as
+conexões dele.
+
+Uso:
+    python -m benchmarks.eventos --conexoes 2000 --usuarios 100
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import httpx
+from benchmarks.api import semear_banco
+from benchmarks.comum import porta_livre, iniciar_servidor, aguardar_servidor, percentis
+
+def rss_mib(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as arquivo:
+        for linha in arquivo:
+            if linha.startswith("VmRSS:"):
+                return int(linha.split()[1]) / 1024
+    return 0.0
+
+def cpu_segundos(pid: int) -> float:
+    with open(f"/proc/{pid}/stat") as arquivo:
+        campos = arquivo.read().rsplit(")", 1)[1].split()
+    # utime e stime, em ticks
+    return (int(campos[11]) + int(campos[12])) / os.sysconf("SC_CLK_TCK")
+
+async def medir(url: str, pid: int, tokens: dict[int, str], args) -> dict:
+    await aguardar_servidor(url)
+    limites = httpx.Limits(max_connections=args.conexoes + 10, max_keepalive_connections=args.conexoes + 10)
+    usuarios = list(tokens)[:args.usuarios]
+    recebidos: dict[int, list[asyncio.Event]] = {u: [] for u in usuarios}
+    prontas = 0
+
+    async with httpx.AsyncClient(base_url=url, limits=limites, timeout=None) as client:
+        rss_antes = rss_mib(pid)
+
+        async def conexao(n: int, pronta: asyncio.Event):
+            nonlocal prontas
+            u = usuarios[n % len(usuarios)]
+            headers = {"Authorization": f"Bearer {tokens[u]}"}
+            async with client.stream("GET", "/tarefas/events", headers=headers) as resposta:
+                linhas = resposta.aiter_lines()
+                await anext(linhas)  # retry
+                prontas += 1
+                pronta.set()
+                async for linha in linhas:
+                    if linha.startswith("event: criada"):
+                        for evento in recebidos[u]:
+                            evento.set()
+
+        inicio = time.perf_counter()
+        sinais = [asyncio.Event() for _ in range(args.conexoes)]
+        tarefas = [asyncio.create_task(conexao(n, sinal)) for n, sinal in enumerate(sinais)]
+        await asyncio.wait_for(asyncio.gather(*(sinal.wait() for sinal in sinais)), 300)
+        abertura = time.perf_counter() - inicio
+        rss_depois = rss_mib(pid)
+
+        # Conexões ociosas: CPU do servidor só com heartbeats
+        cpu_inicio = cpu_segundos(pid)
+        await asyncio.sleep(args.ocioso)
+        cpu_ocioso = (cpu_segundos(pid) - cpu_inicio) / args.ocioso
+
+        conexoes_por_usuario = args.conexoes // len(usuarios)
+        latencias = []
+        for i in range(args.publicacoes):
+            u = usuarios[i % len(usuarios)]
+            eventos = [asyncio.Event() for _ in range(conexoes_por_usuario)]
+            recebidos[u] = eventos
+            inicio = time.perf_counter()
+            await client.post(
+                "/tarefas",
+                json={"titulo": f"Evento {i}", "status": "pendente", "prioridade": "baixa"},
+                headers={"Authorization": f"Bearer {tokens[u]}"}
+            )
+            await asyncio.wait_for(asyncio.gather(*(evento.wait() for evento in eventos)), 30)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+            recebidos[u] = []
+
+        for tarefa in tarefas:
+            tarefa.cancel()
+        await asyncio.gather(*tarefas, return_exceptions=True)
+
+    return {
+        "conexoes": prontas,
+        "abertura (s)": abertura,
+        "rss antes (MiB)": rss_antes,
+        "rss depois (MiB)": rss_depois,
+        "KiB por conexão": (rss_depois - rss_antes) * 1024 / max(prontas, 1),
+        "cpu ocioso (%)": cpu_ocioso * 100,
+        "POST -> evento em todas as conexões": percentis(latencias),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conexoes", type=int, default=2000)
+    parser.add_argument("--usuarios", type=int, default=100)
+    parser.add_argument("--publicacoes", type=int, default=100)
+    parser.add_argument("--ocioso", type=float, default=10, help="segundos medindo a CPU ociosa")
+    parser.add_argument("--heartbeat", type=float, default=15)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        dados = semear_banco(os.path.join(diretorio, "database.db"), args.usuarios, 1)
+        porta = porta_livre()
+        servidor = iniciar_servidor(porta, diretorio, {"EVENTOS_HEARTBEAT_SEGUNDOS": args.heartbeat})
+        try:
+            resultados = asyncio.run(medir(f"http://127.0.0.1:{porta}", servidor.pid, dados.tokens, args))
+        finally:
+            servidor.terminate()
+            servidor.wait()
+
+    for nome, valor in resultados.items():
+        if isinstance(valor, dict):
+            print(f"{nome:<40} p50 {valor['p50']:.2f}ms p95 {valor['p95']:.2f}ms p99 {valor['p99']:.2f}ms")
+        else:
+            print(f"{nome:<40} {valor:.2f}", file=sys.stdout)
+
+if __name__ == "__main__":
+    main()
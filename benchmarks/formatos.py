@@ -0,0 +1,46 @@
+"""
+Microbenchmark dos formatos negociados das listagens de tarefas: tamanho do
+corpo e tempo de codificação (serialização + compressão) de cada formato
+(JSON, MessagePack, JSON colunar) sem compressão, com gzip e com brotli.
+
+O tamanho é comparado com o do JSON sem compressão, o corpo de sempre.
+
+Uso:
+    python -m benchmarks.formatos --linhas 50 500 5000 --repeticoes 20
+"""
+
+import argparse
+from benchmarks.serializacao import gerar_tarefas, medir
+from task_manager_api.formatos import FORMATOS, comprimir
+from task_manager_api.serializacao import LISTA_TAREFAS
+
+CODIFICACOES = (None, "gzip", "br")
+
+def codificador(formato, codificacao):
+    def codificar(tarefas) -> bytes:
+        corpo = LISTA_TAREFAS.renderizar_formato(tarefas, formato, proximo_cursor=None)
+        return comprimir(corpo, codificacao).corpo
+    return codificar
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'linhas':>6} {'formato':<8} {'compressão':<10} {'bytes':>10} {'% do JSON':>10} {'codificação':>12}")
+    for n in args.linhas:
+        tarefas = gerar_tarefas(n)
+        referencia = len(codificador(FORMATOS[0], None)(tarefas))
+        for formato in FORMATOS:
+            for codificacao in CODIFICACOES:
+                codificar = codificador(formato, codificacao)
+                tamanho = len(codificar(tarefas))
+                tempo = medir(codificar, tarefas, args.repeticoes)
+                print(
+                    f"{n:>6} {formato.nome:<8} {codificacao or '-':<10} {tamanho:>10} "
+                    f"{tamanho / referencia * 100:9.1f}% {tempo:10.2f}ms"
+                )
+
+if __name__ == "__main__":
+    main()
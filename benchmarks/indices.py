@@ -0,0 +1,160 @@
+"""
+Benchmark dos índices de tarefa/usuario.
+
+Simula um banco antigo (sem os índices), mede plano de execução e latência
+das consultas mais comuns, aplica as migrações e mede novamente.
+
+Uso:
+    python -m benchmarks.indices --tarefas 1000000 --usuarios 1000
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import delete, func
+from sqlmodel import Session, SQLModel, create_engine, select
+from task_manager_api.migrations import aplicar_migracoes, versao_schema
+from task_manager_api.models.tarefa import Tarefa
+from task_manager_api.models.usuario import Usuario
+from task_manager_api.pagination import OrdenarPorEnum, OrdemEnum
+from task_manager_api.repositories.tarefa_repository import TarefaRepository
+from task_manager_api.repositories.usuario_repository import UsuarioRepository
+
+STATUS = ["pendente", "em_progresso", "concluida"]
+PRIORIDADES = ["baixa", "media", "alta"]
+
+def popular_banco(caminho: str, n_usuarios: int, n_tarefas: int) -> None:
+    """Insere os dados diretamente via sqlite3 (executemany) para agilizar."""
+    
+    conn = sqlite3.connect(caminho)
+    agora = datetime.now()
+    conn.executemany(
+        "INSERT INTO usuario (id, username, nome, senha, email, is_admin, data_criacao) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (
+            (i, f"usuario{i}", f"Usuário {i}", "x", f"usuario{i}@example.com", i % 100 == 0, agora)
+            for i in range(1, n_usuarios + 1)
+        ),
+    )
+    rnd = random.Random(42)
+    conn.executemany(
+        "INSERT INTO tarefa (titulo, descricao, status, prioridade, usuario_id, data_criacao) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (
+            (
+                f"Tarefa {i}",
+                None,
+                rnd.choice(STATUS).upper(),
+                rnd.choice(PRIORIDADES).upper(),
+                rnd.randint(1, n_usuarios),
+                (agora - timedelta(seconds=rnd.randint(0, 10_000_000))).isoformat(sep=" "),
+            )
+            for i in range(n_tarefas)
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+def remover_indices(engine) -> None:
+    """Deixa o banco como estava antes da migração de índices."""
+    
+    with engine.begin() as conn:
+        for tabela in (Tarefa.__table__, Usuario.__table__):
+            for indice in tabela.indexes:
+                if indice.name.startswith("ix_tarefa_usuario_id") or indice.name == "ix_usuario_admins":
+                    indice.drop(conn, checkfirst=True)
+        conn.execute(delete(versao_schema))
+
+def consultas(session: Session, usuario_id: int) -> dict:
+    tarefas = TarefaRepository(session)
+    usuarios = UsuarioRepository(session)
+    return {
+        "listar_por_usuario": lambda: tarefas.get_tarefas_por_usuario_id(usuario_id),
+        "pagina_por_id": lambda: tarefas.get_tarefas_paginadas(usuario_id, 50),
+        "pagina_por_data_desc": lambda: tarefas.get_tarefas_paginadas(
+            usuario_id, 50, ordenar_por=OrdenarPorEnum.DATA_CRIACAO, ordem=OrdemEnum.DESC
+        ),
+        "contagem_por_status": lambda: session.exec(
+            select(Tarefa.status, func.count()).where(Tarefa.usuario_id == usuario_id).group_by(Tarefa.status)
+        ).all(),
+        "admins": lambda: usuarios.get_admins(),
+    }
+
+def planos(engine, usuario_id: int) -> dict:
+    """Retorna o EXPLAIN QUERY PLAN de cada consulta."""
+    
+    sqls = {
+        "listar_por_usuario": select(Tarefa).where(Tarefa.usuario_id == usuario_id),
+        "contagem_por_status": select(Tarefa.status, func.count())
+            .where(Tarefa.usuario_id == usuario_id).group_by(Tarefa.status),
+        "pagina_por_data_desc": select(Tarefa).where(Tarefa.usuario_id == usuario_id)
+            .order_by(Tarefa.data_criacao.desc(), Tarefa.id.desc()).limit(50),
+        "admins": select(Usuario).where(Usuario.is_admin == True),
+    }
+    resultado = {}
+    with engine.connect() as conn:
+        for nome, query in sqls.items():
+            compilado = query.compile(engine, compile_kwargs={"literal_binds": True})
+            linhas = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compilado}").all()
+            resultado[nome] = " | ".join(linha[-1] for linha in linhas)
+    return resultado
+
+def medir(engine, usuario_ids: list[int], repeticoes: int) -> dict:
+    tempos: dict[str, list[float]] = {}
+    with Session(engine) as session:
+        for usuario_id in usuario_ids[:repeticoes]:
+            for nome, consulta in consultas(session, usuario_id).items():
+                inicio = time.perf_counter()
+                consulta()
+                tempos.setdefault(nome, []).append((time.perf_counter() - inicio) * 1000)
+                session.expunge_all()
+    return {nome: statistics.median(valores) for nome, valores in tempos.items()}
+
+def imprimir(titulo: str, latencias: dict, planos_execucao: dict) -> None:
+    print(f"\n== {titulo} ==")
+    for nome, ms in latencias.items():
+        print(f"  {nome:<24} {ms:10.2f} ms (mediana)")
+    print("  planos:")
+    for nome, plano in planos_execucao.items():
+        print(f"    {nome:<22} {plano}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--usuarios", type=int, default=1000)
+    parser.add_argument("--tarefas", type=int, default=1_000_000)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "bench.db")
+        engine = create_engine(f"sqlite:///{caminho}")
+        SQLModel.metadata.create_all(engine)
+        remover_indices(engine)
+
+        inicio = time.perf_counter()
+        popular_banco(caminho, args.usuarios, args.tarefas)
+        print(f"{args.tarefas} tarefas / {args.usuarios} usuários inseridos em {time.perf_counter() - inicio:.1f}s")
+
+        usuario_ids = random.Random(7).sample(range(1, args.usuarios + 1), min(args.repeticoes, args.usuarios))
+        antes = medir(engine, usuario_ids, args.repeticoes)
+        imprimir("sem índices", antes, planos(engine, usuario_ids[0]))
+
+        inicio = time.perf_counter()
+        aplicadas = aplicar_migracoes(engine)
+        print(f"\nmigrações {aplicadas} aplicadas em {time.perf_counter() - inicio:.1f}s")
+
+        depois = medir(engine, usuario_ids, args.repeticoes)
+        imprimir("com índices", depois, planos(engine, usuario_ids[0]))
+
+        print("\n== ganho ==")
+        for nome in antes:
+            print(f"  {nome:<24} {antes[nome] / depois[nome]:8.1f}x")
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
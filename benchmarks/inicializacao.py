@@ -0,0 +1,103 @@
+"""
+Benchmark da inicialização da API: tempo de importação do app e tempo até a
+primeira resposta.
+
+A importação é medida em processos novos (`import task_manager_api.app`),
+junto com os módulos pesados que ela carrega. O tempo até a primeira
+resposta vai do início do processo do uvicorn até a resposta de um
+GET /tarefas autenticado, inicializando a API `--repeticoes` vezes sobre o
+mesmo banco em cada cenário: a primeira inicialização de um banco novo (ou
+desatualizado) cria o schema ou refaz os contadores; as seguintes não.
+
+Uso:
+    python -m benchmarks.inicializacao --repeticoes 5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import httpx
+from benchmarks.api import semear_banco
+from benchmarks.comum import RAIZ, porta_livre, iniciar_servidor
+from task_manager_api.services.token_service import criar_access_token
+
+MODULOS_PESADOS = ("passlib", "jose", "ecdsa", "rsa", "pyasn1", "dateutil")
+
+CENARIOS = {
+    "banco novo": (False, {}),
+    "create_all a cada inicialização": (True, {"SCHEMA_VERIFICAR_VERSAO": False}),
+    "versão do schema verificada": (True, {}),
+    "contadores ligados": (True, {"ESTATISTICAS_CONTADORES": True}),
+}
+
+def medir_importacao(diretorio: str) -> tuple[float, list[str]]:
+    codigo = (
+        "import sys, time;"
+        "inicio = time.perf_counter();"
+        "import task_manager_api.app;"
+        "print(time.perf_counter() - inicio);"
+        f"print(','.join(m for m in {MODULOS_PESADOS!r} if m in sys.modules))"
+    )
+    env = dict(os.environ, PYTHONPATH=RAIZ)
+    saida = subprocess.run(
+        [sys.executable, "-c", codigo], cwd=diretorio, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout.splitlines()
+    carregados = saida[1].split(",") if len(saida) > 1 and saida[1] else []
+    return float(saida[0]), carregados
+
+def medir_primeira_resposta(diretorio: str, configuracoes: dict, token: str) -> tuple[float, int]:
+    porta = porta_livre()
+    inicio = time.perf_counter()
+    servidor = iniciar_servidor(porta, diretorio, {"LIMITES_REQUISICOES_ATIVOS": False, **configuracoes})
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{porta}", headers={"Authorization": f"Bearer {token}"}) as client:
+            while True:
+                try:
+                    r = client.get("/tarefas", params={"limite": 1})
+                    return time.perf_counter() - inicio, r.status_code
+                except httpx.TransportError:
+                    if servidor.poll() is not None:
+                        raise RuntimeError("O servidor encerrou antes de responder")
+                    time.sleep(0.005)
+    finally:
+        servidor.terminate()
+        servidor.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--usuarios", type=int, default=100)
+    parser.add_argument("--tarefas-por-usuario", type=int, default=1000)
+    args = parser.parse_args()
+
+    token = criar_access_token({"sub": "admin"})
+    with tempfile.TemporaryDirectory() as diretorio:
+        importacoes = [medir_importacao(diretorio) for _ in range(args.repeticoes)]
+    tempos_importacao = [tempo * 1000 for tempo, _ in importacoes]
+    carregados = importacoes[-1][1]
+
+    resultados = {}
+    for nome, (semeado, configuracoes) in CENARIOS.items():
+        with tempfile.TemporaryDirectory() as diretorio:
+            if semeado:
+                semear_banco(os.path.join(diretorio, "database.db"), args.usuarios, args.tarefas_por_usuario)
+            medicoes = [medir_primeira_resposta(diretorio, configuracoes, token) for _ in range(args.repeticoes)]
+        resultados[nome] = medicoes
+        print(f"  {nome}: ok", file=sys.stderr)
+
+    print(f"\nimportação do app: p50 {statistics.median(tempos_importacao):.0f}ms (min {min(tempos_importacao):.0f}ms)")
+    print(f"módulos pesados carregados na importação: {', '.join(carregados) or 'nenhum'}")
+    print(f"\n{'cenário':<34} {'1ª inicialização':>17} {'seguintes (p50)':>16} {'status':>7}")
+    for nome, medicoes in resultados.items():
+        primeira = medicoes[0][0] * 1000
+        seguintes = statistics.median(tempo for tempo, _ in medicoes[1:]) * 1000 if len(medicoes) > 1 else primeira
+        status = ",".join(sorted({str(codigo) for _, codigo in medicoes}))
+        print(f"{nome:<34} {primeira:15.0f}ms {seguintes:14.0f}ms {status:>7}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Teste de carga misto: leituras (GET /tarefas e GET /tarefas/{id}) concorrentes
+com escritas em lote (POST /tarefas/bulk), com e sem o engine de leitura.
+
+Para cada configuração, sobe a API com uvicorn sobre um banco recém-semeado e
+mede latência e vazão das leituras enquanto os escritores disputam o lock de
+escrita do SQLite. Leitores e escritores usam usuários diferentes, então a
+janela de leitura das próprias escritas não interfere.
+
+Uso:
+    python -m benchmarks.leitura_escrita --leitores 32 --escritores 8 --duracao 10
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import httpx
+from benchmarks.api import Dados, semear_banco, TAMANHO_LOTE_BULK
+from benchmarks.comum import porta_livre, iniciar_servidor, aguardar_servidor, percentis
+
+CONFIGURACOES = {
+    "só engine de escrita": {"DB_LEITURA_URL": None},
+    "engine de leitura (mode=ro)": {},
+}
+
+async def medir(url: str, dados: Dados, args) -> dict:
+    leituras: list[float] = []
+    escritas: list[float] = []
+    erros = 0
+    escritores = range(1, args.escritores + 1)
+    leitores = range(args.escritores + 1, dados.n_usuarios + 1)
+    fim = time.monotonic() + args.duracao
+
+    async def ler(client: httpx.AsyncClient, n: int):
+        nonlocal erros
+        i = n
+        while time.monotonic() < fim:
+            u = leitores[i % len(leitores)]
+            inicio = time.perf_counter()
+            if i % 2:
+                r = await client.get("/tarefas", params={"limite": 50}, headers=dados.headers(u))
+            else:
+                r = await client.get(f"/tarefas/{dados.tarefa_id(u, i)}", headers=dados.headers(u))
+            leituras.append((time.perf_counter() - inicio) * 1000)
+            erros += r.status_code >= 400
+            i += args.leitores
+
+    async def escrever(client: httpx.AsyncClient, u: int):
+        nonlocal erros
+        i = 0
+        while time.monotonic() < fim:
+            itens = [
+                {"titulo": f"Carga {u}-{i}-{j}", "status": "pendente", "prioridade": "baixa"}
+                for j in range(TAMANHO_LOTE_BULK)
+            ]
+            inicio = time.perf_counter()
+            r = await client.post("/tarefas/bulk", json={"itens": itens}, headers=dados.headers(u))
+            escritas.append((time.perf_counter() - inicio) * 1000)
+            erros += r.status_code >= 400
+            i += 1
+
+    await aguardar_servidor(url)
+    limites = httpx.Limits(max_connections=args.leitores + args.escritores)
+    async with httpx.AsyncClient(base_url=url, limits=limites, timeout=60) as client:
+        inicio = time.monotonic()
+        await asyncio.gather(
+            *(ler(client, n) for n in range(args.leitores)),
+            *(escrever(client, u) for u in escritores),
+        )
+        decorrido = time.monotonic() - inicio
+
+    return {
+        "leituras/s": len(leituras) / decorrido,
+        "escritas/s": len(escritas) / decorrido,
+        "erros": erros,
+        "leitura": percentis(leituras),
+        "escrita": percentis(escritas),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--usuarios", type=int, default=100)
+    parser.add_argument("--tarefas-por-usuario", type=int, default=200)
+    parser.add_argument("--leitores", type=int, default=32)
+    parser.add_argument("--escritores", type=int, default=8)
+    parser.add_argument("--duracao", type=float, default=10)
+    args = parser.parse_args()
+
+    resultados = {}
+    for nome, configuracoes in CONFIGURACOES.items():
+        with tempfile.TemporaryDirectory() as diretorio:
+            dados = semear_banco(os.path.join(diretorio, "database.db"), args.usuarios, args.tarefas_por_usuario)
+            porta = porta_livre()
+            servidor = iniciar_servidor(porta, diretorio, {"LIMITES_REQUISICOES_ATIVOS": False, **configuracoes})
+            try:
+                resultados[nome] = asyncio.run(medir(f"http://127.0.0.1:{porta}", dados, args))
+            finally:
+                servidor.terminate()
+                servidor.wait()
+        print(f"  {nome}: ok", file=sys.stderr)
+
+    print(f"\n{'configuração':<30} {'leit/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'escr/s':>8} {'p50':>8} {'erros':>6}")
+    for nome, r in resultados.items():
+        leitura, escrita = r["leitura"], r["escrita"]
+        print(
+            f"{nome:<30} {r['leituras/s']:8.1f} {leitura['p50']:7.1f}ms {leitura['p95']:7.1f}ms "
+            f"{leitura['p99']:7.1f}ms {r['escritas/s']:8.1f} {escrita['p50']:7.1f}ms {r['erros']:6d}"
+        )
+
+if __name__ == "__main__":
+    main()
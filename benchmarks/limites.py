@@ -0,0 +1,110 @@
+"""
+Benchmark do limite de requisições de POST /token e POST /usuarios/reset-senha.
+
+Compara, no próprio processo (httpx.ASGITransport, sem rede), a latência de
+uma tentativa de login com senha errada (busca do usuário + bcrypt) com a
+de uma tentativa rejeitada pelo limite (429), e mede o custo isolado de
+`limitador.verificar` por chamada.
+
+Uso:
+    python -m benchmarks.limites --requisicoes 200
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import httpx
+from sqlmodel import SQLModel, Session, create_engine
+from task_manager_api.migrations import aplicar_migracoes
+from task_manager_api.models.usuario import Usuario
+from task_manager_api.security import criar_hash_senha
+from benchmarks.comum import percentis
+
+SENHA = "senha-benchmark"
+
+def criar_banco(caminho: str) -> None:
+    engine = create_engine(f"sqlite:///{caminho}")
+    SQLModel.metadata.create_all(engine)
+    aplicar_migracoes(engine)
+    with Session(engine) as session:
+        session.add(Usuario(
+            username="alvo",
+            nome="Alvo",
+            senha=criar_hash_senha(SENHA),
+            email="alvo@example.com",
+        ))
+        session.commit()
+    engine.dispose()
+
+async def medir(client: httpx.AsyncClient, requisicao, n: int, status_esperado: int) -> dict:
+    tempos = []
+    for i in range(n):
+        inicio = time.perf_counter()
+        r = await requisicao(i)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+        assert r.status_code == status_esperado, (r.status_code, r.text)
+    return percentis(tempos)
+
+async def executar(n: int) -> dict:
+    from task_manager_api.app import app
+    from task_manager_api.limite_requisicoes import limitador, PoliticaLimite
+
+    def login(i):
+        return client.post("/token", data={"username": "alvo", "password": f"errada{i}"})
+
+    def reset(i):
+        return client.post("/usuarios/reset-senha", json={"email": "alvo@example.com"})
+
+    resultados = {}
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://asgi") as client:
+        limitador.ativo = False
+        resultados["POST /token permitida (401)"] = await medir(client, login, n, 401)
+
+        # Uma ficha por hora: depois da primeira, todas são rejeitadas
+        limitador.ativo = True
+        bloqueio = PoliticaLimite(rajada=1, por_minuto=1 / 60)
+        limitador.politicas = {
+            "token": {"ip": bloqueio, "username": bloqueio},
+            "reset_senha": {"ip": bloqueio, "email": bloqueio},
+        }
+        await login(0)
+        await reset(0)
+        resultados["POST /token rejeitada (429)"] = await medir(client, login, n, 429)
+        resultados["POST /usuarios/reset-senha rejeitada (429)"] = await medir(client, reset, n, 429)
+
+    # Custo da checagem em si (permitida), com chaves distintas
+    limitador.politicas = {"token": {"ip": PoliticaLimite(10, 10), "username": PoliticaLimite(10, 10)}}
+    chamadas = n * 100
+    inicio = time.perf_counter()
+    for i in range(chamadas):
+        await limitador.verificar("token", {"ip": f"10.0.{i % 256}.{i // 256 % 256}", "username": f"u{i}"})
+    resultados["verificar (µs por chamada)"] = (time.perf_counter() - inicio) / chamadas * 1e6
+    return resultados
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requisicoes", type=int, default=200)
+    args = parser.parse_args()
+
+    diretorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory() as diretorio:
+        criar_banco(os.path.join(diretorio, "database.db"))
+        # O engine do app usa "database.db" relativo ao diretório atual
+        os.chdir(diretorio)
+        try:
+            resultados = asyncio.run(executar(args.requisicoes))
+        finally:
+            os.chdir(diretorio_original)
+
+    print(f"\n{'cenário':<42} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for nome, valores in resultados.items():
+        if isinstance(valores, dict):
+            print(f"{nome:<42} {valores['p50']:8.2f}ms {valores['p95']:8.2f}ms {valores['p99']:8.2f}ms")
+        else:
+            print(f"{nome:<42} {valores:8.2f}")
+
+if __name__ == "__main__":
+    main()
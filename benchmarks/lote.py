@@ -0,0 +1,76 @@
+"""
+Benchmark de GET /tarefas/batch: tempo para buscar N tarefas por id com N
+chamadas a GET /tarefas/{id} (sequenciais, como um cliente que recebe os
+ids de uma notificação) x uma única chamada a GET /tarefas/batch.
+
+Uso:
+    python -m benchmarks.lote --ids 10 50 200 --repeticoes 20
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+import httpx
+from benchmarks.api import semear_banco
+from benchmarks.comum import porta_livre, iniciar_servidor, aguardar_servidor, percentis
+
+async def medir(url: str, dados, args) -> dict:
+    await aguardar_servidor(url)
+    aleatorio = random.Random(0)
+    resultados = {}
+
+    async with httpx.AsyncClient(base_url=url) as client:
+        for n in args.ids:
+            individuais, lote = [], []
+            for _ in range(args.repeticoes):
+                usuario_id = aleatorio.randint(1, dados.n_usuarios)
+                headers = dados.headers(usuario_id)
+                ids = [
+                    dados.tarefa_id(usuario_id, indice)
+                    for indice in aleatorio.sample(range(dados.tarefas_por_usuario), n)
+                ]
+
+                inicio = time.perf_counter()
+                for tarefa_id in ids:
+                    r = await client.get(f"/tarefas/{tarefa_id}", headers=headers)
+                    assert r.status_code == 200, r.text
+                individuais.append((time.perf_counter() - inicio) * 1000)
+
+                inicio = time.perf_counter()
+                r = await client.get("/tarefas/batch", params={"ids": ",".join(map(str, ids))}, headers=headers)
+                assert r.status_code == 200 and r.json()["sucessos"] == n, r.text
+                lote.append((time.perf_counter() - inicio) * 1000)
+
+            resultados[n] = (percentis(individuais), percentis(lote))
+    return resultados
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ids", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--usuarios", type=int, default=50)
+    parser.add_argument("--tarefas-por-usuario", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        dados = semear_banco(os.path.join(diretorio, "database.db"), args.usuarios, args.tarefas_por_usuario)
+        porta = porta_livre()
+        servidor = iniciar_servidor(porta, diretorio, {"LIMITES_REQUISICOES_ATIVOS": False})
+        try:
+            resultados = asyncio.run(medir(f"http://127.0.0.1:{porta}", dados, args))
+        finally:
+            servidor.terminate()
+            servidor.wait()
+
+    for n, (individuais, lote) in resultados.items():
+        print(
+            f"{n:>4} ids   GET /tarefas/{{id}} x{n}: p50 {individuais['p50']:8.2f}ms p95 {individuais['p95']:8.2f}ms"
+            f"   GET /tarefas/batch: p50 {lote['p50']:6.2f}ms p95 {lote['p95']:6.2f}ms"
+            f"   {individuais['p50'] / lote['p50']:5.1f}x"
+        )
+
+if __name__ == "__main__":
+    main()
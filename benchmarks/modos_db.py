@@ -0,0 +1,93 @@
+"""
+Benchmark comparando os modos síncrono e assíncrono do banco (DB_MODO_ASYNC).
+
+Para cada modo, sobe a API com uvicorn em um diretório temporário (com o
+admin semeado), cria tarefas e dispara clientes HTTP concorrentes contra
+as rotas de tarefas.
+
+Uso:
+    python -m benchmarks.modos_db --clientes 50 --duracao 10
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import httpx
+from task_manager_api.services.token_service import criar_access_token
+from benchmarks.api import semear_banco
+from benchmarks.comum import porta_livre, iniciar_servidor, aguardar_servidor, percentis
+
+async def executar_carga(url: str, clientes: int, duracao: float, n_tarefas: int) -> dict:
+    headers = {"Authorization": f"Bearer {criar_access_token({'sub': 'admin'})}"}
+    limites = httpx.Limits(max_connections=clientes)
+    async with httpx.AsyncClient(base_url=url, headers=headers, limits=limites, timeout=30) as client:
+        ids = []
+        for i in range(n_tarefas):
+            r = await client.post("/tarefas", json={"titulo": f"Tarefa {i}", "status": "pendente", "prioridade": "media"})
+            ids.append(r.json()["id"])
+
+        cenarios = [
+            ("GET /tarefas", lambda i: client.get("/tarefas", params={"limite": 50})),
+            ("GET /tarefas/{id}", lambda i: client.get(f"/tarefas/{ids[i % len(ids)]}")),
+            ("POST /tarefas", lambda i: client.post(
+                "/tarefas", json={"titulo": f"Carga {i}", "status": "pendente", "prioridade": "baixa"}
+            )),
+        ]
+        latencias: dict[str, list[float]] = {nome: [] for nome, _ in cenarios}
+        erros = 0
+        fim = time.monotonic() + duracao
+
+        async def cliente(numero: int):
+            nonlocal erros
+            i = numero
+            while time.monotonic() < fim:
+                nome, requisicao = cenarios[i % len(cenarios)]
+                inicio = time.perf_counter()
+                r = await requisicao(i)
+                latencias[nome].append((time.perf_counter() - inicio) * 1000)
+                if r.status_code >= 400:
+                    erros += 1
+                i += 1
+
+        await asyncio.gather(*(cliente(n) for n in range(clientes)))
+
+    total = sum(len(v) for v in latencias.values())
+    resultado = {"req/s": total / duracao, "erros": erros, "rotas": {}}
+    for nome, valores in latencias.items():
+        resultado["rotas"][nome] = percentis(valores)
+    return resultado
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clientes", type=int, default=50)
+    parser.add_argument("--duracao", type=float, default=10)
+    parser.add_argument("--tarefas", type=int, default=200)
+    args = parser.parse_args()
+
+    resultados = {}
+    for modo_async in (False, True):
+        nome_modo = "async" if modo_async else "sync"
+        with tempfile.TemporaryDirectory() as diretorio:
+            semear_banco(os.path.join(diretorio, "database.db"), 0, 0)
+            porta = porta_livre()
+            url = f"http://127.0.0.1:{porta}"
+            servidor = iniciar_servidor(porta, diretorio, {"DB_MODO_ASYNC": modo_async})
+            try:
+                asyncio.run(aguardar_servidor(url))
+                resultados[nome_modo] = asyncio.run(
+                    executar_carga(url, args.clientes, args.duracao, args.tarefas)
+                )
+            finally:
+                servidor.terminate()
+                servidor.wait()
+
+    print(f"\n{args.clientes} clientes concorrentes, {args.duracao:.0f}s por modo")
+    for nome_modo, resultado in resultados.items():
+        print(f"\n== {nome_modo}: {resultado['req/s']:.0f} req/s, {resultado['erros']} erros ==")
+        for rota, q in resultado["rotas"].items():
+            print(f"  {rota:<20} p50 {q['p50']:7.1f} ms   p95 {q['p95']:7.1f} ms   p99 {q['p99']:7.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Microbenchmark da serialização das listagens: caminho padrão do FastAPI
+(`response_model` + `JSONResponse`) x `task_manager_api.serializacao`.
+
+Antes de medir, confere que as duas saídas são idênticas byte a byte.
+
+Uso:
+    python -m benchmarks.serializacao --linhas 1000 10000 --repeticoes 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from task_manager_api.models.tarefa import Tarefa
+from task_manager_api.models.usuario import Usuario
+from task_manager_api.serializacao import LISTA_TAREFAS, LISTA_USUARIOS
+from task_manager_api.serializers.tarefa_serializer import TarefaResponse
+from task_manager_api.serializers.usuario_serializer import UsuarioAdminResponse
+
+# textos com acentos, aspas, barras e caracteres de controle
+TEXTOS = ["Tarefa", "Revisão — ação", 'aspas "duplas"', "barra \\ e /", "linha\nnova\t\x01", "emoji 🚀", " "]
+
+def gerar_tarefas(n: int) -> list[Tarefa]:
+    base = datetime(2024, 1, 1)
+    return [
+        Tarefa(
+            id=i,
+            titulo=f"{TEXTOS[i % len(TEXTOS)]} {i}",
+            descricao=None if i % 3 else TEXTOS[(i + 1) % len(TEXTOS)],
+            status="pendente",
+            prioridade="media",
+            usuario_id=i % 50 + 1,
+            data_criacao=base + timedelta(seconds=i, microseconds=(i * 7) % 1_000_000 if i % 5 else 0),
+        )
+        for i in range(1, n + 1)
+    ]
+
+def gerar_usuarios(n: int) -> list[Usuario]:
+    return [
+        Usuario(
+            id=i,
+            username=f"usuario{i}",
+            nome=TEXTOS[i % len(TEXTOS)],
+            senha="x",
+            email=f"usuario{i}@example.com",
+            is_admin=i % 10 == 0,
+            data_criacao=datetime(2024, 1, 1) + timedelta(minutes=i),
+        )
+        for i in range(1, n + 1)
+    ]
+
+def caminho_padrao(tipo):
+    """Reproduz o que o FastAPI faz com um `response_model` em rota async"""
+    
+    campo = create_model_field(name="Response", type_=tipo, mode="serialization")
+    loop = asyncio.new_event_loop()
+    
+    def renderizar(dados) -> bytes:
+        conteudo = loop.run_until_complete(serialize_response(field=campo, response_content=dados))
+        return JSONResponse(conteudo).body
+    
+    return renderizar
+
+def medir(funcao, dados, repeticoes: int) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(dados)
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+
+    casos = [
+        ("tarefas", gerar_tarefas, caminho_padrao(list[TarefaResponse]), LISTA_TAREFAS.renderizar),
+        ("usuarios", gerar_usuarios, caminho_padrao(list[UsuarioAdminResponse]), LISTA_USUARIOS.renderizar),
+    ]
+    for nome, gerar, padrao, rapido in casos:
+        for n in args.linhas:
+            dados = gerar(n)
+            assert padrao(dados) == rapido(dados), f"saídas diferentes para {nome} ({n} linhas)"
+            t_padrao = medir(padrao, dados, args.repeticoes)
+            t_rapido = medir(rapido, dados, args.repeticoes)
+            print(
+                f"{nome:<9} {n:>6} linhas   padrão {t_padrao:8.2f} ms"
+                f"   rápido {t_rapido:8.2f} ms   {t_padrao / t_rapido:5.1f}x"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,37 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 from .routers import main_router
 
 from task_manager_api.database import (
     create_db_and_tables,
-    create_usuario_admin,
+    recalcular_contadores_tarefas,
+    dispose_async_engine,
+    engine,
+    engine_leitura,
 )
+from task_manager_api.metricas import instrumentar_app
+from task_manager_api.detector_consultas import instrumentar_detector
+from task_manager_api.security import executor_senhas
+from task_manager_api.envio_email import fila_emails
+from task_manager_api.eventos_tarefas import hub_eventos
+from task_manager_api.config import EMAIL_ENCERRAMENTO_TIMEOUT_SEGUNDOS
 
-def lifespan(app: FastAPI):
+@asynccontextmanager
+async def lifespan(app: FastAPI):
     """Função de ciclo de vida da aplicação."""
     
     # Executa na inicialização da aplicação
     create_db_and_tables()
-    create_usuario_admin()
+    recalcular_contadores_tarefas()
+    fila_emails.iniciar()
+    hub_eventos.iniciar()
     yield  # Separa a inicialização do encerramento
     # Executa no encerramento da aplicação
-    pass
+    hub_eventos.encerrar()
+    await fila_emails.encerrar(EMAIL_ENCERRAMENTO_TIMEOUT_SEGUNDOS)
+    executor_senhas.encerrar()
+    await dispose_async_engine()
 
 app = FastAPI(
     title="Gerenciador de Tarefas API",
@@ -25,4 +41,10 @@ app = FastAPI(
 )
 
 # Inclui as rotas no app
-app.include_router(main_router)
\ No newline at end of file
+app.include_router(main_router)
+
+# Server-Timing e métricas por rota (apenas com METRICAS_ATIVAS)
+instrumentar_app(app, engine, engine_leitura)
+
+# Consultas repetidas/lentas por requisição (apenas com DETECTOR_CONSULTAS_ATIVO)
+instrumentar_detector(app, engine, engine_leitura)
@@ -0,0 +1,31 @@
+"""Adaptador assíncrono para repositories e services"""
+
+import inspect
+from typing import Any, Generic, TypeVar
+from sqlmodel import Session
+from task_manager_api.database import executar_no_banco
+
+T = TypeVar("T")
+
+class AsyncAdapter(Generic[T]):
+    """
+    Expõe os métodos de um repository ou service como corrotinas.
+
+    Cada chamada a um método síncrono é executada por `executar_no_banco`:
+    no modo assíncrono dentro da `AsyncSession`, no modo síncrono no
+    threadpool. Métodos que já são `async` são repassados sem alteração.
+    """
+    
+    def __init__(self, alvo: T, db_session: Session):
+        self.alvo = alvo
+        self.db_session = db_session
+    
+    def __getattr__(self, nome: str) -> Any:
+        atributo = getattr(self.alvo, nome)
+        if not callable(atributo) or inspect.iscoroutinefunction(atributo):
+            return atributo
+        
+        async def executar(*args, **kwargs):
+            return await executar_no_banco(self.db_session, atributo, *args, **kwargs)
+        
+        return executar
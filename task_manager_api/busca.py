@@ -0,0 +1,94 @@
+"""
+Índice de busca textual das tarefas (SQLite FTS5).
+
+A tabela virtual `tarefa_fts` (rowid = id da tarefa) guarda o título e a
+descrição com cada palavra prefixada pelo dono da tarefa (`u42_relatório`).
+Cada usuário tem, portanto, seus próprios termos no índice: a busca lê
+apenas as ocorrências das tarefas do usuário, e o ranking (bm25) usa a
+frequência das palavras entre essas tarefas. Com as palavras sem prefixo,
+o bm25 percorre as ocorrências do termo na tabela inteira a cada consulta
+(dezenas de ms para palavras frequentes em 1M de tarefas).
+
+O tokenizer (`unicode61`, sem diferenciar maiúsculas nem acentos) é
+aplicado aos documentos e às consultas; `extrair_termos` apenas separa as
+palavras, do mesmo modo nos dois casos.
+"""
+
+import re
+import unicodedata
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlmodel import select
+from task_manager_api.models.tarefa import Tarefa
+
+_PALAVRA = re.compile(r"\w+")
+
+CRIAR_TABELA = text(
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tarefa_fts USING fts5("
+    "titulo, descricao, tokenize=\"unicode61 remove_diacritics 2 tokenchars '_'\")"
+)
+INSERIR = text("INSERT INTO tarefa_fts (rowid, titulo, descricao) VALUES (:id, :titulo, :descricao)")
+REMOVER = text("DELETE FROM tarefa_fts WHERE rowid = :id")
+REMOVER_POR_USUARIO = text(
+    "DELETE FROM tarefa_fts WHERE rowid IN (SELECT id FROM tarefa WHERE usuario_id = :usuario_id)"
+)
+# bm25 com peso maior para o título, calculado apenas para as `candidatos`
+# tarefas mais recentes (maior rowid) que atendem à consulta
+BUSCAR = text(
+    "SELECT rowid FROM ("
+    "SELECT rowid, bm25(tarefa_fts, 10.0, 1.0) AS relevancia FROM tarefa_fts "
+    "WHERE tarefa_fts MATCH :consulta ORDER BY rowid DESC LIMIT :candidatos"
+    ") ORDER BY relevancia LIMIT :limite"
+)
+
+def extrair_termos(texto: str) -> list[str]:
+    """Palavras do texto; pontuação e operadores do FTS5 são descartados"""
+
+    return _PALAVRA.findall(unicodedata.normalize("NFC", texto))
+
+def _documento(usuario_id: int, texto: Optional[str]) -> str:
+    if not texto:
+        return ""
+    return " ".join(f"u{usuario_id}_{termo}" for termo in extrair_termos(texto))
+
+def linha_indice(tarefa_id: int, usuario_id: int, titulo: str, descricao: Optional[str]) -> dict:
+    """Parâmetros de `INSERIR` para uma tarefa"""
+
+    return {
+        "id": tarefa_id,
+        "titulo": _documento(usuario_id, titulo),
+        "descricao": _documento(usuario_id, descricao),
+    }
+
+def consulta_fts(usuario_id: int, termos: list[str]) -> str:
+    """Expressão FTS5: tarefas do usuário com todos os termos no título ou na descrição"""
+
+    return " ".join(f'"u{usuario_id}_{termo}"' for termo in termos)
+
+def reconstruir_indice(conn: Connection, tamanho_lote: int = 5000) -> int:
+    """
+    Recria a tabela do índice e indexa todas as tarefas, em lotes por id.
+    Retorna quantas foram indexadas. Não faz commit.
+    """
+
+    # Recriar a tabela é mais rápido que remover linha a linha do índice
+    conn.execute(text("DROP TABLE IF EXISTS tarefa_fts"))
+    conn.execute(CRIAR_TABELA)
+    total = 0
+    ultimo_id = 0
+    while True:
+        linhas = conn.execute(
+            select(Tarefa.id, Tarefa.usuario_id, Tarefa.titulo, Tarefa.descricao)
+            .where(Tarefa.id > ultimo_id)
+            .order_by(Tarefa.id)
+            .limit(tamanho_lote)
+        ).all()
+        if not linhas:
+            break
+        conn.execute(INSERIR, [linha_indice(*linha) for linha in linhas])
+        total += len(linhas)
+        ultimo_id = linhas[-1].id
+    # Junta os segmentos do índice, que as inserções deixam fragmentado
+    conn.execute(text("INSERT INTO tarefa_fts (tarefa_fts) VALUES ('optimize')"))
+    return total
@@ -0,0 +1,130 @@
+"""Cache em memória de tokens JWT já verificados"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+from task_manager_api.models.usuario import UsuarioAutenticado
+from task_manager_api.config import TOKEN_CACHE_TAMANHO_MAXIMO, TOKEN_CACHE_TTL_SEGUNDOS
+
+class TokenVerificado(NamedTuple):
+    claims: dict
+    usuario: UsuarioAutenticado
+    expira_em: float
+
+class TokenCache:
+    """
+    Cache LRU com TTL de tokens verificados, indexado pelo digest do token.
+
+    Cada entrada expira no menor instante entre o TTL configurado e o
+    `exp` do próprio JWT. Alterações no usuário invalidam suas entradas.
+    """
+    
+    def __init__(self, tamanho_maximo: int, ttl_segundos: float):
+        self.tamanho_maximo = tamanho_maximo
+        self.ttl_segundos = ttl_segundos
+        self._entradas: OrderedDict[str, TokenVerificado] = OrderedDict()
+        self._por_usuario: dict[int, set[str]] = {}
+        self._lock = threading.Lock()
+        self._geracao = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidacoes = 0
+    
+    @staticmethod
+    def _digest(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+    
+    @property
+    def geracao(self) -> int:
+        """Incrementada a cada invalidação; usada para descartar escritas obsoletas."""
+        return self._geracao
+    
+    def get(self, token: str) -> Optional[TokenVerificado]:
+        chave = self._digest(token)
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                self.misses += 1
+                return None
+            
+            if entrada.expira_em <= time.time():
+                self._remover(chave)
+                self.misses += 1
+                return None
+            
+            self._entradas.move_to_end(chave)
+            self.hits += 1
+            return entrada
+    
+    def set(
+        self,
+        token: str,
+        claims: dict,
+        usuario: UsuarioAutenticado,
+        geracao: int
+    ) -> None:
+        """
+        Armazena o token verificado. `geracao` deve ser lida antes da
+        consulta ao banco: se houve invalidação desde então, o snapshot
+        pode estar desatualizado e não é armazenado.
+        """
+        
+        expira_em = time.time() + self.ttl_segundos
+        exp = claims.get("exp")
+        if isinstance(exp, (int, float)):
+            expira_em = min(expira_em, exp)
+        
+        chave = self._digest(token)
+        with self._lock:
+            if geracao != self._geracao:
+                return
+            
+            self._remover(chave)
+            self._entradas[chave] = TokenVerificado(claims, usuario, expira_em)
+            self._por_usuario.setdefault(usuario.id, set()).add(chave)
+            
+            while len(self._entradas) > self.tamanho_maximo:
+                chave_antiga = next(iter(self._entradas))
+                self._remover(chave_antiga)
+    
+    def invalidar_usuario(self, usuario_id: int) -> None:
+        """Remove todas as entradas do usuário informado."""
+        
+        with self._lock:
+            self._geracao += 1
+            self.invalidacoes += 1
+            for chave in self._por_usuario.pop(usuario_id, set()):
+                self._entradas.pop(chave, None)
+    
+    def limpar(self) -> None:
+        with self._lock:
+            self._geracao += 1
+            self._entradas.clear()
+            self._por_usuario.clear()
+    
+    def estatisticas(self) -> dict:
+        with self._lock:
+            return {
+                "tamanho": len(self._entradas),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidacoes": self.invalidacoes,
+            }
+    
+    def _remover(self, chave: str) -> None:
+        entrada = self._entradas.pop(chave, None)
+        if entrada is None:
+            return
+        
+        chaves_usuario = self._por_usuario.get(entrada.usuario.id)
+        if chaves_usuario is not None:
+            chaves_usuario.discard(chave)
+            if not chaves_usuario:
+                del self._por_usuario[entrada.usuario.id]
+
+token_cache = TokenCache(
+    tamanho_maximo=TOKEN_CACHE_TAMANHO_MAXIMO,
+    ttl_segundos=TOKEN_CACHE_TTL_SEGUNDOS,
+)
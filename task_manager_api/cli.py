@@ -0,0 +1,73 @@
+"""
+Comandos de manutenção do banco.
+
+Uso:
+    python -m task_manager_api.cli criar-admin [--username admin] [--email admin@example.com]
+    python -m task_manager_api.cli reconstruir-busca
+    python -m task_manager_api.cli recalcular-contadores
+"""
+
+import argparse
+import getpass
+from sqlmodel import Session
+from task_manager_api.database import create_db_and_tables, engine
+from task_manager_api.models.usuario import Usuario
+from task_manager_api.repositories.tarefa_repository import TarefaRepository
+from task_manager_api.repositories.usuario_repository import UsuarioRepository
+from task_manager_api.security import criar_hash_senha
+
+def criar_admin(args: argparse.Namespace) -> None:
+    """Cria um usuário admin, se ainda não houver nenhum."""
+    
+    with Session(engine) as session:
+        usuario_repository = UsuarioRepository(session)
+        if usuario_repository.get_admins():
+            print("já existe um usuário admin")
+            return
+        senha = args.senha or getpass.getpass("Senha do admin: ")
+        usuario_repository.add_update_usuario(Usuario(
+            username=args.username,
+            senha=criar_hash_senha(senha),
+            nome=args.nome,
+            email=args.email,
+            is_admin=True,
+        ))
+    print(f"admin {args.username} criado")
+
+def reconstruir_busca(args: argparse.Namespace) -> None:
+    """Recria o índice de busca textual (tarefa_fts) a partir das tarefas."""
+    
+    with Session(engine) as session:
+        indexadas = TarefaRepository(session).reconstruir_indice_busca()
+    print(f"{indexadas} tarefas indexadas")
+
+def recalcular_contadores(args: argparse.Namespace) -> None:
+    """Refaz a tabela contador_tarefa a partir das tarefas."""
+    
+    with Session(engine) as session:
+        TarefaRepository(session).recalcular_contadores()
+    print("contadores recalculados")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    for nome, funcao in (
+        ("criar-admin", criar_admin),
+        ("reconstruir-busca", reconstruir_busca),
+        ("recalcular-contadores", recalcular_contadores),
+    ):
+        comando = comandos.add_parser(nome, help=funcao.__doc__)
+        comando.set_defaults(funcao=funcao)
+        if funcao is criar_admin:
+            comando.add_argument("--username", default="admin")
+            comando.add_argument("--nome", default="Administrador")
+            comando.add_argument("--email", default="admin@example.com")
+            comando.add_argument("--senha", help="se omitida, é pedida no terminal")
+    args = parser.parse_args(argv)
+    
+    # Cria as tabelas e aplica as migrações pendentes (inclusive a do índice)
+    create_db_and_tables()
+    args.funcao(args)
+
+if __name__ == "__main__":
+    main()
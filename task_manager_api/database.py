@@ -1,38 +1,213 @@
 """Conexão com o banco de dados"""
 
-from sqlmodel import Session, SQLModel, create_engine, select
-from task_manager_api.security import criar_hash_senha
-from task_manager_api.models.usuario import Usuario
-from fastapi import Depends
+from typing import Any, Callable, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from task_manager_api.repositories.tarefa_repository import TarefaRepository
+from task_manager_api.migrations import aplicar_migracoes, schema_atualizado, ler_estado, gravar_estado
+from task_manager_api.metricas import instrumentar_engine
+from task_manager_api import detector_consultas
+from task_manager_api.roteamento_banco import SessionRoteada, permitir_leitura, roteador
+from task_manager_api.config import (
+    ASYNC_DATABASE_URL,
+    DB_LEITURA_URL,
+    ASYNC_DATABASE_LEITURA_URL,
+    DB_LEITURA_POOL_SIZE,
+    DB_LEITURA_POOL_MAX_OVERFLOW,
+    DB_POOL_SIZE,
+    DB_POOL_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT_SEGUNDOS,
+    DB_POOL_RECYCLE_SEGUNDOS,
+    DB_POOL_PRE_PING,
+    SQLITE_PRAGMAS,
+    METRICAS_ATIVAS,
+    DETECTOR_CONSULTAS_ATIVO,
+    ESTATISTICAS_CONTADORES,
+    SCHEMA_VERIFICAR_VERSAO,
+)
+from fastapi import Depends, Request
 
 sqlite_file_name = "database.db"
 sqlite_url = f"sqlite:///{sqlite_file_name}"
 
 connect_args = {"check_same_thread": False}
-engine = create_engine(sqlite_url, connect_args=connect_args)
+
+def _opcoes_pool() -> dict:
+    """Opções de pool comuns aos engines síncrono e assíncrono."""
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_POOL_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT_SEGUNDOS,
+        "pool_recycle": DB_POOL_RECYCLE_SEGUNDOS,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+def configurar_pragmas(engine: Engine, pragmas: dict = SQLITE_PRAGMAS) -> None:
+    """Aplica os pragmas a cada nova conexão SQLite do engine."""
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _aplicar_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for nome, valor in pragmas.items():
+            cursor.execute(f"PRAGMA {nome}={valor}")
+        cursor.close()
+
+def criar_engine(url: str, pragmas: dict = SQLITE_PRAGMAS, **opcoes) -> Engine:
+    """Cria um engine síncrono com o pool e os pragmas configurados."""
+    opcoes = {**_opcoes_pool(), **opcoes}
+    if url.startswith("sqlite"):
+        opcoes.setdefault("connect_args", connect_args)
+    novo_engine = create_engine(url, **opcoes)
+    configurar_pragmas(novo_engine, pragmas)
+    return novo_engine
+
+def _pragmas_leitura(pragmas: dict = SQLITE_PRAGMAS) -> dict:
+    """Pragmas do engine de leitura: o modo do journal só muda na escrita."""
+    return {nome: valor for nome, valor in pragmas.items() if nome != "journal_mode"}
+
+def _opcoes_pool_leitura() -> dict:
+    return {"pool_size": DB_LEITURA_POOL_SIZE, "max_overflow": DB_LEITURA_POOL_MAX_OVERFLOW}
+
+engine = criar_engine(sqlite_url)
+
+# Sem DB_LEITURA_URL, as leituras também usam o engine de escrita
+engine_leitura = (
+    criar_engine(DB_LEITURA_URL, _pragmas_leitura(), **_opcoes_pool_leitura())
+    if DB_LEITURA_URL else engine
+)
+
+def engine_leitura_para(cliente: Optional[str]) -> Engine:
+    """
+    Engine para leituras fora da sessão da requisição (exportações): o de
+    escrita se o cliente escreveu há pouco, senão o de leitura.
+    """
+    if cliente and roteador.escrita_recente(cliente):
+        return engine
+    return engine_leitura
 
 def create_db_and_tables():
-    """Cria as tabelas, se não existirem."""
+    """
+    Cria as tabelas, se não existirem, e aplica as migrações pendentes. Com
+    `SCHEMA_VERIFICAR_VERSAO`, um banco já na última versão é usado como está.
+    """
+    if SCHEMA_VERIFICAR_VERSAO and schema_atualizado(engine):
+        return
     SQLModel.metadata.create_all(engine)
+    aplicar_migracoes(engine)
+
+# Em `estado_banco`: se os contadores acompanham as tarefas desde o último cálculo
+ESTADO_CONTADORES = "contadores_tarefas"
 
-def get_session():
-    """Cria uma sessão com o banco de dados."""
+def recalcular_contadores_tarefas():
+    """
+    Refaz os contadores de tarefas, se `ESTATISTICAS_CONTADORES` e se eles
+    estão desatualizados: uma inicialização com a opção desligada (quando as
+    escritas não os mantêm) os marca assim em `estado_banco`.
+    """
+    with engine.begin() as conn:
+        atualizados = ler_estado(conn, ESTADO_CONTADORES) == "atualizados"
+        if not ESTATISTICAS_CONTADORES:
+            if atualizados:
+                gravar_estado(conn, ESTADO_CONTADORES, "desatualizados")
+            return
+    if atualizados:
+        return
     with Session(engine) as session:
+        TarefaRepository(session).recalcular_contadores()
+    with engine.begin() as conn:
+        gravar_estado(conn, ESTADO_CONTADORES, "atualizados")
+
+def get_session(request: Request):
+    """
+    Cria uma sessão com o banco de dados. Nas requisições GET/HEAD, os
+    métodos de leitura dos repositórios usam o engine de leitura.
+    """
+    with SessionRoteada(
+        engine,
+        engine_leitura=engine_leitura if engine_leitura is not engine else None
+    ) as session:
+        permitir_leitura(session, request.method)
         yield session
         
 SessionDep = Depends(get_session)
 
-def create_usuario_admin():
-    """Cria um usuário admin padrão, se não existir."""
-    with Session(engine) as session:
-        usuario_admin = session.exec(select(Usuario).where(Usuario.is_admin == True)).first()
-        if not usuario_admin:
-            admin = Usuario(
-                username="admin",
-                senha=criar_hash_senha("admin123"),
-                nome="Administrador",
-                email="admin@example.com",
-                is_admin=True,
-            )
-            session.add(admin)
-            session.commit()
\ No newline at end of file
+_async_engine: Optional[AsyncEngine] = None
+_async_engine_leitura: Optional[AsyncEngine] = None
+
+def _criar_async_engine(url: str, pragmas: dict, **opcoes) -> AsyncEngine:
+    novo_engine = create_async_engine(url, **{**_opcoes_pool(), **opcoes})
+    configurar_pragmas(novo_engine.sync_engine, pragmas)
+    if METRICAS_ATIVAS:
+        instrumentar_engine(novo_engine.sync_engine)
+    if DETECTOR_CONSULTAS_ATIVO:
+        detector_consultas.instrumentar_engine(novo_engine.sync_engine)
+    return novo_engine
+
+def get_async_engine() -> AsyncEngine:
+    """Cria (uma única vez) o engine assíncrono usado no modo DB_MODO_ASYNC."""
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = _criar_async_engine(ASYNC_DATABASE_URL, SQLITE_PRAGMAS)
+    return _async_engine
+
+def get_async_engine_leitura() -> Optional[AsyncEngine]:
+    """Cria (uma única vez) o engine assíncrono de leitura, se configurado."""
+    global _async_engine_leitura
+    if _async_engine_leitura is None and ASYNC_DATABASE_LEITURA_URL:
+        _async_engine_leitura = _criar_async_engine(
+            ASYNC_DATABASE_LEITURA_URL,
+            _pragmas_leitura(),
+            **_opcoes_pool_leitura()
+        )
+    return _async_engine_leitura
+
+async def dispose_async_engine():
+    """Fecha as conexões dos engines assíncronos, se eles foram criados."""
+    global _async_engine, _async_engine_leitura
+    for async_engine in (_async_engine, _async_engine_leitura):
+        if async_engine is not None:
+            await async_engine.dispose()
+    _async_engine = _async_engine_leitura = None
+
+async def get_async_session(request: Request):
+    """
+    Cria uma sessão assíncrona com o banco de dados.
+
+    Os repositórios recebem a `Session` síncrona associada (`sync_session`);
+    o acesso ao banco deve passar por `executar_no_banco`, que executa o
+    código dentro da `AsyncSession`, com I/O assíncrono. O roteamento das
+    leituras é o mesmo de `get_session`.
+    """
+    async_engine_leitura = get_async_engine_leitura()
+    async with AsyncSession(
+        get_async_engine(),
+        expire_on_commit=False,
+        sync_session_class=SessionRoteada,
+        engine_leitura=async_engine_leitura.sync_engine if async_engine_leitura else None
+    ) as session:
+        session.sync_session.info["async_session"] = session
+        permitir_leitura(session.sync_session, request.method)
+        yield session.sync_session
+
+async def executar_no_banco(
+    session: Session,
+    funcao: Callable[..., Any],
+    *args,
+    **kwargs
+) -> Any:
+    """
+    Executa código síncrono de acesso ao banco sem bloquear o event loop.
+
+    Se a sessão pertence a uma `AsyncSession`, a função roda via `run_sync`
+    (o I/O do driver é assíncrono); caso contrário, roda no threadpool.
+    """
+    async_session = session.info.get("async_session")
+    if async_session is not None:
+        return await async_session.run_sync(lambda _: funcao(*args, **kwargs))
+    return await run_in_threadpool(funcao, *args, **kwargs)
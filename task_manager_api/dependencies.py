@@ -1,60 +1,114 @@
+import secrets
 from typing import Optional
-from fastapi import Depends
+from fastapi import Body, Depends, Request
+from fastapi.security import OAuth2PasswordRequestForm
 from sqlmodel import Session
 from fastapi.security import OAuth2PasswordBearer
-from task_manager_api.database import get_session
+from task_manager_api.config import DB_MODO_ASYNC, METRICAS_TOKEN
+from task_manager_api.database import get_session, get_async_session
+from task_manager_api.async_adapter import AsyncAdapter
+from task_manager_api.metricas import medir
+from task_manager_api.limite_requisicoes import limitador, ip_cliente
 from task_manager_api.repositories.usuario_repository import UsuarioRepository
 from task_manager_api.repositories.tarefa_repository import TarefaRepository
 from task_manager_api.services.usuario_service import UsuarioService
 from task_manager_api.services.tarefa_service import TarefaService
 from task_manager_api.services.auth_service import AuthService
-from task_manager_api.models.usuario import Usuario
+from task_manager_api.services.exportacao_service import ExportacaoService
+from task_manager_api.services.reset_senha_service import ResetSenhaService
+from task_manager_api.models.usuario import Usuario, UsuarioAutenticado
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# Sessão entregue aos repositórios, conforme o modo configurado
+get_db_session = get_async_session if DB_MODO_ASYNC else get_session
+
 def get_usuario_repository(
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_db_session)
 ):
     return UsuarioRepository(session)
 
 def get_usuario_service(
-    session=Depends(get_usuario_repository)
-):
-    return UsuarioService(session)
+    repo: UsuarioRepository = Depends(get_usuario_repository)
+) -> AsyncAdapter[UsuarioService]:
+    return AsyncAdapter(UsuarioService(repo), repo.db_session)
 
-def get_auth_service(usuario_service=Depends(get_usuario_service)):
-    return AuthService(usuario_service)
+def get_auth_service(
+    repo: UsuarioRepository = Depends(get_usuario_repository)
+) -> AsyncAdapter[AuthService]:
+    return AsyncAdapter(AuthService(UsuarioService(repo)), repo.db_session)
 
 def get_tarefa_repository(
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_db_session)
 ):
     return TarefaRepository(session)
 
 def get_tarefa_service(
     repo: TarefaRepository = Depends(get_tarefa_repository)
-):
-    return TarefaService(repo)
+) -> AsyncAdapter[TarefaService]:
+    return AsyncAdapter(TarefaService(repo), repo.db_session)
+
+def get_reset_senha_service(
+    repo: UsuarioRepository = Depends(get_usuario_repository)
+) -> ResetSenhaService:
+    return ResetSenhaService(repo)
 
-def get_usuario_autenticado(
+
+async def get_usuario_autenticado(
     token: str = Depends(oauth2_scheme),
     auth_service: AuthService = Depends(get_auth_service)
-):
-    return auth_service.validar_token(token)
+) -> UsuarioAutenticado:
+    with medir("auth"):
+        return await auth_service.validar_token(token)
+
+async def autorizar_metricas(
+    token: str = Depends(oauth2_scheme),
+    auth_service: AuthService = Depends(get_auth_service),
+    usuario_service: UsuarioService = Depends(get_usuario_service)
+) -> None:
+    """Libera GET /metrics para o token do coletor (METRICAS_TOKEN) ou para admins."""
+    
+    if METRICAS_TOKEN is not None and secrets.compare_digest(token.encode(), METRICAS_TOKEN.encode()):
+        return
+    usuario = await auth_service.validar_token(token)
+    await usuario_service.checar_usuario_is_admin(usuario)
 
+def get_exportacao_service(
+    usuario: UsuarioAutenticado = Depends(get_usuario_autenticado)
+) -> ExportacaoService:
+    return ExportacaoService(usuario.username)
 
-def pode_alterar_senha(
+
+async def pode_alterar_senha(
     username: str,
     pwd_reset_token: Optional[str] = None,
     auth_service: AuthService = Depends(get_auth_service),
-    usuario_logado: Usuario = Depends(get_usuario_autenticado)
+    usuario_logado: UsuarioAutenticado = Depends(get_usuario_autenticado)
 ) -> Usuario:
     """
     Retorna o usuário-alvo SE e SOMENTE SE o usuário logado
     puder alterar a senha dele.
     """
     
-    return auth_service.get_usuario_se_alterar_senha_for_permitido(
+    return await auth_service.get_usuario_se_alterar_senha_for_permitido(
         username=username,
         usuario_logado=usuario_logado,
         pwd_reset_token=pwd_reset_token
-    )
\ No newline at end of file
+    )
+
+
+async def limitar_tentativas_token(
+    request: Request,
+    form: OAuth2PasswordRequestForm = Depends()
+) -> None:
+    """Limita as tentativas de login por IP e por username (antes do bcrypt)."""
+    
+    await limitador.verificar("token", {"ip": ip_cliente(request), "username": form.username})
+
+async def limitar_reset_senha(
+    request: Request,
+    email: str = Body(embed=True)
+) -> None:
+    """Limita os pedidos de reset de senha por IP e por email (antes da busca do usuário)."""
+    
+    await limitador.verificar("reset_senha", {"ip": ip_cliente(request), "email": email.strip().lower()})
@@ -0,0 +1,230 @@
+"""
+Detector de consultas repetidas (N+1) e lentas, para desenvolvimento.
+
+Com `DETECTOR_CONSULTAS_ATIVO`, as consultas de cada requisição são
+agrupadas pelo SQL normalizado (parâmetros e listas de `IN` colapsados).
+Ao fim da requisição, um aviso é registrado no logger
+`task_manager_api.detector_consultas` quando:
+
+- o mesmo SQL se repete `DETECTOR_CONSULTAS_REPETICOES` vezes ou mais;
+- alguma consulta passa de `DETECTOR_CONSULTAS_LIMITE_LENTA_MS`.
+
+O relatório mostra a rota e, para cada consulta, o método do repositório
+que a executou e o método do service que o chamou.
+
+`limitar_consultas` serve para fixar, em testes ou scripts, o número
+máximo de consultas de um trecho de código (por exemplo, uma chamada ao
+`TestClient`).
+"""
+
+import logging
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+from fastapi import FastAPI
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from task_manager_api.config import (
+    DETECTOR_CONSULTAS_ATIVO,
+    DETECTOR_CONSULTAS_LIMITE_LENTA_MS,
+    DETECTOR_CONSULTAS_REPETICOES,
+)
+
+logger = logging.getLogger(__name__)
+
+_ESPACOS = re.compile(r"\s+")
+_LISTA_IN = re.compile(r"IN \((?:\?|%s|:\w+)(?:, (?:\?|%s|:\w+))*\)", re.IGNORECASE)
+_TEXTO = re.compile(r"'(?:[^']|'')*'")
+_NUMERO = re.compile(r"(?<![\w.])\d+(?:\.\d+)?\b")
+
+def normalizar_sql(sql: str) -> str:
+    """SQL sem valores literais e com listas de `IN` colapsadas"""
+
+    sql = _ESPACOS.sub(" ", sql).strip()
+    sql = _TEXTO.sub("?", sql)
+    sql = _NUMERO.sub("?", sql)
+    return _LISTA_IN.sub("IN (...)", sql)
+
+def origem_consulta() -> str:
+    """
+    Método do repositório que executou a consulta e o método do service
+    que o chamou, a partir da pilha atual (ex.: `UsuarioRepository.get_usuario_por_id
+    <- UsuarioService.update_usuario`).
+    """
+
+    repositorio = service = None
+    frame = sys._getframe(1)
+    while frame is not None and service is None:
+        modulo = frame.f_globals.get("__name__", "")
+        nome = getattr(frame.f_code, "co_qualname", frame.f_code.co_name)
+        if repositorio is None and modulo.startswith("task_manager_api.repositories."):
+            repositorio = nome
+        elif modulo.startswith("task_manager_api.services."):
+            service = nome
+        frame = frame.f_back
+    if repositorio and service:
+        return f"{repositorio} <- {service}"
+    return repositorio or service or "?"
+
+class EstatisticaConsulta:
+    """Execuções de um mesmo SQL normalizado"""
+
+    __slots__ = ("sql", "quantidade", "tempo_total", "tempo_maximo", "origens")
+
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.quantidade = 0
+        self.tempo_total = 0.0
+        self.tempo_maximo = 0.0
+        self.origens: dict[str, int] = {}
+
+class RelatorioConsultas:
+    """Consultas executadas em uma requisição (ou em um bloco de código)"""
+
+    def __init__(self, rota: str = ""):
+        self.rota = rota
+        self.consultas: dict[str, EstatisticaConsulta] = {}
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def registrar(self, sql: str, duracao: float, origem: str) -> None:
+        normalizado = normalizar_sql(sql)
+        with self._lock:
+            estatistica = self.consultas.get(normalizado)
+            if estatistica is None:
+                estatistica = self.consultas[normalizado] = EstatisticaConsulta(normalizado)
+            estatistica.quantidade += 1
+            estatistica.tempo_total += duracao
+            estatistica.tempo_maximo = max(estatistica.tempo_maximo, duracao)
+            estatistica.origens[origem] = estatistica.origens.get(origem, 0) + 1
+            self.total += 1
+
+    def repetidas(self, minimo: int = DETECTOR_CONSULTAS_REPETICOES) -> list[EstatisticaConsulta]:
+        return [c for c in self.consultas.values() if c.quantidade >= minimo]
+
+    def lentas(self, limite_ms: float = DETECTOR_CONSULTAS_LIMITE_LENTA_MS) -> list[EstatisticaConsulta]:
+        return [c for c in self.consultas.values() if c.tempo_maximo * 1000 >= limite_ms]
+
+    def formatar(self) -> str:
+        tempo_total = sum(c.tempo_total for c in self.consultas.values())
+        linhas = [f"{self.rota or 'bloco'}: {self.total} consultas, {tempo_total * 1000:.1f} ms"]
+        repetidas = {id(c) for c in self.repetidas()}
+        lentas = {id(c) for c in self.lentas()}
+        for consulta in sorted(self.consultas.values(), key=lambda c: -c.quantidade):
+            marcas = []
+            if id(consulta) in repetidas:
+                marcas.append("REPETIDA")
+            if id(consulta) in lentas:
+                marcas.append(f"LENTA ({consulta.tempo_maximo * 1000:.1f} ms)")
+            sql = consulta.sql if len(consulta.sql) <= 160 else consulta.sql[:157] + "..."
+            linhas.append(
+                f"  [{consulta.quantidade}x, {consulta.tempo_total * 1000:.1f} ms]"
+                f"{' ' + ' '.join(marcas) if marcas else ''} {sql}"
+            )
+            for origem, quantidade in consulta.origens.items():
+                linhas.append(f"      {quantidade}x {origem}")
+        return "\n".join(linhas)
+
+_relatorio: ContextVar[Optional[RelatorioConsultas]] = ContextVar("relatorio_consultas", default=None)
+
+def _antes_da_consulta(conn, cursor, statement, parameters, context, executemany):
+    if _relatorio.get() is not None:
+        conn.info.setdefault("detector_inicio", []).append(time.perf_counter())
+
+def _depois_da_consulta(conn, cursor, statement, parameters, context, executemany):
+    relatorio = _relatorio.get()
+    inicios = conn.info.get("detector_inicio")
+    if relatorio is None or not inicios:
+        return
+    relatorio.registrar(statement, time.perf_counter() - inicios.pop(), origem_consulta())
+
+def instrumentar_engine(engine: Engine) -> None:
+    """Registra no engine os eventos que alimentam o relatório da requisição"""
+
+    if not event.contains(engine, "before_cursor_execute", _antes_da_consulta):
+        event.listen(engine, "before_cursor_execute", _antes_da_consulta)
+        event.listen(engine, "after_cursor_execute", _depois_da_consulta)
+
+class DetectorConsultasMiddleware:
+    """Middleware ASGI que cria o relatório de cada requisição e avisa dos problemas"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        relatorio = RelatorioConsultas()
+        token = _relatorio.set(relatorio)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _relatorio.reset(token)
+            rota = getattr(scope.get("route"), "path", scope["path"])
+            relatorio.rota = f"{scope['method']} {rota}"
+            if relatorio.repetidas() or relatorio.lentas():
+                logger.warning("Consultas suspeitas em %s", relatorio.formatar())
+
+def instrumentar_detector(app: FastAPI, *engines: Engine) -> None:
+    """Liga o detector, se `DETECTOR_CONSULTAS_ATIVO`"""
+
+    if not DETECTOR_CONSULTAS_ATIVO:
+        return
+    for engine in engines:
+        instrumentar_engine(engine)
+    app.add_middleware(DetectorConsultasMiddleware)
+
+@contextmanager
+def contar_consultas(*engines: Engine) -> Iterator[RelatorioConsultas]:
+    """
+    Registra todas as consultas feitas nos engines (o de escrita e o de
+    leitura, por exemplo) durante o bloco, de qualquer thread (inclusive a
+    do app, quando chamado pelo `TestClient`).
+    """
+
+    relatorio = RelatorioConsultas()
+    inicios: dict[int, list[float]] = {}
+
+    def antes(conn, cursor, statement, parameters, context, executemany):
+        inicios.setdefault(id(conn), []).append(time.perf_counter())
+
+    def depois(conn, cursor, statement, parameters, context, executemany):
+        pilha = inicios.get(id(conn))
+        if pilha:
+            relatorio.registrar(statement, time.perf_counter() - pilha.pop(), origem_consulta())
+
+    # Sem réplica, o engine de leitura é o próprio engine de escrita
+    engines = tuple(dict.fromkeys(engines))
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", antes)
+        event.listen(engine, "after_cursor_execute", depois)
+    try:
+        yield relatorio
+    finally:
+        for engine in engines:
+            event.remove(engine, "before_cursor_execute", antes)
+            event.remove(engine, "after_cursor_execute", depois)
+
+@contextmanager
+def limitar_consultas(maximo: int, *engines: Engine) -> Iterator[RelatorioConsultas]:
+    """
+    Falha com `AssertionError` (e o relatório das consultas) se o bloco
+    executar mais que `maximo` consultas nos engines.
+
+        with limitar_consultas(3, engine, engine_leitura):
+            client.patch(f"/usuarios/{id}", json={"email": "novo@example.com"}, headers=headers)
+    """
+
+    with contar_consultas(*engines) as relatorio:
+        yield relatorio
+    if relatorio.total > maximo:
+        raise AssertionError(
+            f"Esperado no máximo {maximo} consultas, executadas {relatorio.total}:\n"
+            f"{relatorio.formatar()}"
+        )
@@ -0,0 +1,296 @@
+"""
+Envio de emails em segundo plano.
+
+As requisições apenas enfileiram as mensagens (`fila_emails.enfileirar`);
+uma task no event loop as retira em lotes (as que se acumularam enquanto o
+lote anterior era enviado) e as entrega ao transporte em uma thread, com
+novas tentativas e espera exponencial nas falhas. A fila é limitada: cheia,
+as requisições recebem 503. Uma requisição que só sabe depois de um
+`await` se vai enviar a mensagem reserva a vaga antes (`reservar`), para
+que o 503 não dependa desse resultado. No encerramento da aplicação, a fila
+é esvaziada antes de a task terminar.
+"""
+
+import asyncio
+import logging
+import random
+import smtplib
+import threading
+from contextlib import contextmanager
+from email.message import EmailMessage
+from typing import Callable, Iterator, NamedTuple, Optional, Protocol
+from fastapi import HTTPException, status
+from task_manager_api.config import (
+    EMAIL_TRANSPORTE,
+    EMAIL_ARQUIVO,
+    EMAIL_FILA_TAMANHO_MAXIMO,
+    EMAIL_LOTE_TAMANHO,
+    EMAIL_TENTATIVAS,
+    EMAIL_ESPERA_INICIAL_SEGUNDOS,
+    EMAIL_ESPERA_MAXIMA_SEGUNDOS,
+    EMAIL_RETRY_AFTER_SEGUNDOS,
+    smtp_sender,
+    smtp_server,
+    smtp_port,
+    smtp_usuario,
+    smtp_senha,
+)
+
+logger = logging.getLogger(__name__)
+
+class Mensagem(NamedTuple):
+    destinatario: str
+    assunto: str
+    corpo: str
+
+class Transporte(Protocol):
+    def enviar(self, mensagens: list[Mensagem]) -> list[Mensagem]:
+        """
+        Envia as mensagens (bloqueante, executado em uma thread) e retorna
+        as que devem ser tentadas novamente. Uma exceção equivale a nenhuma
+        mensagem enviada.
+        """
+
+class TransporteArquivo:
+    """Simula o envio escrevendo as mensagens em um arquivo (desenvolvimento)"""
+
+    def __init__(self, caminho: str, remetente: str):
+        self.caminho = caminho
+        self.remetente = remetente
+
+    def enviar(self, mensagens: list[Mensagem]) -> list[Mensagem]:
+        texto = "".join(
+            f"--- EMAIL PARA {mensagem.destinatario} ---\n"
+            f"From: {self.remetente}\n"
+            f"To: {mensagem.destinatario}\n"
+            f"Subject: {mensagem.assunto}\n"
+            f"\n"
+            f"{mensagem.corpo}\n"
+            f"--- FIM DO EMAIL ---\n"
+            for mensagem in mensagens
+        )
+        with open(self.caminho, "a") as arquivo:
+            arquivo.write(texto)
+        return []
+
+class TransporteSMTP:
+    """Envia as mensagens do lote por uma única conexão SMTP"""
+
+    def __init__(
+        self,
+        servidor: str,
+        porta: int,
+        remetente: str,
+        usuario: Optional[str] = None,
+        senha: Optional[str] = None,
+        timeout_segundos: float = 10
+    ):
+        self.servidor = servidor
+        self.porta = porta
+        self.remetente = remetente
+        self.usuario = usuario
+        self.senha = senha
+        self.timeout_segundos = timeout_segundos
+
+    def _montar(self, mensagem: Mensagem) -> EmailMessage:
+        email = EmailMessage()
+        email["From"] = self.remetente
+        email["To"] = mensagem.destinatario
+        email["Subject"] = mensagem.assunto
+        email.set_content(mensagem.corpo)
+        return email
+
+    def enviar(self, mensagens: list[Mensagem]) -> list[Mensagem]:
+        pendentes = []
+        with smtplib.SMTP(self.servidor, self.porta, timeout=self.timeout_segundos) as smtp:
+            if self.usuario:
+                smtp.starttls()
+                smtp.login(self.usuario, self.senha)
+            for posicao, mensagem in enumerate(mensagens):
+                try:
+                    smtp.send_message(self._montar(mensagem))
+                except smtplib.SMTPRecipientsRefused:
+                    logger.error("Destinatário recusado pelo servidor SMTP: %s", mensagem.destinatario)
+                except smtplib.SMTPResponseException as erro:
+                    # 4xx é temporário; 5xx não se resolve com nova tentativa
+                    if erro.smtp_code < 500:
+                        pendentes.append(mensagem)
+                    else:
+                        logger.error("Email para %s recusado: %s", mensagem.destinatario, erro)
+                except (smtplib.SMTPServerDisconnected, OSError):
+                    # Conexão perdida: esta e as seguintes não foram enviadas
+                    logger.warning("Conexão SMTP perdida durante o envio do lote", exc_info=True)
+                    return pendentes + mensagens[posicao:]
+        return pendentes
+
+class FilaEmails:
+    """
+    Fila limitada de emails (por worker), consumida por uma task que envia
+    em lotes. Deve ser iniciada e encerrada no event loop da aplicação
+    (`lifespan`).
+    """
+
+    def __init__(
+        self,
+        transporte: Transporte,
+        tamanho_maximo: int,
+        tamanho_lote: int,
+        tentativas: int,
+        espera_inicial_segundos: float,
+        espera_maxima_segundos: float,
+        retry_after_segundos: int
+    ):
+        self.transporte = transporte
+        self.tamanho_maximo = tamanho_maximo
+        self.tamanho_lote = tamanho_lote
+        self.tentativas = tentativas
+        self.espera_inicial_segundos = espera_inicial_segundos
+        self.espera_maxima_segundos = espera_maxima_segundos
+        self.retry_after_segundos = retry_after_segundos
+        self._fila: Optional[asyncio.Queue] = None
+        self._consumidor: Optional[asyncio.Task] = None
+        # Vagas reservadas ainda não usadas (alteradas só no event loop)
+        self._reservadas = 0
+        self._lock = threading.Lock()
+        self.enfileiradas = 0
+        self.enviadas = 0
+        self.descartadas = 0
+        self.rejeitadas = 0
+        self.tentativas_repetidas = 0
+        self.lotes = 0
+
+    def iniciar(self) -> None:
+        # A fila é criada aqui por ficar associada ao event loop em uso
+        self._fila = asyncio.Queue(maxsize=self.tamanho_maximo)
+        self._consumidor = asyncio.create_task(self._consumir(self._fila), name="fila-emails")
+
+    async def encerrar(self, timeout_segundos: float) -> None:
+        """Aguarda o envio das mensagens enfileiradas (até o timeout) e para a task."""
+
+        if self._consumidor is None:
+            return
+        fila, consumidor = self._fila, self._consumidor
+        self._fila = self._consumidor = None
+        try:
+            await asyncio.wait_for(fila.join(), timeout_segundos)
+        except asyncio.TimeoutError:
+            logger.error("Encerrando com %d emails não enviados", fila.qsize())
+        consumidor.cancel()
+        try:
+            await consumidor
+        except asyncio.CancelledError:
+            pass
+
+    def checar_capacidade(self) -> None:
+        """Responde 503 se a fila não aceita novas mensagens."""
+
+        if self._fila is None or self._fila.qsize() + self._reservadas >= self.tamanho_maximo:
+            with self._lock:
+                self.rejeitadas += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Envio de emails sobrecarregado, tente novamente em instantes.",
+                headers={"Retry-After": str(self.retry_after_segundos)},
+            )
+
+    @contextmanager
+    def reservar(self) -> Iterator[Callable[[Mensagem], None]]:
+        """
+        Reserva uma vaga na fila (no event loop) ou responde 503. O bloco
+        recebe a função que enfileira a mensagem na vaga reservada, que não
+        falha por a fila ter enchido nesse meio tempo; se ela não for
+        chamada, a vaga é liberada ao fim do bloco.
+        """
+
+        self.checar_capacidade()
+        self._reservadas += 1
+        usada = False
+
+        def enfileirar(mensagem: Mensagem) -> None:
+            nonlocal usada
+            if usada:
+                raise RuntimeError("A vaga reservada já foi usada")
+            usada = True
+            self._reservadas -= 1
+            if self._fila is None:
+                # Fila encerrada depois da reserva (encerramento da aplicação)
+                logger.error("Email para %s descartado: fila encerrada", mensagem.destinatario)
+                return
+            self._fila.put_nowait(mensagem)
+            with self._lock:
+                self.enfileiradas += 1
+
+        try:
+            yield enfileirar
+        finally:
+            if not usada:
+                self._reservadas -= 1
+
+    def enfileirar(self, mensagem: Mensagem) -> None:
+        """Enfileira a mensagem (no event loop); com a fila cheia, responde 503."""
+
+        with self.reservar() as enfileirar:
+            enfileirar(mensagem)
+
+    async def _consumir(self, fila: asyncio.Queue) -> None:
+        while True:
+            lote = [await fila.get()]
+            while len(lote) < self.tamanho_lote and not fila.empty():
+                lote.append(fila.get_nowait())
+            try:
+                await self._enviar_lote(lote)
+            except Exception:
+                logger.exception("Erro inesperado no envio de %d emails", len(lote))
+            finally:
+                for _ in lote:
+                    fila.task_done()
+
+    async def _enviar_lote(self, lote: list[Mensagem]) -> None:
+        pendentes = lote
+        for tentativa in range(1, self.tentativas + 1):
+            try:
+                pendentes = await asyncio.to_thread(self.transporte.enviar, pendentes)
+            except Exception:
+                logger.warning("Falha no envio de %d emails (tentativa %d)", len(pendentes), tentativa, exc_info=True)
+            if not pendentes or tentativa == self.tentativas:
+                break
+            with self._lock:
+                self.tentativas_repetidas += 1
+            # Espera exponencial com jitter, para não sincronizar os workers
+            espera = min(self.espera_inicial_segundos * 2 ** (tentativa - 1), self.espera_maxima_segundos)
+            await asyncio.sleep(espera * random.uniform(0.5, 1.0))
+
+        if pendentes:
+            logger.error("%d emails descartados após %d tentativas", len(pendentes), self.tentativas)
+        with self._lock:
+            self.lotes += 1
+            self.enviadas += len(lote) - len(pendentes)
+            self.descartadas += len(pendentes)
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            return {
+                "pendentes": self._fila.qsize() if self._fila is not None else 0,
+                "reservadas": self._reservadas,
+                "enfileiradas": self.enfileiradas,
+                "enviadas": self.enviadas,
+                "descartadas": self.descartadas,
+                "rejeitadas": self.rejeitadas,
+                "tentativas_repetidas": self.tentativas_repetidas,
+                "lotes": self.lotes,
+            }
+
+def criar_transporte() -> Transporte:
+    if EMAIL_TRANSPORTE == "smtp":
+        return TransporteSMTP(smtp_server, smtp_port, smtp_sender, smtp_usuario, smtp_senha)
+    return TransporteArquivo(EMAIL_ARQUIVO, smtp_sender)
+
+fila_emails = FilaEmails(
+    transporte=criar_transporte(),
+    tamanho_maximo=EMAIL_FILA_TAMANHO_MAXIMO,
+    tamanho_lote=EMAIL_LOTE_TAMANHO,
+    tentativas=EMAIL_TENTATIVAS,
+    espera_inicial_segundos=EMAIL_ESPERA_INICIAL_SEGUNDOS,
+    espera_maxima_segundos=EMAIL_ESPERA_MAXIMA_SEGUNDOS,
+    retry_after_segundos=EMAIL_RETRY_AFTER_SEGUNDOS,
+)
@@ -0,0 +1,70 @@
+"""
+ETags e requisições condicionais (If-None-Match / If-Match).
+
+- Tarefa e usuário: `"t<id>.<versao>"` e `"u<id>.<versao>"`, a partir da
+  coluna `versao`, incrementada pelo ORM a cada UPDATE.
+- Listagem de tarefas: `"c<usuario_id>.<versao_tarefas>.<parâmetros>"`, a
+  partir da versão da coleção do usuário, incrementada a cada escrita em
+  suas tarefas, seguida do formato negociado, exceto JSON (`.msgpack`,
+  `.colunar`). Com ela, um 304 é respondido sem consultar as tarefas.
+"""
+
+import hashlib
+from typing import Any, Optional
+from fastapi import HTTPException, Response, status
+from pydantic import BaseModel
+
+def etag_tarefa(tarefa_id: int, versao: int) -> str:
+    return f'"t{tarefa_id}.{versao}"'
+
+def etag_usuario(usuario_id: int, versao: int) -> str:
+    return f'"u{usuario_id}.{versao}"'
+
+def etag_colecao(
+    usuario_id: int,
+    versao: int,
+    parametros: Optional[BaseModel] = None,
+    formato: str = "json"
+) -> str:
+    """
+    ETag de uma listagem: a mesma versão da coleção com outros filtros, ou
+    em outro formato, é outra representação
+    """
+    
+    etag = f"c{usuario_id}.{versao}"
+    if parametros is not None:
+        etag += "." + hashlib.blake2b(parametros.model_dump_json().encode(), digest_size=8).hexdigest()
+    if formato != "json":
+        etag += f".{formato}"
+    return f'"{etag}"'
+
+def _etags(cabecalho: str) -> list[str]:
+    return [valor.strip() for valor in cabecalho.split(",") if valor.strip()]
+
+def checar_nao_modificado(if_none_match: Optional[str], etag: str) -> None:
+    """Responde 304 se o cliente já tem a representação (comparação fraca)"""
+    
+    if if_none_match is None:
+        return
+    etags = _etags(if_none_match)
+    if "*" in etags or etag in (valor.removeprefix("W/") for valor in etags):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+def checar_pre_condicao(if_match: Optional[str], etag: str, detail: str) -> None:
+    """Responde 412 se o recurso mudou desde a versão do cliente (comparação forte)"""
+    
+    if if_match is None:
+        return
+    etags = _etags(if_match)
+    if "*" not in etags and etag not in etags:
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail=detail, headers={"ETag": etag})
+
+def com_etag(conteudo: Any, response: Response, etag: str) -> Any:
+    """
+    Adiciona o ETag à resposta, seja ela montada pelo FastAPI (`response`
+    injetado) ou retornada pronta pela rota (serialização rápida).
+    """
+    
+    destino = conteudo if isinstance(conteudo, Response) else response
+    destino.headers["ETag"] = etag
+    return conteudo
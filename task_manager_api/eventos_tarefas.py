@@ -0,0 +1,239 @@
+"""
+Eventos de alteração das tarefas em tempo real (GET /tarefas/events, SSE).
+
+Os services publicam cada escrita confirmada em `hub_eventos`, de qualquer
+thread; no event loop, o hub guarda o evento no histórico recente do usuário
+e o coloca no buffer de cada conexão aberta dele. Cada conexão é apenas uma
+corrotina aguardando o próprio buffer: conexões ociosas não ocupam threads
+nem conexões do banco.
+
+O id de cada evento é a revisão da coleção do usuário (a mesma de
+`GET /tarefas/changes`). Um buffer cheio (cliente lento) encerra a conexão;
+ao reconectar com `Last-Event-ID`, o cliente recebe do histórico os eventos
+perdidos ou, se eles não estão mais lá, um evento `sincronizar` para
+buscá-los em `GET /tarefas/changes?desde=<id>`.
+
+O hub é por worker: com vários workers, as escritas precisam chegar a todos
+por um broker (Redis pub/sub, LISTEN/NOTIFY do PostgreSQL) que chame
+`publicar` em cada um.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import AsyncIterator, NamedTuple, Optional
+from task_manager_api.config import (
+    EVENTOS_BUFFER_POR_CONEXAO,
+    EVENTOS_HISTORICO_POR_USUARIO,
+    EVENTOS_USUARIOS_COM_HISTORICO,
+    EVENTOS_HEARTBEAT_SEGUNDOS,
+    EVENTOS_RETRY_MILISSEGUNDOS,
+)
+
+EVENT_STREAM_MEDIA_TYPE = "text/event-stream"
+
+class EventoTarefa(NamedTuple):
+    revisao: int
+    tipo: str  # "criada", "alterada", "removida" ou "sincronizar"
+    dados: str  # JSON, serializado uma única vez na publicação
+
+    def formatar(self, com_id: bool = True) -> str:
+        """Quadro SSE do evento"""
+        id_evento = f"id: {self.revisao}\n" if com_id else ""
+        return f"{id_evento}event: {self.tipo}\ndata: {self.dados}\n\n"
+
+class Conexao:
+    """Uma conexão aberta: buffer limitado de eventos a enviar."""
+
+    __slots__ = ("usuario_id", "fila", "descartada")
+
+    def __init__(self, usuario_id: int, tamanho_buffer: int):
+        self.usuario_id = usuario_id
+        self.fila: asyncio.Queue[Optional[EventoTarefa]] = asyncio.Queue(maxsize=tamanho_buffer)
+        self.descartada = False
+
+class HubEventos:
+    """
+    Pub/sub em memória (por worker) dos eventos de tarefas por usuário.
+    Deve ser iniciado e encerrado no event loop da aplicação (`lifespan`);
+    antes disso, as publicações são ignoradas.
+    """
+
+    def __init__(
+        self,
+        tamanho_buffer: int,
+        tamanho_historico: int,
+        usuarios_com_historico: int,
+        heartbeat_segundos: float,
+        retry_milissegundos: int
+    ):
+        self.tamanho_buffer = tamanho_buffer
+        self.tamanho_historico = tamanho_historico
+        self.usuarios_com_historico = usuarios_com_historico
+        self.heartbeat_segundos = heartbeat_segundos
+        self.retry_milissegundos = retry_milissegundos
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._conexoes: dict[int, set[Conexao]] = {}
+        self._historicos: OrderedDict[int, deque[EventoTarefa]] = OrderedDict()
+        # Os contadores de publicação são alterados em outras threads
+        self._lock = threading.Lock()
+        self.publicados = 0
+        self.entregues = 0
+        self.descartadas = 0
+        self.retomadas = 0
+        self.sincronizacoes = 0
+
+    def iniciar(self) -> None:
+        self._loop = asyncio.get_running_loop()
+
+    def encerrar(self) -> None:
+        """Encerra as conexões abertas e para de aceitar publicações."""
+
+        self._loop = None
+        for conexoes in list(self._conexoes.values()):
+            for conexao in list(conexoes):
+                self._encerrar_conexao(conexao)
+
+    def publicar(self, usuario_id: int, evento: EventoTarefa) -> None:
+        """Publica o evento para o usuário; pode ser chamada de qualquer thread."""
+
+        loop = self._loop
+        if loop is None:
+            return
+        with self._lock:
+            self.publicados += 1
+        try:
+            loop.call_soon_threadsafe(self._entregar, usuario_id, evento)
+        except RuntimeError:
+            # Event loop já encerrado
+            pass
+
+    def _entregar(self, usuario_id: int, evento: EventoTarefa) -> None:
+        historico = self._historicos.get(usuario_id)
+        if historico is None:
+            historico = self._historicos[usuario_id] = deque(maxlen=self.tamanho_historico)
+            if len(self._historicos) > self.usuarios_com_historico:
+                self._historicos.popitem(last=False)
+        else:
+            self._historicos.move_to_end(usuario_id)
+        historico.append(evento)
+
+        for conexao in list(self._conexoes.get(usuario_id, ())):
+            try:
+                conexao.fila.put_nowait(evento)
+                self.entregues += 1
+            except asyncio.QueueFull:
+                # Cliente lento: descartado, em vez de acumular eventos sem limite
+                self.descartadas += 1
+                self._encerrar_conexao(conexao)
+
+    def conectar(
+        self,
+        usuario_id: int,
+        ultimo_id: Optional[int],
+        versao_atual: int
+    ) -> tuple[Conexao, list[str]]:
+        """
+        Abre uma conexão (no event loop) e retorna os quadros iniciais: os
+        eventos posteriores a `ultimo_id` do histórico ou, se algum deles
+        não está mais no histórico, um `sincronizar`. `versao_atual` é a
+        versão da coleção lida antes da chamada; os eventos publicados
+        depois da leitura também vêm do histórico.
+        """
+
+        conexao = Conexao(usuario_id, self.tamanho_buffer)
+        self._conexoes.setdefault(usuario_id, set()).add(conexao)
+
+        quadros = [f"retry: {self.retry_milissegundos}\n\n"]
+        if ultimo_id is None:
+            return conexao, quadros
+
+        # Sem `await` entre a inscrição e a cópia do histórico: um evento
+        # publicado depois está só no buffer; antes, só no histórico
+        perdidos = sorted(
+            (evento for evento in self._historicos.get(usuario_id, ()) if evento.revisao > ultimo_id),
+            key=lambda evento: evento.revisao
+        )
+        revisoes = {evento.revisao for evento in perdidos}
+        ultima_revisao = max(revisoes | {versao_atual})
+        if revisoes.issuperset(range(ultimo_id + 1, ultima_revisao + 1)):
+            if perdidos:
+                self.retomadas += 1
+            quadros.extend(evento.formatar() for evento in perdidos)
+        else:
+            # Sem id: o Last-Event-ID do cliente continua sendo `ultimo_id`
+            self.sincronizacoes += 1
+            dados = json.dumps({"revisao": ultima_revisao, "desde": ultimo_id}, separators=(",", ":"))
+            sincronizar = EventoTarefa(ultima_revisao, "sincronizar", dados)
+            quadros.append(sincronizar.formatar(com_id=False))
+        return conexao, quadros
+
+    def desconectar(self, conexao: Conexao) -> None:
+        conexoes = self._conexoes.get(conexao.usuario_id)
+        if conexoes is not None:
+            conexoes.discard(conexao)
+            if not conexoes:
+                del self._conexoes[conexao.usuario_id]
+
+    def _encerrar_conexao(self, conexao: Conexao) -> None:
+        conexao.descartada = True
+        self.desconectar(conexao)
+        # Libera o buffer e acorda a corrotina da conexão para ela terminar
+        while not conexao.fila.empty():
+            conexao.fila.get_nowait()
+        conexao.fila.put_nowait(None)
+
+    async def transmitir(
+        self,
+        conexao: Conexao,
+        quadros_iniciais: list[str],
+        duracao_segundos: float
+    ) -> AsyncIterator[str]:
+        """
+        Gera os quadros SSE da conexão até `duracao_segundos`, com um
+        comentário de heartbeat a cada `heartbeat_segundos` sem eventos.
+        """
+
+        fim = time.monotonic() + duracao_segundos
+        try:
+            for quadro in quadros_iniciais:
+                yield quadro
+            while True:
+                restante = fim - time.monotonic()
+                if restante <= 0:
+                    return
+                try:
+                    evento = await asyncio.wait_for(
+                        conexao.fila.get(),
+                        min(self.heartbeat_segundos, restante)
+                    )
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                if evento is None:
+                    return
+                yield evento.formatar()
+        finally:
+            self.desconectar(conexao)
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            publicados = self.publicados
+        return {
+            "conexoes": sum(len(conexoes) for conexoes in self._conexoes.values()),
+            "publicados": publicados,
+            "entregues": self.entregues,
+            "descartadas": self.descartadas,
+            "retomadas": self.retomadas,
+            "sincronizacoes": self.sincronizacoes,
+        }
+
+hub_eventos = HubEventos(
+    tamanho_buffer=EVENTOS_BUFFER_POR_CONEXAO,
+    tamanho_historico=EVENTOS_HISTORICO_POR_USUARIO,
+    usuarios_com_historico=EVENTOS_USUARIOS_COM_HISTORICO,
+    heartbeat_segundos=EVENTOS_HEARTBEAT_SEGUNDOS,
+    retry_milissegundos=EVENTOS_RETRY_MILISSEGUNDOS,
+)
@@ -0,0 +1,221 @@
+"""
+Formatos negociados das listagens de tarefas.
+
+O formato do corpo vem do `Accept`:
+
+- `application/json` (padrão): o mesmo JSON do `response_model`;
+- `application/msgpack`: o mesmo documento, em MessagePack;
+- `application/vnd.taskmanager.colunar+json`: as chaves uma única vez, em
+  `campos`, e cada item como uma lista de valores, em `itens`.
+
+Corpos a partir de `COMPRESSAO_TAMANHO_MINIMO` bytes são comprimidos com
+brotli ou gzip, conforme o `Accept-Encoding`. O ETag da listagem inclui o
+formato; com compressão, ele é enviado como ETag fraco (`W/`), já que os
+bytes diferem dos da mesma representação sem compressão.
+
+Os corpos codificados ficam em `cache_respostas`, indexados pelo ETag, pelo
+formato e pela compressão. Como o ETag muda a cada escrita na coleção, uma
+entrada nunca fica desatualizada; as que deixam de ser usadas saem por LRU.
+"""
+
+import gzip
+import threading
+from collections import OrderedDict
+from typing import Any, NamedTuple, Optional
+import brotli
+from fastapi import Response
+from task_manager_api.config import (
+    COMPRESSAO_TAMANHO_MINIMO,
+    COMPRESSAO_NIVEL_GZIP,
+    COMPRESSAO_QUALIDADE_BROTLI,
+    RESPOSTAS_CACHE_BYTES_MAXIMOS,
+    RESPOSTAS_CACHE_BYTES_POR_ITEM,
+)
+
+# As respostas das listagens dependem destes cabeçalhos da requisição
+VARY = "Accept, Accept-Encoding"
+
+class Formato(NamedTuple):
+    nome: str
+    media_type: str
+    aliases: tuple[str, ...] = ()
+
+JSON = Formato("json", "application/json")
+MSGPACK = Formato("msgpack", "application/msgpack", ("application/x-msgpack", "application/vnd.msgpack"))
+COLUNAR = Formato("colunar", "application/vnd.taskmanager.colunar+json")
+
+# Em caso de empate no Accept, vale a ordem destas tuplas
+FORMATOS = (JSON, MSGPACK, COLUNAR)
+CODIFICACOES = ("br", "gzip")
+
+# Formatos alternativos do 200 das listagens, para o OpenAPI
+RESPOSTAS_NEGOCIADAS = {
+    200: {
+        "description": "Listagem no formato negociado pelo `Accept`",
+        "content": {MSGPACK.media_type: {}, COLUNAR.media_type: {}},
+    }
+}
+
+class Negociacao(NamedTuple):
+    formato: Formato
+    codificacao: Optional[str]  # "br", "gzip" ou None (sem compressão)
+
+    @property
+    def padrao(self) -> bool:
+        """JSON sem compressão: a resposta segue o caminho de sempre da rota"""
+        return self.formato is JSON and self.codificacao is None
+
+class CorpoCodificado(NamedTuple):
+    corpo: bytes
+    codificacao: Optional[str]  # a aplicada: None abaixo do tamanho mínimo
+
+def _preferencias(cabecalho: str) -> dict[str, float]:
+    """Valores de um cabeçalho Accept* (em minúsculas) e seus pesos `q`"""
+
+    preferencias: dict[str, float] = {}
+    for parte in cabecalho.split(","):
+        valor, *parametros = parte.split(";")
+        valor = valor.strip().lower()
+        if not valor:
+            continue
+        peso = 1.0
+        for parametro in parametros:
+            nome, _, numero = parametro.partition("=")
+            if nome.strip().lower() == "q":
+                try:
+                    peso = float(numero)
+                except ValueError:
+                    peso = 0.0
+        preferencias[valor] = peso
+    return preferencias
+
+def _peso_formato(preferencias: dict[str, float], formato: Formato) -> float:
+    for media_type in (formato.media_type, *formato.aliases):
+        if media_type in preferencias:
+            return preferencias[media_type]
+    tipo = formato.media_type.split("/")[0]
+    return preferencias.get(f"{tipo}/*", preferencias.get("*/*", 0.0))
+
+def negociar(accept: Optional[str], accept_encoding: Optional[str]) -> Negociacao:
+    """
+    Escolhe o formato e a compressão de maior peso. Sem nenhum formato
+    aceitável, responde em JSON: o `Accept` é tratado como preferência.
+    """
+
+    formato, peso_formato = JSON, 0.0
+    if accept:
+        preferencias = _preferencias(accept)
+        for candidato in FORMATOS:
+            peso = _peso_formato(preferencias, candidato)
+            if peso > peso_formato:
+                formato, peso_formato = candidato, peso
+
+    codificacao = None
+    if accept_encoding:
+        preferencias = _preferencias(accept_encoding)
+        melhor, peso_melhor = None, 0.0
+        for candidata in CODIFICACOES:
+            peso = preferencias.get(candidata, preferencias.get("*", 0.0))
+            if peso > peso_melhor:
+                melhor, peso_melhor = candidata, peso
+        # Sem compressão só vence se o cliente pedir `identity` com peso maior
+        if melhor is not None and peso_melhor >= preferencias.get("identity", 0.0):
+            codificacao = melhor
+
+    return Negociacao(formato, codificacao)
+
+def comprimir(corpo: bytes, codificacao: Optional[str]) -> CorpoCodificado:
+    """Comprime o corpo com a codificação negociada, se ele tiver o tamanho mínimo"""
+
+    if codificacao is None or len(corpo) < COMPRESSAO_TAMANHO_MINIMO:
+        return CorpoCodificado(corpo, None)
+    if codificacao == "br":
+        return CorpoCodificado(brotli.compress(corpo, quality=COMPRESSAO_QUALIDADE_BROTLI), "br")
+    # mtime=0: o mesmo corpo sempre gera os mesmos bytes
+    return CorpoCodificado(gzip.compress(corpo, compresslevel=COMPRESSAO_NIVEL_GZIP, mtime=0), "gzip")
+
+def montar_resposta(codificado: CorpoCodificado, formato: Formato, etag: str) -> Response:
+    headers = {"Vary": VARY}
+    if codificado.codificacao:
+        headers["Content-Encoding"] = codificado.codificacao
+        headers["ETag"] = f"W/{etag}"
+    else:
+        headers["ETag"] = etag
+    return Response(codificado.corpo, media_type=formato.media_type, headers=headers)
+
+def resposta_em_cache(etag: str, negociacao: Negociacao) -> Optional[Response]:
+    codificado = cache_respostas.get(etag, negociacao)
+    if codificado is None:
+        return None
+    return montar_resposta(codificado, negociacao.formato, etag)
+
+def com_vary(conteudo: Any, response: Response) -> Any:
+    """Adiciona o `Vary` a uma listagem respondida no caminho padrão (JSON sem compressão)"""
+
+    destino = conteudo if isinstance(conteudo, Response) else response
+    destino.headers["Vary"] = VARY
+    return conteudo
+
+class CacheRespostas:
+    """
+    Cache LRU (por worker) dos corpos codificados das listagens, limitado
+    pelo total de bytes. Corpos maiores que `bytes_por_item` não são guardados.
+    """
+
+    def __init__(self, bytes_maximos: int, bytes_por_item: int):
+        self.bytes_maximos = bytes_maximos
+        self.bytes_por_item = bytes_por_item
+        self._entradas: OrderedDict[tuple, CorpoCodificado] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _chave(etag: str, negociacao: Negociacao) -> tuple:
+        return (etag, negociacao.formato.nome, negociacao.codificacao)
+
+    def get(self, etag: str, negociacao: Negociacao) -> Optional[CorpoCodificado]:
+        chave = self._chave(etag, negociacao)
+        with self._lock:
+            codificado = self._entradas.get(chave)
+            if codificado is None:
+                self.misses += 1
+                return None
+            self._entradas.move_to_end(chave)
+            self.hits += 1
+            return codificado
+
+    def set(self, etag: str, negociacao: Negociacao, codificado: CorpoCodificado) -> None:
+        tamanho = len(codificado.corpo)
+        if tamanho > self.bytes_por_item:
+            return
+        chave = self._chave(etag, negociacao)
+        with self._lock:
+            anterior = self._entradas.pop(chave, None)
+            if anterior is not None:
+                self._bytes -= len(anterior.corpo)
+            self._entradas[chave] = codificado
+            self._bytes += tamanho
+            while self._bytes > self.bytes_maximos:
+                _, removido = self._entradas.popitem(last=False)
+                self._bytes -= len(removido.corpo)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            return {
+                "entradas": len(self._entradas),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+cache_respostas = CacheRespostas(
+    bytes_maximos=RESPOSTAS_CACHE_BYTES_MAXIMOS,
+    bytes_por_item=RESPOSTAS_CACHE_BYTES_POR_ITEM,
+)
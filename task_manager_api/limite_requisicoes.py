@@ -0,0 +1,138 @@
+"""
+Limite de requisições por token bucket.
+
+Cada política (rota + tipo de chave, ex.: `("token", "ip")`) define a
+rajada permitida e a reposição por minuto. Cada valor da chave (um IP, um
+username) tem seu próprio balde; uma requisição retira uma ficha de cada
+balde aplicável e, se algum estiver vazio, é rejeitada com 429 e
+`Retry-After`, antes de qualquer acesso ao banco ou verificação de senha.
+
+Os baldes ficam em um `ArmazenamentoLimites`: `ArmazenamentoMemoria` mantém
+os baldes por worker; um armazenamento compartilhado (Redis, por exemplo)
+implementa o mesmo `consumir` de forma atômica no servidor.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Protocol
+from fastapi import HTTPException, Request, status
+from task_manager_api.config import (
+    LIMITES_REQUISICOES_ATIVOS,
+    LIMITES_REQUISICOES,
+    LIMITES_REQUISICOES_CHAVES_MAXIMAS,
+)
+
+class PoliticaLimite(NamedTuple):
+    rajada: int
+    por_minuto: float
+
+class ArmazenamentoLimites(Protocol):
+    async def consumir(self, chave: str, politica: PoliticaLimite) -> float:
+        """
+        Retira uma ficha do balde da chave. Retorna 0 se havia ficha, ou os
+        segundos até a próxima ficha (sem retirar nada).
+        """
+
+class ArmazenamentoMemoria:
+    """
+    Baldes em memória (por worker), com no máximo `chaves_maximas` chaves:
+    as usadas há mais tempo são descartadas (voltam cheias).
+    """
+
+    def __init__(self, chaves_maximas: int):
+        self.chaves_maximas = chaves_maximas
+        self._baldes: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def consumir(self, chave: str, politica: PoliticaLimite) -> float:
+        agora = time.monotonic()
+        por_segundo = politica.por_minuto / 60
+        with self._lock:
+            balde = self._baldes.get(chave)
+            if balde is None:
+                balde = self._baldes[chave] = [float(politica.rajada), agora]
+                if len(self._baldes) > self.chaves_maximas:
+                    self._baldes.popitem(last=False)
+            else:
+                self._baldes.move_to_end(chave)
+                fichas, atualizado_em = balde
+                balde[0] = min(float(politica.rajada), fichas + (agora - atualizado_em) * por_segundo)
+                balde[1] = agora
+
+            if balde[0] >= 1:
+                balde[0] -= 1
+                return 0.0
+            return (1 - balde[0]) / por_segundo
+
+    def __len__(self) -> int:
+        return len(self._baldes)
+
+class LimitadorRequisicoes:
+    def __init__(
+        self,
+        armazenamento: ArmazenamentoLimites,
+        politicas: dict[str, dict[str, tuple[int, float]]],
+        ativo: bool = True
+    ):
+        self.armazenamento = armazenamento
+        self.politicas = {
+            rota: {tipo: PoliticaLimite(*valores) for tipo, valores in por_tipo.items()}
+            for rota, por_tipo in politicas.items()
+        }
+        for rota, por_tipo in self.politicas.items():
+            for tipo, politica in por_tipo.items():
+                if politica.rajada < 1 or politica.por_minuto <= 0:
+                    raise ValueError(f"Política de limite inválida para {rota}/{tipo}: {politica}")
+        self.ativo = ativo
+        self._lock = threading.Lock()
+        self.permitidas = 0
+        self.rejeitadas = 0
+
+    async def verificar(self, rota: str, chaves: dict[str, Optional[str]]) -> None:
+        """
+        Consome uma ficha de cada política da rota com chave informada
+        (`{"ip": "1.2.3.4", "username": "ana"}`); responde 429 no primeiro
+        balde vazio.
+        """
+
+        if not self.ativo:
+            return
+        for tipo, politica in self.politicas.get(rota, {}).items():
+            valor = chaves.get(tipo)
+            if not valor:
+                continue
+            espera = await self.armazenamento.consumir(f"{rota}:{tipo}:{valor}", politica)
+            if espera > 0:
+                with self._lock:
+                    self.rejeitadas += 1
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Muitas tentativas, tente novamente mais tarde.",
+                    headers={"Retry-After": str(max(1, math.ceil(espera)))},
+                )
+        with self._lock:
+            self.permitidas += 1
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            estatisticas = {"permitidas": self.permitidas, "rejeitadas": self.rejeitadas}
+        if isinstance(self.armazenamento, ArmazenamentoMemoria):
+            estatisticas["chaves"] = len(self.armazenamento)
+        return estatisticas
+
+def ip_cliente(request: Request) -> Optional[str]:
+    """
+    IP de quem fez a requisição. Atrás de um proxy, o uvicorn deve ser
+    iniciado com `--proxy-headers --forwarded-allow-ips <ip do proxy>`
+    para que este seja o IP do cliente, e não o do proxy.
+    """
+
+    return request.client.host if request.client else None
+
+limitador = LimitadorRequisicoes(
+    armazenamento=ArmazenamentoMemoria(LIMITES_REQUISICOES_CHAVES_MAXIMAS),
+    politicas=LIMITES_REQUISICOES,
+    ativo=LIMITES_REQUISICOES_ATIVOS,
+)
@@ -0,0 +1,293 @@
+"""
+Instrumentação de desempenho por requisição.
+
+Com `METRICAS_ATIVAS`, cada requisição recebe uma `Medicao` (guardada em um
+`ContextVar`, que acompanha a requisição também nas threads do threadpool)
+onde são acumulados:
+
+- consultas ao banco e o tempo gasto nelas (eventos do SQLAlchemy);
+- tempo de autenticação (`get_usuario_autenticado`);
+- tempo de hash/verificação de senha (`executor_senhas`);
+- tempo de serialização: o da serialização rápida e o gasto entre o fim
+  da função da rota e o início da resposta (`response_model` + JSON).
+
+Ao fim da requisição, os tempos vão para o header `Server-Timing` e para
+histogramas em memória por rota (template do path), exportados em
+`GET /metrics` no formato texto do Prometheus.
+
+Com a instrumentação desligada, nada é registrado no app nem no engine; o
+que resta são as chamadas a `medir`, que apenas consultam o `ContextVar`.
+"""
+
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from task_manager_api.config import METRICAS_ATIVAS, METRICAS_BUCKETS_SEGUNDOS
+
+# Fases acumuladas em Medicao.fases, na ordem em que aparecem no Server-Timing
+FASES = ("auth", "senha", "serializacao")
+ROTA_METRICAS = "/metrics"
+
+class Medicao:
+    """Tempos acumulados de uma requisição"""
+
+    __slots__ = ("inicio", "fim_endpoint", "db_consultas", "db_tempo", "fases")
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.fim_endpoint: Optional[float] = None
+        self.db_consultas = 0
+        self.db_tempo = 0.0
+        self.fases = dict.fromkeys(FASES, 0.0)
+
+_medicao: ContextVar[Optional[Medicao]] = ContextVar("medicao", default=None)
+
+@contextmanager
+def medir(fase: str) -> Iterator[None]:
+    """Soma à fase o tempo do bloco, se houver uma requisição sendo medida"""
+
+    medicao = _medicao.get()
+    if medicao is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        medicao.fases[fase] += time.perf_counter() - inicio
+
+class Histograma:
+    """Histograma cumulativo no formato do Prometheus"""
+
+    __slots__ = ("buckets", "contagens", "soma", "total")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.contagens = [0] * len(buckets)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float) -> None:
+        indice = bisect_left(self.buckets, valor)
+        if indice < len(self.buckets):
+            self.contagens[indice] += 1
+        self.soma += valor
+        self.total += 1
+
+    def linhas(self, nome: str, rotulos: str) -> Iterator[str]:
+        acumulado = 0
+        for limite, contagem in zip(self.buckets, self.contagens):
+            acumulado += contagem
+            yield f'{nome}_bucket{{{rotulos},le="{limite}"}} {acumulado}'
+        yield f'{nome}_bucket{{{rotulos},le="+Inf"}} {self.total}'
+        yield f"{nome}_sum{{{rotulos}}} {self.soma}"
+        yield f"{nome}_count{{{rotulos}}} {self.total}"
+
+class MetricasRota:
+    """Agregados de uma rota (método + template do path)"""
+
+    __slots__ = ("duracao", "db_tempo", "db_consultas", "fases", "respostas")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.duracao = Histograma(buckets)
+        self.db_tempo = Histograma(buckets)
+        self.db_consultas = 0
+        self.fases = dict.fromkeys(FASES, 0.0)
+        self.respostas: dict[int, int] = {}
+
+class RegistroMetricas:
+    """Métricas de todas as rotas, em memória"""
+
+    def __init__(self, buckets: tuple[float, ...] = METRICAS_BUCKETS_SEGUNDOS):
+        self.buckets = buckets
+        self._rotas: dict[tuple[str, str], MetricasRota] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, metodo: str, rota: str, status_code: int, duracao: float, medicao: Medicao) -> None:
+        with self._lock:
+            metricas = self._rotas.get((metodo, rota))
+            if metricas is None:
+                metricas = self._rotas[(metodo, rota)] = MetricasRota(self.buckets)
+            metricas.duracao.observar(duracao)
+            metricas.db_tempo.observar(medicao.db_tempo)
+            metricas.db_consultas += medicao.db_consultas
+            for fase, tempo in medicao.fases.items():
+                metricas.fases[fase] += tempo
+            metricas.respostas[status_code] = metricas.respostas.get(status_code, 0) + 1
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._rotas.clear()
+
+    def exportar(self, extras: Optional[dict[str, dict]] = None) -> str:
+        """
+        Texto no formato do Prometheus. `extras` recebe estatísticas de outros
+        componentes (`{"token_cache": {"hits": 10, ...}}`), exportadas como
+        `task_manager_<componente>_<nome>`.
+        """
+
+        with self._lock:
+            rotas = sorted(self._rotas.items())
+            linhas = []
+
+            def cabecalho(nome: str, tipo: str, ajuda: str):
+                linhas.append(f"# HELP {nome} {ajuda}")
+                linhas.append(f"# TYPE {nome} {tipo}")
+
+            nome = "task_manager_requisicao_duracao_segundos"
+            cabecalho(nome, "histogram", "Duração das requisições por rota.")
+            for (metodo, rota), metricas in rotas:
+                linhas.extend(metricas.duracao.linhas(nome, _rotulos(metodo, rota)))
+
+            nome = "task_manager_db_duracao_segundos"
+            cabecalho(nome, "histogram", "Tempo gasto em consultas ao banco por requisição.")
+            for (metodo, rota), metricas in rotas:
+                linhas.extend(metricas.db_tempo.linhas(nome, _rotulos(metodo, rota)))
+
+            nome = "task_manager_db_consultas_total"
+            cabecalho(nome, "counter", "Consultas ao banco executadas.")
+            for (metodo, rota), metricas in rotas:
+                linhas.append(f"{nome}{{{_rotulos(metodo, rota)}}} {metricas.db_consultas}")
+
+            nome = "task_manager_fase_segundos_total"
+            cabecalho(nome, "counter", "Tempo acumulado por fase (auth, senha, serializacao).")
+            for (metodo, rota), metricas in rotas:
+                for fase, tempo in metricas.fases.items():
+                    linhas.append(f'{nome}{{{_rotulos(metodo, rota)},fase="{fase}"}} {tempo}')
+
+            nome = "task_manager_respostas_total"
+            cabecalho(nome, "counter", "Respostas por rota e status.")
+            for (metodo, rota), metricas in rotas:
+                for status_code, total in sorted(metricas.respostas.items()):
+                    linhas.append(f'{nome}{{{_rotulos(metodo, rota)},status="{status_code}"}} {total}')
+
+        for componente, estatisticas in (extras or {}).items():
+            for chave, valor in estatisticas.items():
+                nome = f"task_manager_{componente}_{chave}"
+                cabecalho(nome, "gauge", f"{componente}: {chave}.")
+                linhas.append(f"{nome} {valor}")
+
+        return "\n".join(linhas) + "\n"
+
+def _rotulos(metodo: str, rota: str) -> str:
+    rota = rota.replace("\\", "\\\\").replace('"', '\\"')
+    return f'metodo="{metodo}",rota="{rota}"'
+
+registro_metricas = RegistroMetricas()
+
+def _server_timing(medicao: Medicao, total: float) -> bytes:
+    partes = [f'db;dur={medicao.db_tempo * 1000:.2f};desc="{medicao.db_consultas} consultas"']
+    for fase, tempo in medicao.fases.items():
+        if tempo:
+            partes.append(f"{fase};dur={tempo * 1000:.2f}")
+    partes.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(partes).encode("latin-1")
+
+class MetricasMiddleware:
+    """Middleware ASGI que mede cada requisição HTTP"""
+
+    def __init__(self, app, registro: RegistroMetricas = registro_metricas):
+        self.app = app
+        self.registro = registro
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == ROTA_METRICAS:
+            await self.app(scope, receive, send)
+            return
+
+        medicao = Medicao()
+        token = _medicao.set(medicao)
+        status_code = 500
+
+        async def enviar(mensagem):
+            nonlocal status_code
+            if mensagem["type"] == "http.response.start":
+                status_code = mensagem["status"]
+                agora = time.perf_counter()
+                if medicao.fim_endpoint is not None:
+                    medicao.fases["serializacao"] += agora - medicao.fim_endpoint
+                headers = list(mensagem.get("headers", []))
+                headers.append((b"server-timing", _server_timing(medicao, agora - medicao.inicio)))
+                mensagem = {**mensagem, "headers": headers}
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            _medicao.reset(token)
+            rota = scope.get("route")
+            self.registro.registrar(
+                scope["method"],
+                getattr(rota, "path", "<sem rota>"),
+                status_code,
+                time.perf_counter() - medicao.inicio,
+                medicao
+            )
+
+def _antes_da_consulta(conn, cursor, statement, parameters, context, executemany):
+    if _medicao.get() is not None:
+        conn.info.setdefault("metricas_inicio", []).append(time.perf_counter())
+
+def _depois_da_consulta(conn, cursor, statement, parameters, context, executemany):
+    medicao = _medicao.get()
+    inicios = conn.info.get("metricas_inicio")
+    if medicao is None or not inicios:
+        return
+    medicao.db_tempo += time.perf_counter() - inicios.pop()
+    medicao.db_consultas += 1
+
+def instrumentar_engine(engine: Engine) -> None:
+    """Registra os eventos que medem as consultas do engine"""
+
+    if not event.contains(engine, "before_cursor_execute", _antes_da_consulta):
+        event.listen(engine, "before_cursor_execute", _antes_da_consulta)
+        event.listen(engine, "after_cursor_execute", _depois_da_consulta)
+
+def _marcar_fim_endpoint(funcao: Callable) -> Callable:
+    """Envolve a função da rota para registrar quando ela retorna"""
+
+    if inspect.iscoroutinefunction(funcao):
+        @functools.wraps(funcao)
+        async def envoltorio(*args, **kwargs):
+            try:
+                return await funcao(*args, **kwargs)
+            finally:
+                medicao = _medicao.get()
+                if medicao is not None:
+                    medicao.fim_endpoint = time.perf_counter()
+    else:
+        @functools.wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                medicao = _medicao.get()
+                if medicao is not None:
+                    medicao.fim_endpoint = time.perf_counter()
+    return envoltorio
+
+def instrumentar_app(app: FastAPI, *engines: Engine) -> None:
+    """
+    Liga a instrumentação, se `METRICAS_ATIVAS`: middleware, eventos dos
+    engines e marcação do fim das funções das rotas. Deve ser chamada depois
+    da inclusão das rotas.
+    """
+
+    if not METRICAS_ATIVAS:
+        return
+    for engine in engines:
+        instrumentar_engine(engine)
+    for rota in app.routes:
+        if isinstance(rota, APIRoute):
+            # O handler da rota lê `dependant.call` a cada requisição
+            rota.dependant.call = _marcar_fim_endpoint(rota.dependant.call)
+    app.add_middleware(MetricasMiddleware)
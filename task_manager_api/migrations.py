@@ -0,0 +1,145 @@
+"""Migrações versionadas do schema do banco de dados"""
+
+from datetime import datetime
+from typing import Callable, Optional
+from sqlalchemy import Column, DateTime, Integer, String, Table, delete, insert, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import SQLModel
+from task_manager_api.models.tarefa import Tarefa, ContadorTarefa, TarefaRemovida
+from task_manager_api.models.usuario import Usuario
+from task_manager_api import busca
+
+versao_schema = Table(
+    "versao_schema",
+    SQLModel.metadata,
+    Column("versao", Integer, primary_key=True),
+    Column("descricao", String, nullable=False),
+    Column("aplicada_em", DateTime, nullable=False),
+)
+
+# Estado mantido pela aplicação entre inicializações (nome -> valor)
+estado_banco = Table(
+    "estado_banco",
+    SQLModel.metadata,
+    Column("nome", String, primary_key=True),
+    Column("valor", String, nullable=False),
+)
+
+def _criar_indices(conn: Connection, tabela: Table, nomes: list[str]) -> None:
+    """Cria os índices declarados no modelo, ignorando os que já existem."""
+    
+    for indice in tabela.indexes:
+        if indice.name in nomes:
+            indice.create(conn, checkfirst=True)
+
+def _adicionar_coluna(conn: Connection, tabela: Table, nome: str) -> None:
+    """Adiciona a coluna declarada no modelo, se ainda não existir (colunas com server_default)."""
+    
+    if nome in {coluna["name"] for coluna in inspect(conn).get_columns(tabela.name)}:
+        return
+    coluna = tabela.c[nome]
+    tipo = coluna.type.compile(conn.dialect)
+    padrao = coluna.server_default.arg.text
+    conn.execute(text(f"ALTER TABLE {tabela.name} ADD COLUMN {nome} {tipo} NOT NULL DEFAULT {padrao}"))
+
+def _v1_indices_tarefa_usuario(conn: Connection) -> None:
+    # Não é mais declarado no modelo (a v2 o substitui e remove); a definição
+    # fica aqui para a v1 continuar fazendo o que fazia quando foi publicada
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_tarefa_usuario_id_status ON tarefa (usuario_id, status)"))
+    _criar_indices(conn, Tarefa.__table__, [
+        "ix_tarefa_usuario_id_id",
+        "ix_tarefa_usuario_id_data_criacao_id",
+    ])
+    _criar_indices(conn, Usuario.__table__, ["ix_usuario_admins"])
+
+def _v2_estatisticas_tarefa(conn: Connection) -> None:
+    # (usuario_id, status) deixou de ser declarado no modelo: é prefixo do
+    # novo índice, que também cobre as contagens por prioridade
+    _criar_indices(conn, Tarefa.__table__, ["ix_tarefa_usuario_id_status_prioridade"])
+    conn.execute(text("DROP INDEX IF EXISTS ix_tarefa_usuario_id_status"))
+    ContadorTarefa.__table__.create(conn, checkfirst=True)
+
+def _v3_busca_tarefa(conn: Connection) -> None:
+    # FTS5 só existe no SQLite; nos demais bancos a busca usa LIKE
+    if conn.dialect.name != "sqlite":
+        return
+    busca.reconstruir_indice(conn)
+
+def _v4_versoes(conn: Connection) -> None:
+    _adicionar_coluna(conn, Tarefa.__table__, "versao")
+    _adicionar_coluna(conn, Usuario.__table__, "versao")
+    _adicionar_coluna(conn, Usuario.__table__, "versao_tarefas")
+
+def _v5_alteracoes_tarefa(conn: Connection) -> None:
+    # As tarefas existentes ficam com revisão 0: chegam aos clientes pela
+    # sincronização completa (GET /tarefas/changes sem `desde`)
+    _adicionar_coluna(conn, Tarefa.__table__, "revisao")
+    _criar_indices(conn, Tarefa.__table__, ["ix_tarefa_usuario_id_revisao_id"])
+    TarefaRemovida.__table__.create(conn, checkfirst=True)
+
+def _v6_estado_banco(conn: Connection) -> None:
+    estado_banco.create(conn, checkfirst=True)
+
+# Cada migração recebe uma versão única e crescente; nunca altere uma
+# migração já publicada, adicione uma nova ao final da lista. Toda tabela,
+# coluna ou índice novo precisa de uma migração: bancos já na última versão
+# não passam pelo create_all (SCHEMA_VERIFICAR_VERSAO).
+MIGRACOES: list[tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "Índices compostos de tarefa e índice parcial de admins", _v1_indices_tarefa_usuario),
+    (2, "Índice de status/prioridade e contadores de tarefas", _v2_estatisticas_tarefa),
+    (3, "Índice de busca textual (FTS5) de tarefas", _v3_busca_tarefa),
+    (4, "Versões de tarefa e usuário (ETags)", _v4_versoes),
+    (5, "Revisão de tarefas e registro de remoções (sincronização)", _v5_alteracoes_tarefa),
+    (6, "Estado da aplicação entre inicializações", _v6_estado_banco),
+]
+
+VERSAO_SCHEMA = MIGRACOES[-1][0]
+
+def get_versao_atual(conn: Connection) -> int:
+    """Retorna a maior versão de migração aplicada (0 se nenhuma)."""
+    
+    versoes = conn.execute(select(versao_schema.c.versao)).scalars().all()
+    return max(versoes, default=0)
+
+def schema_atualizado(engine: Engine) -> bool:
+    """
+    Se o banco já registra a última migração; custa uma consulta, em vez
+    da reflexão de todas as tabelas do `create_all`.
+    """
+    
+    with engine.connect() as conn:
+        if not inspect(conn).has_table(versao_schema.name):
+            return False
+        return get_versao_atual(conn) >= VERSAO_SCHEMA
+
+def ler_estado(conn: Connection, nome: str) -> Optional[str]:
+    return conn.execute(select(estado_banco.c.valor).where(estado_banco.c.nome == nome)).scalar()
+
+def gravar_estado(conn: Connection, nome: str, valor: str) -> None:
+    conn.execute(delete(estado_banco).where(estado_banco.c.nome == nome))
+    conn.execute(insert(estado_banco).values(nome=nome, valor=valor))
+
+def aplicar_migracoes(engine: Engine) -> list[int]:
+    """
+    Aplica, em uma transação, as migrações ainda não registradas em
+    `versao_schema`. É idempotente: executar novamente não altera nada.
+    """
+    
+    aplicadas = []
+    with engine.begin() as conn:
+        versao_schema.create(conn, checkfirst=True)
+        versao_atual = get_versao_atual(conn)
+        
+        for versao, descricao, migracao in MIGRACOES:
+            if versao <= versao_atual:
+                continue
+            
+            migracao(conn)
+            conn.execute(insert(versao_schema).values(
+                versao=versao,
+                descricao=descricao,
+                aplicada_em=datetime.now(),
+            ))
+            aplicadas.append(versao)
+    
+    return aplicadas
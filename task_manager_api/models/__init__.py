@@ -1,10 +1,13 @@
 from sqlmodel import SQLModel
 
-from .usuario import Usuario
-from .tarefa import Tarefa
+from .usuario import Usuario, UsuarioAutenticado
+from .tarefa import Tarefa, ContadorTarefa, TarefaRemovida
 
 __all__ = [
     "SQLModel",
     "Usuario",
+    "UsuarioAutenticado",
     "Tarefa",
+    "ContadorTarefa",
+    "TarefaRemovida",
 ]
\ No newline at end of file
@@ -1,7 +1,8 @@
 """Modelos de dados relacionados a tarefa"""
 
 from typing import Optional
-from sqlmodel import Field, SQLModel
+from sqlalchemy.orm import declared_attr
+from sqlmodel import Field, SQLModel, Index, text
 from datetime import datetime
 from enum import Enum
 
@@ -18,10 +19,61 @@ class PrioridadeEnum(str, Enum):
 class Tarefa(SQLModel, table=True):
     """Representa o modelo do usuário"""
     
+    __table_args__ = (
+        # Listagens filtradas por status e contagens por status/prioridade
+        # (cobre o GROUP BY de /tarefas/stats sem ler a tabela)
+        Index("ix_tarefa_usuario_id_status_prioridade", "usuario_id", "status", "prioridade"),
+        # Paginação por keyset ordenada por id (e busca/cascade por usuario_id)
+        Index("ix_tarefa_usuario_id_id", "usuario_id", "id"),
+        # Paginação por keyset ordenada por data de criação
+        Index("ix_tarefa_usuario_id_data_criacao_id", "usuario_id", "data_criacao", "id"),
+        # Alterações em ordem de revisão (GET /tarefas/changes)
+        Index("ix_tarefa_usuario_id_revisao_id", "usuario_id", "revisao", "id"),
+    )
+    
     id: Optional[int] = Field(default=None, primary_key=True)
     titulo: str = Field(nullable=False)
     descricao: Optional[str] = Field(default=None)
     status: StatusEnum = Field(nullable=False)
     prioridade: PrioridadeEnum = Field(nullable=False)
     usuario_id: int = Field(foreign_key="usuario.id", nullable=False)
-    data_criacao: datetime = Field(default=datetime.now())
\ No newline at end of file
+    data_criacao: datetime = Field(default=datetime.now())
+    # Versão da linha (ETag): incrementada pelo ORM a cada UPDATE, que só é
+    # aplicado se a versão no banco ainda for a carregada (StaleDataError)
+    versao: int = Field(default=1, nullable=False, sa_column_kwargs={"server_default": text("1")})
+    # Revisão da última escrita (GET /tarefas/changes): o novo valor de
+    # usuario.versao_tarefas na transação que criou ou alterou a tarefa
+    revisao: int = Field(default=0, nullable=False, sa_column_kwargs={"server_default": text("0")})
+    
+    @declared_attr
+    def __mapper_args__(cls):
+        return {"version_id_col": cls.__table__.c.versao}
+
+class ContadorTarefa(SQLModel, table=True):
+    """
+    Quantidade de tarefas por usuário, status e prioridade, mantida a cada
+    escrita pelo `TarefaRepository` (com `ESTATISTICAS_CONTADORES`)
+    """
+    
+    __tablename__ = "contador_tarefa"
+    
+    usuario_id: int = Field(foreign_key="usuario.id", primary_key=True)
+    status: str = Field(primary_key=True)
+    prioridade: str = Field(primary_key=True)
+    quantidade: int = Field(default=0, nullable=False)
+
+class TarefaRemovida(SQLModel, table=True):
+    """
+    Registro (tombstone) de uma tarefa removida, para que GET /tarefas/changes
+    informe a remoção aos clientes que já tinham a tarefa
+    """
+    
+    __tablename__ = "tarefa_removida"
+    __table_args__ = (
+        Index("ix_tarefa_removida_usuario_id_revisao_tarefa_id", "usuario_id", "revisao", "tarefa_id"),
+    )
+    
+    tarefa_id: int = Field(primary_key=True)
+    usuario_id: int = Field(foreign_key="usuario.id", nullable=False)
+    revisao: int = Field(nullable=False)
+    removida_em: datetime = Field(nullable=False)
@@ -1,17 +1,51 @@
 """Modelos de dados relacionados ao usuário"""
 
 from typing import Optional
-from sqlmodel import Field, SQLModel
+from sqlalchemy.orm import declared_attr
+from sqlmodel import Field, SQLModel, Index, text
 from datetime import datetime
 from task_manager_api.security import HashedPassword
 
 class Usuario(SQLModel, table=True):
     """Representa o modelo do usuário"""
     
+    __table_args__ = (
+        # Índice parcial: apenas os administradores são indexados
+        Index(
+            "ix_usuario_admins",
+            "id",
+            sqlite_where=text("is_admin = 1"),
+            postgresql_where=text("is_admin"),
+        ),
+    )
+    
     id: Optional[int] = Field(default=None, primary_key=True)
     username: str = Field(unique=True, nullable=False)
     nome: str = Field(nullable=False)
     senha: HashedPassword
     email: str = Field(unique=True, nullable=False)
     is_admin: bool = Field(default=False)
-    data_criacao: datetime = Field(default=datetime.now())
\ No newline at end of file
+    data_criacao: datetime = Field(default=datetime.now())
+    # Versão da linha (ETag), incrementada pelo ORM a cada UPDATE
+    versao: int = Field(default=1, nullable=False, sa_column_kwargs={"server_default": text("1")})
+    # Versão da coleção de tarefas do usuário (ETag de GET /tarefas e
+    # revisão de GET /tarefas/changes), incrementada pelo TarefaRepository
+    # a cada escrita nas tarefas
+    versao_tarefas: int = Field(default=0, nullable=False, sa_column_kwargs={"server_default": text("0")})
+    
+    @declared_attr
+    def __mapper_args__(cls):
+        return {"version_id_col": cls.__table__.c.versao}
+
+class UsuarioAutenticado(SQLModel):
+    """Representa um snapshot imutável do usuário autenticado (sem a senha)"""
+    
+    model_config = {"frozen": True}
+    
+    id: int
+    username: str
+    nome: str
+    email: str
+    is_admin: bool
+    data_criacao: datetime
+    versao: int
@@ -0,0 +1,81 @@
+"""Utilitários de paginação por cursor (keyset)"""
+
+import base64
+import json
+from datetime import datetime
+from enum import Enum
+from fastapi import HTTPException, status
+
+class OrdenarPorEnum(str, Enum):
+    ID = "id"
+    DATA_CRIACAO = "data_criacao"
+
+class OrdemEnum(str, Enum):
+    ASC = "asc"
+    DESC = "desc"
+
+CURSOR_INVALIDO = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST,
+    detail="Cursor inválido.",
+)
+
+def _codificar(dados: dict) -> str:
+    bruto = json.dumps(dados, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(bruto).rstrip(b"=").decode()
+
+def _decodificar(cursor: str) -> dict:
+    preenchimento = "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(cursor + preenchimento))
+
+def codificar_cursor(
+    ordenar_por: OrdenarPorEnum,
+    ordem: OrdemEnum,
+    data_criacao: datetime,
+    id: int
+) -> str:
+    """Gera um cursor opaco a partir da última linha da página"""
+    
+    chave = [id] if ordenar_por == OrdenarPorEnum.ID else [data_criacao.isoformat(), id]
+    return _codificar({"o": ordenar_por.value, "d": ordem.value, "k": chave})
+
+def decodificar_cursor(
+    cursor: str,
+    ordenar_por: OrdenarPorEnum,
+    ordem: OrdemEnum
+) -> tuple:
+    """
+    Decodifica o cursor e retorna a chave (keyset) da última linha vista.
+    O cursor só é aceito com a mesma ordenação que o gerou.
+    """
+    
+    try:
+        dados = _decodificar(cursor)
+        if dados["o"] != ordenar_por.value or dados["d"] != ordem.value:
+            raise CURSOR_INVALIDO
+        
+        chave = dados["k"]
+        if ordenar_por == OrdenarPorEnum.ID:
+            (id,) = chave
+            return (int(id),)
+        
+        data_criacao, id = chave
+        return (datetime.fromisoformat(data_criacao), int(id))
+    except (ValueError, KeyError, TypeError):
+        raise CURSOR_INVALIDO
+
+def codificar_cursor_alteracoes(revisao: int, id: int, desde: int) -> str:
+    """
+    Cursor de GET /tarefas/changes: a última alteração da página
+    (revisão, id) e a revisão a partir da qual as remoções são informadas
+    """
+    
+    return _codificar({"r": revisao, "i": id, "desde": desde})
+
+def decodificar_cursor_alteracoes(cursor: str) -> tuple[int, int, int]:
+    """Retorna (revisão, id, desde) do cursor gerado por `codificar_cursor_alteracoes`"""
+    
+    try:
+        dados = _decodificar(cursor)
+        return int(dados["r"]), int(dados["i"]), int(dados["desde"])
+    except (ValueError, KeyError, TypeError):
+        raise CURSOR_INVALIDO
@@ -1,26 +1,537 @@
 """Repositório para operações relacionadas à tarefa."""
 
-from task_manager_api.models.tarefa import Tarefa
-from sqlmodel import Session, select
+from collections import Counter
+from typing import Iterable, Iterator, Optional, Sequence
+from datetime import datetime
+from task_manager_api.models.tarefa import Tarefa, ContadorTarefa, TarefaRemovida, StatusEnum, PrioridadeEnum
+from task_manager_api.models.usuario import Usuario
+from task_manager_api.pagination import OrdenarPorEnum, OrdemEnum
+from task_manager_api.config import ESTATISTICAS_CONTADORES, BUSCA_CANDIDATOS_MAXIMO
+from task_manager_api import busca
+from task_manager_api.roteamento_banco import dialeto, leitura
+from sqlalchemy import inspect, literal, union_all, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Row
+from sqlmodel import Session, select, and_, or_, delete, insert, func
+
+def _valor(campo) -> str:
+    """Valor do enum (ou a própria string), usado nas chaves dos contadores"""
+    return getattr(campo, "value", campo)
 
 class TarefaRepository:    
     def __init__(self, db_session: Session):
         self.db_session = db_session
 
+    @leitura
     def get_tarefas_por_usuario_id(self, usuario_id: int) -> list[Tarefa]:
         tarefas = self.db_session.exec(select(Tarefa).where(Tarefa.usuario_id == usuario_id)).all()
         return tarefas
     
+    @leitura
+    def get_tarefas_paginadas(
+        self,
+        usuario_id: int,
+        limite: int,
+        cursor: Optional[tuple] = None,
+        status: Optional[StatusEnum] = None,
+        prioridade: Optional[PrioridadeEnum] = None,
+        criada_apos: Optional[datetime] = None,
+        criada_antes: Optional[datetime] = None,
+        ordenar_por: OrdenarPorEnum = OrdenarPorEnum.ID,
+        ordem: OrdemEnum = OrdemEnum.ASC
+    ) -> list[Tarefa]:
+        """
+        Retorna até `limite` tarefas do usuário posteriores ao `cursor`,
+        usando paginação por keyset: o custo da consulta não depende
+        da profundidade da página.
+        """
+        
+        query = select(Tarefa).where(Tarefa.usuario_id == usuario_id)
+        
+        if status is not None:
+            query = query.where(Tarefa.status == status)
+        if prioridade is not None:
+            query = query.where(Tarefa.prioridade == prioridade)
+        if criada_apos is not None:
+            query = query.where(Tarefa.data_criacao >= criada_apos)
+        if criada_antes is not None:
+            query = query.where(Tarefa.data_criacao < criada_antes)
+        
+        descendente = ordem == OrdemEnum.DESC
+        
+        if cursor is not None:
+            if ordenar_por == OrdenarPorEnum.ID:
+                (ultimo_id,) = cursor
+                query = query.where(Tarefa.id < ultimo_id if descendente else Tarefa.id > ultimo_id)
+            else:
+                ultima_data, ultimo_id = cursor
+                if descendente:
+                    query = query.where(or_(
+                        Tarefa.data_criacao < ultima_data,
+                        and_(Tarefa.data_criacao == ultima_data, Tarefa.id < ultimo_id)
+                    ))
+                else:
+                    query = query.where(or_(
+                        Tarefa.data_criacao > ultima_data,
+                        and_(Tarefa.data_criacao == ultima_data, Tarefa.id > ultimo_id)
+                    ))
+        
+        colunas = [Tarefa.id] if ordenar_por == OrdenarPorEnum.ID else [Tarefa.data_criacao, Tarefa.id]
+        query = query.order_by(*[c.desc() if descendente else c.asc() for c in colunas])
+        
+        tarefas = self.db_session.exec(query.limit(limite)).all()
+        return tarefas
+    
+    def iter_tarefas_por_usuario_id(
+        self,
+        usuario_id: int,
+        tamanho_lote: int
+    ) -> Iterator[Sequence[Row]]:
+        """
+        Percorre as tarefas do usuário em lotes de linhas (sem objetos ORM),
+        com o cursor no servidor (`yield_per`): a memória usada não depende
+        da quantidade de tarefas.
+        """
+        
+        resultado = self.db_session.exec(
+            select(*Tarefa.__table__.c)
+            .where(Tarefa.usuario_id == usuario_id)
+            .order_by(Tarefa.id)
+            .execution_options(yield_per=tamanho_lote)
+        )
+        yield from resultado.partitions()
+    
+    @leitura
+    def buscar_tarefas(self, usuario_id: int, termos: list[str], limite: int) -> list[Tarefa]:
+        """
+        Até `limite` tarefas do usuário com todos os `termos` (palavras, sem
+        sintaxe de consulta) no título ou na descrição, da mais relevante
+        para a menos relevante entre as `BUSCA_CANDIDATOS_MAXIMO` mais
+        recentes. Fora do SQLite, usa LIKE e ordena por id.
+        """
+        
+        if not self._usa_fts:
+            query = select(Tarefa).where(Tarefa.usuario_id == usuario_id)
+            for termo in termos:
+                query = query.where(or_(
+                    Tarefa.titulo.icontains(termo, autoescape=True),
+                    Tarefa.descricao.icontains(termo, autoescape=True)
+                ))
+            return self.db_session.exec(query.order_by(Tarefa.id.desc()).limit(limite)).all()
+        
+        ids = self.db_session.exec(
+            busca.BUSCAR,
+            params={
+                "consulta": busca.consulta_fts(usuario_id, termos),
+                "candidatos": max(limite, BUSCA_CANDIDATOS_MAXIMO),
+                "limite": limite,
+            }
+        ).scalars().all()
+        tarefas = {tarefa.id: tarefa for tarefa in self.get_tarefas_por_ids(ids)} if ids else {}
+        return [tarefas[tarefa_id] for tarefa_id in ids if tarefa_id in tarefas]
+    
+    def reconstruir_indice_busca(self) -> int:
+        """Recria o índice de busca a partir das tarefas e retorna quantas foram indexadas."""
+        
+        if not self._usa_fts:
+            return 0
+        indexadas = busca.reconstruir_indice(self.db_session.connection())
+        self.db_session.commit()
+        return indexadas
+    
+    def desindexar_tarefas_por_usuario_id(self, usuario_id: int) -> None:
+        """Remove do índice de busca as tarefas do usuário (antes de removê-las)."""
+        
+        if self._usa_fts:
+            self.db_session.exec(busca.REMOVER_POR_USUARIO, params={"usuario_id": usuario_id})
+    
+    @leitura
+    def get_versao_colecao(self, usuario_id: int) -> int:
+        """Versão das tarefas do usuário, incrementada a cada escrita nelas."""
+        
+        versao = self.db_session.exec(
+            select(Usuario.versao_tarefas).where(Usuario.id == usuario_id)
+        ).first()
+        return versao or 0
+    
+    @leitura
+    def get_alteracoes(
+        self,
+        usuario_id: int,
+        limite: int,
+        apos: tuple[int, Optional[int]],
+        removidas_desde: int
+    ) -> list[Row]:
+        """
+        Até `limite` alterações (revisao, id, removida) das tarefas do usuário
+        posteriores a `apos` (revisão, id; id None para "depois da revisão"),
+        em ordem de revisão e id. Tarefas e remoções (estas, só com revisão
+        maior que `removidas_desde`) são lidas em uma única consulta, no
+        mesmo snapshot.
+        """
+        
+        def posteriores(revisao, id):
+            ultima_revisao, ultimo_id = apos
+            if ultimo_id is None:
+                return revisao > ultima_revisao
+            # O `>=` redundante limita a leitura do índice às revisões seguintes
+            return and_(
+                revisao >= ultima_revisao,
+                or_(revisao > ultima_revisao, and_(revisao == ultima_revisao, id > ultimo_id))
+            )
+        
+        # Cada parte lê no máximo `limite` entradas do seu índice (usuario_id, revisao, id)
+        alteradas = (
+            select(Tarefa.revisao, Tarefa.id, literal(False).label("removida"))
+            .where(Tarefa.usuario_id == usuario_id, posteriores(Tarefa.revisao, Tarefa.id))
+            .order_by(Tarefa.revisao, Tarefa.id)
+            .limit(limite)
+        )
+        removidas = (
+            select(TarefaRemovida.revisao, TarefaRemovida.tarefa_id, literal(True))
+            .where(
+                TarefaRemovida.usuario_id == usuario_id,
+                TarefaRemovida.revisao > removidas_desde,
+                posteriores(TarefaRemovida.revisao, TarefaRemovida.tarefa_id)
+            )
+            .order_by(TarefaRemovida.revisao, TarefaRemovida.tarefa_id)
+            .limit(limite)
+        )
+        
+        alteracoes = union_all(alteradas.subquery().select(), removidas.subquery().select()).subquery()
+        linhas = self.db_session.exec(
+            select(alteracoes.c.revisao, alteracoes.c.id, alteracoes.c.removida)
+            .order_by(alteracoes.c.revisao, alteracoes.c.id)
+            .limit(limite)
+        ).all()
+        return linhas
+    
+    @leitura
     def get_tarefa_por_id(self, tarefa_id: int) -> Tarefa | None:
         tarefa = self.db_session.get(Tarefa, tarefa_id)
         return tarefa
 
+    @leitura
+    def count_tarefas_por_usuario_id(self, usuario_id: int) -> int:
+        total = self.db_session.exec(
+            select(func.count()).select_from(Tarefa).where(Tarefa.usuario_id == usuario_id)
+        ).one()
+        return total
+    
+    @leitura
+    def get_tarefas_por_ids(self, tarefa_ids: list[int]) -> list[Tarefa]:
+        tarefas = self.db_session.exec(select(Tarefa).where(Tarefa.id.in_(tarefa_ids))).all()
+        return tarefas
+
+    @leitura
+    def contar_por_status_prioridade(self, usuario_id: int) -> list[tuple[str, str, int]]:
+        """
+        Quantidade de tarefas do usuário por status e prioridade, com GROUP BY
+        resolvido apenas pelo índice (usuario_id, status, prioridade).
+        """
+        
+        linhas = self.db_session.exec(
+            select(Tarefa.status, Tarefa.prioridade, func.count())
+            .where(Tarefa.usuario_id == usuario_id)
+            .group_by(Tarefa.status, Tarefa.prioridade)
+        ).all()
+        return [(_valor(status), _valor(prioridade), quantidade) for status, prioridade, quantidade in linhas]
+    
+    @leitura
+    def get_contadores(self, usuario_id: int) -> list[tuple[str, str, int]]:
+        """Mesmo resultado de `contar_por_status_prioridade`, lido de `contador_tarefa`."""
+        
+        linhas = self.db_session.exec(
+            select(ContadorTarefa.status, ContadorTarefa.prioridade, ContadorTarefa.quantidade)
+            .where(ContadorTarefa.usuario_id == usuario_id, ContadorTarefa.quantidade > 0)
+        ).all()
+        return [tuple(linha) for linha in linhas]
+    
+    def recalcular_contadores(self) -> None:
+        """Refaz os contadores de todos os usuários a partir das tarefas."""
+        
+        linhas = self.db_session.exec(
+            select(Tarefa.usuario_id, Tarefa.status, Tarefa.prioridade, func.count())
+            .group_by(Tarefa.usuario_id, Tarefa.status, Tarefa.prioridade)
+        ).all()
+        self.db_session.exec(delete(ContadorTarefa))
+        if linhas:
+            self.db_session.exec(
+                insert(ContadorTarefa.__table__),
+                params=[
+                    {
+                        "usuario_id": usuario_id,
+                        "status": _valor(status),
+                        "prioridade": _valor(prioridade),
+                        "quantidade": quantidade,
+                    }
+                    for usuario_id, status, prioridade, quantidade in linhas
+                ]
+            )
+        self.db_session.commit()
+
     def add_update_tarefa(self, tarefa: Tarefa) -> Tarefa:
+        if ESTATISTICAS_CONTADORES:
+            self._ajustar_contadores(self._deltas_alteracao([tarefa]))
+        if not inspect(tarefa).persistent or self.db_session.is_modified(tarefa):
+            # Antes do flush, para a revisão ir no mesmo INSERT/UPDATE
+            revisoes = self._nova_revisao([tarefa.usuario_id])
+            tarefa.revisao = revisoes[tarefa.usuario_id]
+        reindexar = self._texto_alterado(tarefa)
         self.db_session.add(tarefa)
+        if reindexar:
+            self.db_session.flush()
+            self._indexar([tarefa])
         self.db_session.commit()
         self.db_session.refresh(tarefa)
         return tarefa
     
-    def delete_tarefa(self, tarefa: Tarefa) -> None:
+    def delete_tarefa(self, tarefa: Tarefa) -> int:
+        """Remove a tarefa e retorna a revisão da remoção."""
+        
+        usuario_id = tarefa.usuario_id
+        if ESTATISTICAS_CONTADORES:
+            self._descontar([(usuario_id, tarefa.status, tarefa.prioridade)])
+        self._desindexar([tarefa.id])
+        revisoes = self._registrar_remocoes([(tarefa.id, usuario_id)])
         self.db_session.delete(tarefa)
-        self.db_session.commit()
\ No newline at end of file
+        self.db_session.commit()
+        return revisoes[usuario_id]
+
+    
+    def add_tarefas(self, valores: list[dict]) -> list[Tarefa]:
+        """
+        Insere as tarefas com INSERT ... RETURNING em lotes de múltiplos
+        VALUES (executemany) e um único commit. O retorno segue a ordem
+        de `valores`.
+        """
+        
+        revisoes = self._nova_revisao(valor["usuario_id"] for valor in valores)
+        valores = [{**valor, "revisao": revisoes[valor["usuario_id"]]} for valor in valores]
+        tabela = Tarefa.__table__
+        linhas = self.db_session.exec(
+            insert(tabela).returning(*tabela.c),
+            params=valores
+        ).all()
+        if ESTATISTICAS_CONTADORES:
+            self._ajustar_contadores(Counter(
+                (v["usuario_id"], _valor(v["status"]), _valor(v["prioridade"])) for v in valores
+            ))
+        self._indexar(linhas, novas=True)
+        self.db_session.commit()
+        # Os ids são gerados na ordem dos VALUES, mas a ordem do RETURNING
+        # não é garantida pelo SQLite
+        linhas = sorted(linhas, key=lambda linha: linha.id)
+        return [Tarefa(**linha._mapping) for linha in linhas]
+    
+    def update_tarefas(self, tarefas: list[Tarefa]) -> dict[int, int]:
+        """
+        Grava as tarefas já alteradas em uma única transação e retorna
+        {usuario_id: revisão} dos usuários com tarefas alteradas.
+        """
+        
+        if ESTATISTICAS_CONTADORES:
+            self._ajustar_contadores(self._deltas_alteracao(tarefas))
+        alteradas = [tarefa for tarefa in tarefas if self.db_session.is_modified(tarefa)]
+        revisoes = self._nova_revisao(tarefa.usuario_id for tarefa in alteradas)
+        for tarefa in alteradas:
+            tarefa.revisao = revisoes[tarefa.usuario_id]
+        reindexar = [tarefa for tarefa in tarefas if self._texto_alterado(tarefa)]
+        self.db_session.add_all(tarefas)
+        if reindexar:
+            self.db_session.flush()
+            self._indexar(reindexar)
+        self.db_session.commit()
+        return revisoes
+    
+    def delete_tarefas(self, tarefa_ids: list[int]) -> dict[int, int]:
+        """Remove as tarefas e retorna {usuario_id: revisão da remoção}."""
+        
+        removidas = self.db_session.exec(
+            delete(Tarefa)
+            .where(Tarefa.id.in_(tarefa_ids))
+            .returning(Tarefa.id, Tarefa.usuario_id, Tarefa.status, Tarefa.prioridade)
+        ).all()
+        self._desindexar(tarefa_ids)
+        revisoes = self._registrar_remocoes((linha.id, linha.usuario_id) for linha in removidas)
+        if ESTATISTICAS_CONTADORES:
+            self._descontar((linha.usuario_id, linha.status, linha.prioridade) for linha in removidas)
+        self.db_session.commit()
+        return revisoes
+
+    
+    def delete_lote_tarefas_por_usuario_id(self, usuario_id: int, tamanho_lote: int) -> int:
+        """
+        Remove até `tamanho_lote` tarefas do usuário em uma transação curta
+        e retorna quantas foram removidas.
+        """
+        
+        ids_lote = select(Tarefa.id).where(Tarefa.usuario_id == usuario_id).limit(tamanho_lote)
+        query = (
+            delete(Tarefa)
+            .where(Tarefa.id.in_(ids_lote))
+            .execution_options(synchronize_session=False)
+        )
+        removidas = self.db_session.exec(
+            query.returning(Tarefa.id, Tarefa.usuario_id, Tarefa.status, Tarefa.prioridade)
+        ).all()
+        self._desindexar([linha.id for linha in removidas])
+        # Sem registro das remoções: o usuário (e seus registros) também
+        # será removido; a nova revisão apenas muda o ETag da listagem
+        self._nova_revisao(linha.usuario_id for linha in removidas)
+        if ESTATISTICAS_CONTADORES:
+            self._descontar((linha.usuario_id, linha.status, linha.prioridade) for linha in removidas)
+        self.db_session.commit()
+        return len(removidas)
+    
+    @property
+    def _usa_fts(self) -> bool:
+        return dialeto(self.db_session) == "sqlite"
+    
+    @staticmethod
+    def _texto_alterado(tarefa: Tarefa) -> bool:
+        """Se a tarefa é nova ou teve título/descrição alterados (antes do flush)."""
+        
+        estado = inspect(tarefa)
+        if not estado.persistent:
+            return True
+        return estado.attrs.titulo.history.has_changes() or estado.attrs.descricao.history.has_changes()
+    
+    def _indexar(self, tarefas: Iterable, novas: bool = False) -> None:
+        """Grava no índice de busca o título e a descrição atuais das tarefas."""
+        
+        if not self._usa_fts:
+            return
+        valores = [
+            busca.linha_indice(tarefa.id, tarefa.usuario_id, tarefa.titulo, tarefa.descricao)
+            for tarefa in tarefas
+        ]
+        if not valores:
+            return
+        if not novas:
+            self._desindexar([valor["id"] for valor in valores])
+        self.db_session.exec(busca.INSERIR, params=valores)
+    
+    def _desindexar(self, tarefa_ids: list[int]) -> None:
+        if self._usa_fts and tarefa_ids:
+            self.db_session.exec(busca.REMOVER, params=[{"id": tarefa_id} for tarefa_id in tarefa_ids])
+    
+    def _nova_revisao(self, usuario_ids: Iterable[int]) -> dict[int, int]:
+        """
+        Incrementa `versao_tarefas` dos usuários na transação corrente (muda o
+        ETag das listagens) e retorna {usuario_id: nova revisão}, gravada nas
+        tarefas escritas. O UPDATE bloqueia a linha do usuário até o commit,
+        então as revisões de um usuário são confirmadas em ordem crescente.
+        """
+        
+        ids = set(usuario_ids)
+        if not ids:
+            return {}
+        tabela = Usuario.__table__
+        linhas = self.db_session.exec(
+            update(tabela)
+            .where(tabela.c.id.in_(ids))
+            .values(versao_tarefas=tabela.c.versao_tarefas + 1)
+            .returning(tabela.c.id, tabela.c.versao_tarefas)
+        ).all()
+        return dict(linhas)
+    
+    def _registrar_remocoes(self, removidas: Iterable[tuple[int, int]]) -> dict[int, int]:
+        """
+        Grava o registro (tombstone) das tarefas (id, usuario_id) removidas,
+        com a nova revisão, e retorna {usuario_id: revisão}.
+        """
+        
+        removidas = list(removidas)
+        if not removidas:
+            return {}
+        revisoes = self._nova_revisao(usuario_id for _, usuario_id in removidas)
+        agora = datetime.now()
+        tabela = TarefaRemovida.__table__
+        # O SQLite pode reutilizar o id da maior tarefa removida: o registro
+        # de uma remoção anterior do mesmo id é substituído
+        upsert = (postgresql_insert if dialeto(self.db_session) == "postgresql" else sqlite_insert)(tabela)
+        upsert = upsert.on_conflict_do_update(
+            index_elements=[tabela.c.tarefa_id],
+            set_={
+                "usuario_id": upsert.excluded.usuario_id,
+                "revisao": upsert.excluded.revisao,
+                "removida_em": upsert.excluded.removida_em,
+            }
+        )
+        self.db_session.exec(upsert, params=[
+            {"tarefa_id": tarefa_id, "usuario_id": usuario_id, "revisao": revisoes[usuario_id], "removida_em": agora}
+            for tarefa_id, usuario_id in removidas
+        ])
+        return revisoes
+    
+    def _deltas_alteracao(self, tarefas: Iterable[Tarefa]) -> Counter:
+        """
+        Variação dos contadores causada pela gravação das tarefas: +1 para as
+        novas e, nas existentes com status/prioridade alterados, -1 na
+        combinação anterior e +1 na nova. Deve ser chamado antes do flush.
+        """
+        
+        deltas = Counter()
+        for tarefa in tarefas:
+            nova = (tarefa.usuario_id, _valor(tarefa.status), _valor(tarefa.prioridade))
+            if inspect(tarefa).persistent:
+                anterior = (tarefa.usuario_id, *self._valores_anteriores(tarefa))
+                if anterior == nova:
+                    continue
+                deltas[anterior] -= 1
+            deltas[nova] += 1
+        return deltas
+    
+    def _valores_anteriores(self, tarefa: Tarefa) -> tuple[str, str]:
+        """Status e prioridade da tarefa como estão no banco (antes das alterações pendentes)."""
+        
+        estado = inspect(tarefa)
+        anteriores = []
+        for campo in ("status", "prioridade"):
+            historico = estado.attrs[campo].history
+            if historico.deleted:
+                anteriores.append(historico.deleted[0])
+            elif historico.added:
+                # Atributo expirado antes da alteração: o valor anterior
+                # só está no banco
+                with self.db_session.no_autoflush:
+                    anteriores = self.db_session.exec(
+                        select(Tarefa.status, Tarefa.prioridade).where(Tarefa.id == tarefa.id)
+                    ).one()
+                break
+            else:
+                anteriores.append(getattr(tarefa, campo))
+        status, prioridade = anteriores
+        return _valor(status), _valor(prioridade)
+    
+    def _descontar(self, linhas: Iterable[tuple]) -> None:
+        """Subtrai dos contadores as tarefas (usuario_id, status, prioridade) removidas."""
+        
+        deltas = Counter()
+        for usuario_id, status, prioridade in linhas:
+            deltas[(usuario_id, _valor(status), _valor(prioridade))] -= 1
+        self._ajustar_contadores(deltas)
+    
+    def _ajustar_contadores(self, deltas: Counter) -> None:
+        """
+        Soma os `deltas` ({(usuario_id, status, prioridade): variação}) aos
+        contadores com um único upsert (executemany), na transação corrente.
+        """
+        
+        valores = [
+            {"usuario_id": usuario_id, "status": status, "prioridade": prioridade, "quantidade": variacao}
+            for (usuario_id, status, prioridade), variacao in deltas.items()
+            if variacao
+        ]
+        if not valores:
+            return
+        
+        tabela = ContadorTarefa.__table__
+        upsert = (postgresql_insert if dialeto(self.db_session) == "postgresql" else sqlite_insert)(tabela)
+        upsert = upsert.on_conflict_do_update(
+            index_elements=[tabela.c.usuario_id, tabela.c.status, tabela.c.prioridade],
+            set_={"quantidade": tabela.c.quantidade + upsert.excluded.quantidade}
+        )
+        self.db_session.exec(upsert, params=valores)
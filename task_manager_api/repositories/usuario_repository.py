@@ -1,37 +1,67 @@
 """Repositório para operações relacionadas ao usuário."""
 
+from typing import Iterator, Optional, Sequence
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
 from task_manager_api.models.usuario import Usuario
-from .tarefa_repository import TarefaRepository
-from sqlmodel import Session, select
+from task_manager_api.models.tarefa import Tarefa, ContadorTarefa, TarefaRemovida
+from task_manager_api.repositories.tarefa_repository import TarefaRepository
+from task_manager_api.roteamento_banco import leitura
+from sqlmodel import Session, select, delete, or_
 
 class UsuarioRepository:    
     def __init__(self, db_session: Session):
         self.db_session = db_session
     
+    @leitura
     def get_usuario_por_username(self, username: str) -> Usuario | None:
         usuario = self.db_session.exec(select(Usuario).where(Usuario.username == username)).first()
         return usuario
     
-    def get_usuario_por_username_excluindo_id(self, username: str, usuario_id: int) -> Usuario | None:
-        usuario = self.db_session.exec(
-            select(Usuario).where(Usuario.username == username, Usuario.id != usuario_id)
-        ).first()
-        return usuario
-
+    @leitura
     def get_usuario_por_email(self, email: str) -> Usuario | None:
         usuario = self.db_session.exec(select(Usuario).where(Usuario.email == email)).first()
         return usuario
     
-    def get_usuario_por_email_excluindo_id(self, email: str, usuario_id: int) -> Usuario | None:
-        usuario = self.db_session.exec(
-            select(Usuario).where(Usuario.email == email, Usuario.id != usuario_id)
-        ).first()
-        return usuario
+    def get_conflitos(
+        self,
+        username: Optional[str],
+        email: Optional[str],
+        excluindo_id: Optional[int] = None
+    ) -> set[str]:
+        """
+        Retorna os campos ("username", "email") que já pertencem a outro
+        usuário, em uma única consulta pelos índices únicos.
+        """
+        
+        condicoes = []
+        if username is not None:
+            condicoes.append(Usuario.username == username)
+        if email is not None:
+            condicoes.append(Usuario.email == email)
+        if not condicoes:
+            return set()
+        
+        query = select(Usuario.username, Usuario.email).where(or_(*condicoes))
+        if excluindo_id is not None:
+            query = query.where(Usuario.id != excluindo_id)
+        
+        conflitos = set()
+        # Cada campo é único, então no máximo dois usuários colidem
+        for usuario_username, usuario_email in self.db_session.exec(query.limit(2)):
+            if username is not None and usuario_username == username:
+                conflitos.add("username")
+            if email is not None and usuario_email == email:
+                conflitos.add("email")
+        return conflitos
 
+    @leitura
     def get_usuario_por_id(self, usuario_id: int) -> Usuario | None:
         usuario = self.db_session.get(Usuario, usuario_id)
         return usuario
     
+    @leitura
     def get_admin(self, username: str) -> Usuario | None:
         usuario = self.db_session.exec(
             select(Usuario).where(
@@ -40,27 +70,72 @@ class UsuarioRepository:
             )).first()
         return usuario
     
+    @leitura
     def get_admins(self) -> list[Usuario]:
         admins = self.db_session.exec(
             select(Usuario).where(Usuario.is_admin == True)
         ).all()
         return admins
     
+    @leitura
     def get_usuarios(self) -> list[Usuario]:
         usuarios = self.db_session.exec(select(Usuario)).all()
         return usuarios
 
+    def iter_usuarios(self, tamanho_lote: int) -> Iterator[Sequence[Row]]:
+        """Percorre os usuários (sem a senha) em lotes, com `yield_per`."""
+        
+        resultado = self.db_session.exec(
+            select(
+                Usuario.id,
+                Usuario.username,
+                Usuario.nome,
+                Usuario.email,
+                Usuario.is_admin,
+                Usuario.data_criacao
+            )
+            .order_by(Usuario.id)
+            .execution_options(yield_per=tamanho_lote)
+        )
+        yield from resultado.partitions()
+
     def add_update_usuario(self, usuario: Usuario) -> Usuario:
         self.db_session.add(usuario)
-        self.db_session.commit()
+        try:
+            self.db_session.commit()
+        except (IntegrityError, StaleDataError):
+            self.db_session.rollback()
+            raise
         self.db_session.refresh(usuario)
         return usuario
     
     def delete_usuario(self, usuario: Usuario) -> None:
-        tarefa_repository = TarefaRepository(self.db_session)
-        tarefas_usuario = tarefa_repository.get_tarefas_por_usuario_id(usuario.id)
-        for tarefa in tarefas_usuario:
-            tarefa_repository.delete_tarefa(tarefa)
+        """
+        Remove as tarefas (cascade, inclusive do índice de busca), os
+        contadores, os registros de remoção e o usuário em uma única transação.
+        Se o usuário foi alterado depois da leitura (versão diferente), nada
+        é removido e o `StaleDataError` é repassado.
+        """
         
+        TarefaRepository(self.db_session).desindexar_tarefas_por_usuario_id(usuario.id)
+        self.db_session.exec(
+            delete(Tarefa)
+            .where(Tarefa.usuario_id == usuario.id)
+            .execution_options(synchronize_session=False)
+        )
+        self.db_session.exec(
+            delete(ContadorTarefa)
+            .where(ContadorTarefa.usuario_id == usuario.id)
+            .execution_options(synchronize_session=False)
+        )
+        self.db_session.exec(
+            delete(TarefaRemovida)
+            .where(TarefaRemovida.usuario_id == usuario.id)
+            .execution_options(synchronize_session=False)
+        )
         self.db_session.delete(usuario)
-        self.db_session.commit()
\ No newline at end of file
+        try:
+            self.db_session.commit()
+        except StaleDataError:
+            self.db_session.rollback()
+            raise
\ No newline at end of file
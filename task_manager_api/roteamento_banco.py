@@ -0,0 +1,178 @@
+"""
+Roteamento das consultas entre o engine de escrita e o de leitura.
+
+`SessionRoteada` envia ao engine de leitura (uma réplica ou, localmente, o
+mesmo arquivo SQLite aberto somente leitura) apenas as consultas feitas
+dentro de métodos de repositório marcados com `@leitura`, e só em sessões
+que permitem leitura roteada (as das requisições GET/HEAD). Todo o resto
+vai ao engine de escrita: flush, INSERT/UPDATE/DELETE, métodos não marcados
+e qualquer consulta feita depois de uma escrita na mesma sessão.
+
+Depois de uma escrita, as leituras do mesmo cliente (o `sub` do token)
+continuam no engine de escrita por `DB_LEITURA_JANELA_ESCRITA_SEGUNDOS`,
+para que ele leia as próprias escritas apesar do atraso da réplica. O
+registro das escritas fica em memória, por worker.
+"""
+
+import functools
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, TypeVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import ORMExecuteState
+from sqlmodel import Session
+from task_manager_api.config import (
+    DB_LEITURA_JANELA_ESCRITA_SEGUNDOS,
+    DB_LEITURA_CLIENTES_MAXIMOS,
+)
+
+METODOS_LEITURA = frozenset({"GET", "HEAD"})
+
+# Chaves em `Session.info`
+_LEITURA_PERMITIDA = "leitura_permitida"
+_EM_LEITURA = "em_leitura"
+_ESCREVEU = "escreveu"
+_CLIENTE = "cliente"
+
+F = TypeVar("F", bound=Callable)
+
+class RoteadorConsultas:
+    """
+    Registro das escritas recentes por cliente (LRU com no máximo
+    `clientes_maximos` entradas) e contagem das decisões de roteamento por engine.
+    """
+
+    def __init__(self, janela_segundos: float, clientes_maximos: int):
+        self.janela_segundos = janela_segundos
+        self.clientes_maximos = clientes_maximos
+        self._escritas: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+        self.roteadas_leitura = 0
+        self.roteadas_escrita = 0
+
+    def registrar_escrita(self, cliente: str) -> None:
+        if self.janela_segundos <= 0:
+            return
+        with self._lock:
+            self._escritas[cliente] = time.monotonic()
+            self._escritas.move_to_end(cliente)
+            if len(self._escritas) > self.clientes_maximos:
+                self._escritas.popitem(last=False)
+
+    def escrita_recente(self, cliente: str) -> bool:
+        """Se o cliente escreveu há menos de `janela_segundos`."""
+
+        with self._lock:
+            instante = self._escritas.get(cliente)
+            if instante is None:
+                return False
+            if time.monotonic() - instante < self.janela_segundos:
+                return True
+            del self._escritas[cliente]
+            return False
+
+    def contar(self, leitura: bool) -> None:
+        with self._lock:
+            if leitura:
+                self.roteadas_leitura += 1
+            else:
+                self.roteadas_escrita += 1
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            return {
+                "roteadas_leitura": self.roteadas_leitura,
+                "roteadas_escrita": self.roteadas_escrita,
+                "clientes_com_escrita_recente": len(self._escritas),
+            }
+
+roteador = RoteadorConsultas(DB_LEITURA_JANELA_ESCRITA_SEGUNDOS, DB_LEITURA_CLIENTES_MAXIMOS)
+
+class SessionRoteada(Session):
+    """
+    `Session` com um engine de leitura opcional. No modo assíncrono, é a
+    `sync_session_class` da `AsyncSession` e os engines são os `sync_engine`
+    dos engines assíncronos.
+    """
+
+    def __init__(self, *args, engine_leitura: Optional[Engine] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.engine_leitura = engine_leitura
+
+    def _rotear_para_leitura(self, clause) -> bool:
+        return (
+            self.engine_leitura is not None
+            and self.info.get(_EM_LEITURA, False)
+            and self.info.get(_LEITURA_PERMITIDA, False)
+            and not self.info.get(_ESCREVEU, False)
+            and not self._flushing
+            and not getattr(clause, "is_dml", False)
+        )
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._rotear_para_leitura(clause):
+            roteador.contar(leitura=True)
+            return self.engine_leitura
+        roteador.contar(leitura=False)
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+@event.listens_for(SessionRoteada, "after_flush")
+def _marcar_flush(session: Session, flush_context) -> None:
+    session.info[_ESCREVEU] = True
+
+@event.listens_for(SessionRoteada, "do_orm_execute")
+def _marcar_dml(estado: ORMExecuteState) -> None:
+    if estado.is_insert or estado.is_update or estado.is_delete:
+        estado.session.info[_ESCREVEU] = True
+
+@event.listens_for(SessionRoteada, "after_commit")
+def _registrar_escrita(session: Session) -> None:
+    cliente = session.info.get(_CLIENTE)
+    if cliente and session.info.get(_ESCREVEU):
+        roteador.registrar_escrita(cliente)
+
+def dialeto(session: Session) -> str:
+    """
+    Nome do dialeto do engine de escrita da sessão. Lido do engine
+    configurado, e não de `get_bind`, para não contar como uma decisão de
+    roteamento nas estatísticas.
+    """
+
+    bind = session.bind if session.bind is not None else Session.get_bind(session)
+    return bind.dialect.name
+
+def permitir_leitura(session: Session, metodo_http: str) -> None:
+    """Permite leituras roteadas na sessão de uma requisição GET/HEAD."""
+
+    session.info[_LEITURA_PERMITIDA] = metodo_http in METODOS_LEITURA
+
+def identificar_cliente(session: Session, cliente: str) -> None:
+    """
+    Associa o cliente à sessão: suas escritas passam a ser registradas e,
+    se ele escreveu há pouco, as leituras da sessão ficam no engine de escrita.
+    Deve ser chamada antes da primeira leitura que dependa dessas escritas.
+    """
+
+    session.info[_CLIENTE] = cliente
+    if roteador.escrita_recente(cliente):
+        session.info[_LEITURA_PERMITIDA] = False
+
+def leitura(metodo: F) -> F:
+    """
+    Marca um método de repositório como somente leitura: em uma
+    `SessionRoteada` que permite, suas consultas vão ao engine de leitura.
+    """
+
+    @functools.wraps(metodo)
+    def executar(self, *args, **kwargs):
+        info = self.db_session.info
+        anterior = info.get(_EM_LEITURA, False)
+        info[_EM_LEITURA] = True
+        try:
+            return metodo(self, *args, **kwargs)
+        finally:
+            info[_EM_LEITURA] = anterior
+
+    return executar
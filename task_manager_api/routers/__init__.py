@@ -1,11 +1,15 @@
 from fastapi import APIRouter
+from task_manager_api.config import METRICAS_ATIVAS
 
 from .auth_router import router as auth_router
 from .usuario_router import router as usuario_router
 from .tarefa_router import router as tarefa_router
+from .metricas_router import router as metricas_router
 
 main_router = APIRouter()
 
 main_router.include_router(auth_router, tags=["auth"])
 main_router.include_router(usuario_router, prefix="/usuarios", tags=["usuarios"])
-main_router.include_router(tarefa_router, prefix="/tarefas", tags=["tarefas"])
\ No newline at end of file
+main_router.include_router(tarefa_router, prefix="/tarefas", tags=["tarefas"])
+if METRICAS_ATIVAS:
+    main_router.include_router(metricas_router, tags=["metricas"])
@@ -1,7 +1,7 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends
 from fastapi.security import OAuth2PasswordRequestForm
-from task_manager_api.dependencies import get_auth_service
+from task_manager_api.dependencies import get_auth_service, limitar_tentativas_token
 from task_manager_api.services.auth_service import AuthService
 from task_manager_api.serializers.token_serializer import TokenResponse, RefreshToken
 from task_manager_api.services.token_service import criar_access_token, criar_refresh_token
@@ -11,13 +11,14 @@ router = APIRouter()
 
 @router.post(
     "/token",
-    response_model=TokenResponse
+    response_model=TokenResponse,
+    dependencies=[Depends(limitar_tentativas_token)]
 )
-def token(
+async def token(
     form: OAuth2PasswordRequestForm = Depends(),
     auth_service: AuthService = Depends(get_auth_service)
 ):
-    usuario = auth_service.autenticar_usuario(form.username, form.password)
+    usuario = await auth_service.autenticar_usuario(form.username, form.password)
 
     payload = {"sub": usuario.username}
 
@@ -35,11 +36,11 @@ def token(
     "/refresh-token",
     response_model=TokenResponse
 )
-def refresh_token(
+async def refresh_token(
     refresh_token_data: RefreshToken,
     auth_service: AuthService = Depends(get_auth_service)
 ):
-    usuario = auth_service.refresh_token(refresh_token_data.refresh_token)
+    usuario = await auth_service.refresh_token(refresh_token_data.refresh_token)
 
     access_token = criar_access_token(
         data={"sub": usuario.username},
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from task_manager_api.cache import token_cache
+from task_manager_api.metricas import registro_metricas, ROTA_METRICAS
+from task_manager_api.security import executor_senhas
+from task_manager_api.envio_email import fila_emails
+from task_manager_api.limite_requisicoes import limitador
+from task_manager_api.roteamento_banco import roteador
+from task_manager_api.eventos_tarefas import hub_eventos
+from task_manager_api.dependencies import autorizar_metricas
+from task_manager_api.formatos import cache_respostas
+
+router = APIRouter()
+
+@router.get(
+    ROTA_METRICAS,
+    response_class=PlainTextResponse,
+    dependencies=[Depends(autorizar_metricas)]
+)
+async def exportar_metricas():
+    texto = registro_metricas.exportar({
+        "token_cache": token_cache.estatisticas(),
+        "executor_senhas": executor_senhas.estatisticas(),
+        "fila_emails": fila_emails.estatisticas(),
+        "limite_requisicoes": limitador.estatisticas(),
+        "roteamento_banco": roteador.estatisticas(),
+        "eventos_tarefas": hub_eventos.estatisticas(),
+        "respostas_negociadas": cache_respostas.estatisticas(),
+    })
+    return PlainTextResponse(texto, media_type="text/plain; version=0.0.4; charset=utf-8")
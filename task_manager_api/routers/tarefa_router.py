@@ -1,34 +1,83 @@
-from fastapi import APIRouter, Depends
+from typing import Annotated, Optional
+from fastapi import APIRouter, Depends, Header, Query, Response
+from fastapi.responses import StreamingResponse
 from task_manager_api.models.tarefa import Tarefa
 from task_manager_api.dependencies import (
+    oauth2_scheme,
     get_usuario_autenticado, 
     get_usuario_service,
-    get_tarefa_service
+    get_tarefa_service,
+    get_exportacao_service
 )
 from task_manager_api.services.tarefa_service import TarefaService
 from task_manager_api.services.usuario_service import UsuarioService
+from task_manager_api.services.token_service import expiracao_token
+from task_manager_api.serializacao import LISTA_TAREFAS, responder_modelo
+from task_manager_api.etag import etag_tarefa, etag_colecao, checar_nao_modificado, com_etag
+from task_manager_api.formatos import RESPOSTAS_NEGOCIADAS, negociar, resposta_em_cache, com_vary
+from task_manager_api.services.exportacao_service import (
+    ExportacaoService,
+    NDJSON_MEDIA_TYPE
+)
+from task_manager_api.eventos_tarefas import EVENT_STREAM_MEDIA_TYPE
 from task_manager_api.serializers.tarefa_serializer import (
     TarefaRequest, 
     TarefaResponse,
-    TarefaPatchRequest
+    TarefaPatchRequest,
+    TarefaListagemQuery,
+    TarefaBuscaQuery,
+    TarefaAlteracoesQuery,
+    TarefaPaginaResponse,
+    TarefaAlteracoesResponse,
+    TarefaBulkRequest,
+    TarefaBulkPatchRequest,
+    TarefaBulkDeleteRequest,
+    TarefaBatchRequest,
+    TarefaBulkResponse,
+    TarefaEstatisticasResponse
 )
 
 router = APIRouter()
 
 @router.get("",
-    response_model=list[TarefaResponse]
+    response_model=TarefaPaginaResponse,
+    responses=RESPOSTAS_NEGOCIADAS
 )
-def listar_tarefas_usuario_autenticado(
+async def listar_tarefas_usuario_autenticado(
+    filtros: Annotated[TarefaListagemQuery, Query()],
+    response: Response,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    accept: Annotated[Optional[str], Header()] = None,
+    accept_encoding: Annotated[Optional[str], Header()] = None,
     usuario: int = Depends(get_usuario_autenticado),
     service: TarefaService = Depends(get_tarefa_service)
 ):
-    return service.get_tarefas_por_usuario_id(usuario.id)
+    negociacao = negociar(accept, accept_encoding)
+    versao = await service.get_versao_colecao(usuario.id)
+    etag = etag_colecao(usuario.id, versao, filtros, negociacao.formato.nome)
+    checar_nao_modificado(if_none_match, etag)
+    
+    if negociacao.padrao:
+        pagina = await service.get_tarefas_paginadas(usuario.id, filtros)
+        return com_vary(com_etag(responder_modelo(pagina), response, etag), response)
+    
+    # Coleção inalterada desde a última resposta neste formato: sem consultar as tarefas
+    resposta = resposta_em_cache(etag, negociacao)
+    if resposta is None:
+        pagina = await service.get_tarefas_paginadas(usuario.id, filtros)
+        resposta = LISTA_TAREFAS.responder_negociado(
+            pagina.itens,
+            negociacao,
+            etag,
+            proximo_cursor=pagina.proximo_cursor
+        )
+    return resposta
 
 @router.post("",
     response_model=TarefaResponse,
     status_code=201
 )
-def criar_tarefa(
+async def criar_tarefa(
     tarefa_data: TarefaRequest,
     usuario: int = Depends(get_usuario_autenticado),
     service: TarefaService = Depends(get_tarefa_service)
@@ -38,54 +87,227 @@ def criar_tarefa(
         usuario_id=usuario.id
     )
 
-    nova_tarefa = service.add_tarefa(tarefa)
+    nova_tarefa = await service.add_tarefa(tarefa)
     return nova_tarefa
 
+@router.post(
+    "/bulk",
+    response_model=TarefaBulkResponse
+)
+async def criar_tarefas_em_lote(
+    dados: TarefaBulkRequest,
+    usuario: int = Depends(get_usuario_autenticado),
+    service: TarefaService = Depends(get_tarefa_service)
+):
+    return await service.add_tarefas(dados.itens, usuario.id)
+
+@router.patch(
+    "/bulk",
+    response_model=TarefaBulkResponse
+)
+async def atualizar_tarefas_em_lote(
+    dados: TarefaBulkPatchRequest,
+    usuario: int = Depends(get_usuario_autenticado),
+    service: TarefaService = Depends(get_tarefa_service)
+):
+    return await service.update_tarefas(dados.itens, usuario.id)
+
+@router.delete(
+    "/bulk",
+    response_model=TarefaBulkResponse
+)
+async def deletar_tarefas_em_lote(
+    dados: TarefaBulkDeleteRequest,
+    usuario: int = Depends(get_usuario_autenticado),
+    service: TarefaService = Depends(get_tarefa_service)
+):
+    return await service.delete_tarefas(dados.ids, usuario.id)
+
+@router.get(
+    "/batch",
+    response_model=TarefaBulkResponse
+)
+async def obter_tarefas_em_lote(
+    dados: Annotated[TarefaBatchRequest, Query()],
+    usuario: int = Depends(get_usuario_autenticado),
+    service: TarefaService = Depends(get_tarefa_service)
+):
+    return await service.get_tarefas_em_lote(dados.ids, usuario.id)
+
+@router.post(
+    "/batch",
+    response_model=TarefaBulkResponse
+)
+async def obter_tarefas_em_lote_por_corpo(
+    dados: TarefaBatchRequest,
+    usuario: int = Depends(get_usuario_autenticado),
+    service: TarefaService = Depends(get_tarefa_service)
+):
+    """Mesmo que GET /tarefas/batch, para listas de ids longas demais para a URL"""
+    return await service.get_tarefas_em_lote(dados.ids, usuario.id)
+
+@router.get("/export")
+async def exportar_tarefas_usuario_autenticado(
+    usuario: int = Depends(get_usuario_autenticado),
+    exportacao: ExportacaoService = Depends(get_exportacao_service)
+):
+    return StreamingResponse(
+        exportacao.exportar_tarefas(usuario.id),
+        media_type=NDJSON_MEDIA_TYPE
+    )
+
+@router.get(
+    "/changes",
+    response_model=TarefaAlteracoesResponse
+)
+async def listar_alteracoes_tarefas_usuario_autenticado(
+    filtros: Annotated[TarefaAlteracoesQuery, Query()],
+    usuario: int = Depends(get_usuario_autenticado),
+    service: TarefaService = Depends(get_tarefa_service)
+):
+    alteracoes = await service.get_alteracoes(usuario.id, filtros)
+    return responder_modelo(alteracoes)
+
+@router.get("/events")
+async def transmitir_eventos_usuario_autenticado(
+    desde: Annotated[Optional[int], Query(ge=0)] = None,
+    last_event_id: Annotated[Optional[str], Header()] = None,
+    token: str = Depends(oauth2_scheme),
+    usuario: int = Depends(get_usuario_autenticado),
+    service: TarefaService = Depends(get_tarefa_service)
+):
+    """
+    Stream SSE dos eventos das tarefas do usuário (`criada`, `alterada`,
+    `removida` e `sincronizar`), com a revisão como id. Na reconexão, o
+    `Last-Event-ID` (ou, na primeira conexão, `desde`) retoma os eventos.
+    """
+    ultimo_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else desde
+    eventos = await service.abrir_eventos(usuario.id, ultimo_id, expiracao_token(token))
+    return StreamingResponse(
+        eventos,
+        media_type=EVENT_STREAM_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get(
+    "/search",
+    response_model=list[TarefaResponse]
+)
+async def buscar_tarefas_usuario_autenticado(
+    filtros: Annotated[TarefaBuscaQuery, Query()],
+    usuario: int = Depends(get_usuario_autenticado),
+    service: TarefaService = Depends(get_tarefa_service)
+):
+    tarefas = await service.buscar_tarefas(usuario.id, filtros)
+    return LISTA_TAREFAS.responder(tarefas)
+
+@router.get(
+    "/stats",
+    response_model=TarefaEstatisticasResponse
+)
+async def obter_estatisticas_usuario_autenticado(
+    usuario: int = Depends(get_usuario_autenticado),
+    service: TarefaService = Depends(get_tarefa_service)
+):
+    return await service.get_estatisticas(usuario.id)
+
 @router.get(
     "/{id}",
     response_model=TarefaResponse
 )
-def obter_tarefa(
+async def obter_tarefa(
     id: int,
+    response: Response,
+    if_none_match: Annotated[Optional[str], Header()] = None,
     usuario: int = Depends(get_usuario_autenticado),
     service: TarefaService = Depends(get_tarefa_service)
 ):
-    tarefa = service.get_tarefa_por_id(id, usuario.id)
-    return tarefa
+    tarefa = await service.get_tarefa_por_id(id, usuario.id)
+    etag = etag_tarefa(tarefa.id, tarefa.versao)
+    checar_nao_modificado(if_none_match, etag)
+    return com_etag(tarefa, response, etag)
 
 @router.patch(
     "/{id}",
     response_model=TarefaResponse
 )
-def atualizar_tarefa(
+async def atualizar_tarefa(
     id: int,
     tarefa_data: TarefaPatchRequest,
+    response: Response,
+    if_match: Annotated[Optional[str], Header()] = None,
     usuario: int = Depends(get_usuario_autenticado),
     service: TarefaService = Depends(get_tarefa_service)
 ):
-    tarefa = service.update_tarefa(id, tarefa_data, usuario.id)
-    return tarefa
+    tarefa = await service.update_tarefa(id, tarefa_data, usuario.id, if_match)
+    return com_etag(tarefa, response, etag_tarefa(tarefa.id, tarefa.versao))
 
 @router.delete(
     "/{id}",
     status_code=200
 )
-def deletar_tarefa(
+async def deletar_tarefa(
     id: int,
+    if_match: Annotated[Optional[str], Header()] = None,
     usuario: int = Depends(get_usuario_autenticado),
     service: TarefaService = Depends(get_tarefa_service)
 ):
-    service.delete_tarefa(id, usuario.id)
+    await service.delete_tarefa(id, usuario.id, if_match)
     return {"detail": "Tarefa deletada com sucesso."}
 
 @router.get(
     "/usuarios/{id}",
-    response_model=list[TarefaResponse]
+    response_model=list[TarefaResponse],
+    responses=RESPOSTAS_NEGOCIADAS
+)
+async def listar_tarefas_por_usuario_id(
+    id: int,
+    response: Response,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    accept: Annotated[Optional[str], Header()] = None,
+    accept_encoding: Annotated[Optional[str], Header()] = None,
+    usuario: int = Depends(get_usuario_autenticado),
+    usuario_service: UsuarioService = Depends(get_usuario_service),
+    service: TarefaService = Depends(get_tarefa_service)
+):
+    negociacao = negociar(accept, accept_encoding)
+    await usuario_service.checar_acesso_tarefas_usuario(id, usuario)
+    versao = await service.get_versao_colecao(id)
+    etag = etag_colecao(id, versao, formato=negociacao.formato.nome)
+    checar_nao_modificado(if_none_match, etag)
+    
+    if negociacao.padrao:
+        tarefas = await service.get_tarefas_por_usuario_id(id)
+        return com_vary(com_etag(LISTA_TAREFAS.responder(tarefas), response, etag), response)
+    
+    resposta = resposta_em_cache(etag, negociacao)
+    if resposta is None:
+        tarefas = await service.get_tarefas_por_usuario_id(id)
+        resposta = LISTA_TAREFAS.responder_negociado(tarefas, negociacao, etag)
+    return resposta
+
+@router.get("/usuarios/{id}/export")
+async def exportar_tarefas_por_usuario_id(
+    id: int,
+    usuario: int = Depends(get_usuario_autenticado),
+    service: UsuarioService = Depends(get_usuario_service),
+    exportacao: ExportacaoService = Depends(get_exportacao_service)
+):
+    await service.checar_acesso_tarefas_usuario(id, usuario)
+    return StreamingResponse(
+        exportacao.exportar_tarefas(id),
+        media_type=NDJSON_MEDIA_TYPE
+    )
+
+@router.get(
+    "/usuarios/{id}/stats",
+    response_model=TarefaEstatisticasResponse
 )
-def listar_tarefas_por_usuario_id(
+async def obter_estatisticas_por_usuario_id(
     id: int,
     usuario: int = Depends(get_usuario_autenticado),
-    service: UsuarioService = Depends(get_usuario_service)
+    usuario_service: UsuarioService = Depends(get_usuario_service),
+    service: TarefaService = Depends(get_tarefa_service)
 ):
-    tarefas = service.get_tarefas_por_usuario_id(id, usuario)
-    return tarefas
\ No newline at end of file
+    await usuario_service.checar_acesso_tarefas_usuario(id, usuario)
+    return await service.get_estatisticas(id)
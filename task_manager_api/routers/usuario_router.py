@@ -1,21 +1,33 @@
-from typing import Optional
-from fastapi import APIRouter, Depends
-from fastapi import APIRouter, BackgroundTasks, Body
-from task_manager_api.models.usuario import Usuario
+from typing import Annotated, Optional
+from fastapi import APIRouter, Depends, Header
+from fastapi import APIRouter, BackgroundTasks, Body, Response, status
+from fastapi.responses import StreamingResponse
+from task_manager_api.models.usuario import Usuario, UsuarioAutenticado
 from task_manager_api.services.usuario_service import UsuarioService
 from task_manager_api.services.auth_service import AuthService
 from task_manager_api.services.reset_senha_service import ResetSenhaService
+from task_manager_api.services.remocao_usuario_service import RemocaoUsuarioService
+from task_manager_api.serializacao import LISTA_USUARIOS
+from task_manager_api.etag import etag_usuario, checar_nao_modificado, com_etag
+from task_manager_api.services.exportacao_service import (
+    ExportacaoService,
+    NDJSON_MEDIA_TYPE
+)
 from task_manager_api.dependencies import (
     get_usuario_autenticado, 
     get_usuario_service, 
-    get_auth_service
+    get_auth_service,
+    get_reset_senha_service,
+    get_exportacao_service,
+    limitar_reset_senha
 )
 from task_manager_api.serializers.usuario_serializer import (
     UsuarioRequest, 
     UsuarioResponse,
     UsuarioAdminResponse,
     UsuarioPatchRequest, 
-    UsuarioSenhaPatchRequest
+    UsuarioSenhaPatchRequest,
+    RemocaoUsuarioResponse
 )
 
 router = APIRouter()
@@ -24,119 +36,162 @@ router = APIRouter()
     "",
     response_model=list[UsuarioAdminResponse]
 )
-def listar_usuarios(
+async def listar_usuarios(
     service: UsuarioService = Depends(get_usuario_service),
-    usuario_logado: Usuario = Depends(get_usuario_autenticado)
+    usuario_logado: UsuarioAutenticado = Depends(get_usuario_autenticado)
 ):    
-    usuarios = service.get_usuarios(usuario_logado)
-    return usuarios
+    usuarios = await service.get_usuarios(usuario_logado)
+    return LISTA_USUARIOS.responder(usuarios)
 
 @router.post("")
-def criar_usuario(
+async def criar_usuario(
     usuario_data: UsuarioRequest,
     service: UsuarioService = Depends(get_usuario_service)
 ):
     usuario = Usuario.model_validate(usuario_data)
-    novo_usuario = service.add_usuario(usuario)
+    novo_usuario = await service.add_usuario(usuario)
     return {"detail": "Usuário criado com sucesso.", "usuario_id": novo_usuario.id}
 
 @router.get(
     "/me",
     response_model=UsuarioResponse
 )
-def obter_usuario_atual(
-    usuario: Usuario = Depends(get_usuario_autenticado)
+async def obter_usuario_atual(
+    response: Response,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    usuario: UsuarioAutenticado = Depends(get_usuario_autenticado)
 ):
-    return usuario
+    etag = etag_usuario(usuario.id, usuario.versao)
+    checar_nao_modificado(if_none_match, etag)
+    return com_etag(usuario, response, etag)
+
+@router.get("/export")
+async def exportar_usuarios(
+    service: UsuarioService = Depends(get_usuario_service),
+    exportacao: ExportacaoService = Depends(get_exportacao_service),
+    usuario_logado: UsuarioAutenticado = Depends(get_usuario_autenticado)
+):
+    await service.checar_usuario_is_admin(usuario_logado)
+    return StreamingResponse(
+        exportacao.exportar_usuarios(),
+        media_type=NDJSON_MEDIA_TYPE
+    )
 
 @router.get(
     "/{id}",
     response_model=UsuarioAdminResponse
 )
-def obter_usuario_por_id(
+async def obter_usuario_por_id(
     id: int,
     service: UsuarioService = Depends(get_usuario_service),
-    usuario_logado: Usuario = Depends(get_usuario_autenticado)
+    usuario_logado: UsuarioAutenticado = Depends(get_usuario_autenticado)
 ):
-    usuario = service.get_usuario_por_id(id, usuario_logado)
+    usuario = await service.get_usuario_por_id(id, usuario_logado)
     return usuario
 
 @router.get(
     "/admins",
     response_model=list[UsuarioAdminResponse]
 )
-def listar_usuarios_admins(
+async def listar_usuarios_admins(
     service: UsuarioService = Depends(get_usuario_service),
-    usuario_logado: Usuario = Depends(get_usuario_autenticado)
+    usuario_logado: UsuarioAutenticado = Depends(get_usuario_autenticado)
 ):    
-    admins = service.get_admins(usuario_logado)
-    return admins
+    admins = await service.get_admins(usuario_logado)
+    return LISTA_USUARIOS.responder(admins)
 
 @router.post(
     "/admins",
     response_model=UsuarioAdminResponse
 )
-def criar_usuario_admin(
+async def criar_usuario_admin(
     usuario_data: UsuarioRequest,
     service: UsuarioService = Depends(get_usuario_service),
-    usuario_logado: Usuario = Depends(get_usuario_autenticado)
+    usuario_logado: UsuarioAutenticado = Depends(get_usuario_autenticado)
 ):
-    service.checar_usuario_is_admin(usuario_logado)
+    await service.checar_usuario_is_admin(usuario_logado)
 
     usuario = Usuario.model_validate(usuario_data)
     usuario.is_admin = True
-    novo_usuario = service.add_admin(usuario)
+    novo_usuario = await service.add_admin(usuario)
     return novo_usuario
 
 @router.patch("/{id}")
-def atualizar_usuario(
+async def atualizar_usuario(
     id: int,
     usuario_data: UsuarioPatchRequest,
     service: UsuarioService = Depends(get_usuario_service),
-    usuario_logado: Usuario = Depends(get_usuario_autenticado)
+    usuario_logado: UsuarioAutenticado = Depends(get_usuario_autenticado)
 ):
-    usuario = service.update_usuario(id, usuario_data, usuario_logado)
+    usuario = await service.update_usuario(id, usuario_data, usuario_logado)
     
     return {"detail": "Usuário atualizado com sucesso.", "usuario_id": usuario.id}
 
 @router.delete("/{id}")
-def deletar_usuario(
+async def deletar_usuario(
     id: int,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    em_segundo_plano: bool = False,
     service: UsuarioService = Depends(get_usuario_service),
-    usuario_logado: Usuario = Depends(get_usuario_autenticado)
+    usuario_logado: UsuarioAutenticado = Depends(get_usuario_autenticado)
 ):
-    service.delete_usuario(id, usuario_logado)
+    """
+    Deleta o usuário e suas tarefas. Com `em_segundo_plano=true`, a remoção
+    é feita em lotes após a resposta (202); o progresso pode ser consultado
+    em `/usuarios/remocoes/{remocao_id}`.
+    """
+    if em_segundo_plano:
+        remocao = await service.agendar_delete_usuario(id, usuario_logado)
+        background_tasks.add_task(RemocaoUsuarioService().executar, remocao.id)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {"detail": "Remoção do usuário agendada.", "remocao_id": remocao.id}
+    
+    await service.delete_usuario(id, usuario_logado)
     return {"detail": "Usuário deletado com sucesso."}
 
-@router.post("/reset-senha")
-def solicitar_reset_senha(
+@router.get(
+    "/remocoes/{remocao_id}",
+    response_model=RemocaoUsuarioResponse
+)
+async def obter_remocao_usuario(
+    remocao_id: str,
+    service: UsuarioService = Depends(get_usuario_service),
+    usuario_logado: UsuarioAutenticado = Depends(get_usuario_autenticado)
+):
+    await service.checar_usuario_is_admin(usuario_logado)
+    return RemocaoUsuarioService().get_remocao(remocao_id)
+
+@router.post(
+    "/reset-senha",
+    dependencies=[Depends(limitar_reset_senha)]
+)
+async def solicitar_reset_senha(
     email: str = Body(embed=True),
-    background_tasks: BackgroundTasks = None,
+    service: ResetSenhaService = Depends(get_reset_senha_service)
 ):
     """
     Envia um email para reset de senha.
     Não revela se o email existe ou não.
     """
-    service = ResetSenhaService()
-
-    background_tasks.add_task(service.enviar_reset, email)
+    await service.enviar_reset(email)
 
     return {"detail": "Se o email existir, o link será enviado."}
 
 @router.patch("/{username}/senha")
-def alterar_senha_usuario(
+async def alterar_senha_usuario(
     username: str,
     senha_data: UsuarioSenhaPatchRequest,
     pwd_reset_token: Optional[str] = None,
     service: UsuarioService = Depends(get_usuario_service),
     auth_service: AuthService = Depends(get_auth_service)
 ):
-    usuario = auth_service.get_usuario_se_alterar_senha_for_permitido(
+    usuario = await auth_service.get_usuario_se_alterar_senha_for_permitido(
         username=username,
         pwd_reset_token=pwd_reset_token,
     )
 
-    usuario_atualizado = service.update_senha_usuario(
+    usuario_atualizado = await service.update_senha_usuario(
         usuario,
         senha_data
     )
@@ -1,22 +1,137 @@
 """Utilitários de segurança"""
 
-from typing import Any
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Optional
 
-from passlib.context import CryptContext
+from fastapi import HTTPException, status
 from pydantic import GetCoreSchemaHandler
 from pydantic_core import CoreSchema, core_schema
+from task_manager_api.metricas import medir
+from task_manager_api.config import (
+    SENHA_EXECUTOR_WORKERS,
+    SENHA_EXECUTOR_FILA_MAXIMA,
+    SENHA_EXECUTOR_RETRY_AFTER_SEGUNDOS,
+)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+@functools.cache
+def get_pwd_context() -> "CryptContext":
+    """Contexto do passlib, importado no primeiro uso de senha e não na inicialização"""
+    
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def verificar_senha(senha, hash_senha) -> bool:
     """Verifica se a senha informada é válida"""
     
-    return pwd_context.verify(senha, hash_senha)
+    return get_pwd_context().verify(senha, hash_senha)
 
 def criar_hash_senha(senha) -> str:
     """Cria um hash para a senha informada"""
     
-    return pwd_context.hash(senha)
+    return get_pwd_context().hash(senha)
+
+class ExecutorSenhas:
+    """
+    Executor dedicado às operações de senha (bcrypt), separado do
+    threadpool compartilhado do Starlette. Limita a concorrência ao número
+    de workers e rejeita com 503 quando a fila de espera está cheia.
+    """
+    
+    def __init__(self, workers: int, fila_maxima: int, retry_after_segundos: int):
+        self.workers = workers
+        self.fila_maxima = fila_maxima
+        self.retry_after_segundos = retry_after_segundos
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pendentes = 0
+        self.executadas = 0
+        self.rejeitadas = 0
+        self.tempo_espera_total = 0.0
+        self.tempo_execucao_total = 0.0
+        self.tempo_espera_maximo = 0.0
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="senha",
+            )
+        return self._executor
+    
+    async def executar(self, funcao: Callable, *args) -> Any:
+        with self._lock:
+            if self._pendentes >= self.workers + self.fila_maxima:
+                self.rejeitadas += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Servidor sobrecarregado, tente novamente em instantes.",
+                    headers={"Retry-After": str(self.retry_after_segundos)},
+                )
+            self._pendentes += 1
+            executor = self._get_executor()
+        
+        enfileirada_em = time.perf_counter()
+        
+        def tarefa():
+            inicio = time.perf_counter()
+            try:
+                return funcao(*args)
+            finally:
+                fim = time.perf_counter()
+                with self._lock:
+                    espera = inicio - enfileirada_em
+                    self.executadas += 1
+                    self.tempo_espera_total += espera
+                    self.tempo_execucao_total += fim - inicio
+                    self.tempo_espera_maximo = max(self.tempo_espera_maximo, espera)
+        
+        try:
+            with medir("senha"):
+                return await asyncio.wrap_future(executor.submit(tarefa))
+        finally:
+            with self._lock:
+                self._pendentes -= 1
+    
+    def encerrar(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+    
+    def estatisticas(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "pendentes": self._pendentes,
+                "executadas": self.executadas,
+                "rejeitadas": self.rejeitadas,
+                "tempo_espera_total": self.tempo_espera_total,
+                "tempo_execucao_total": self.tempo_execucao_total,
+                "tempo_espera_maximo": self.tempo_espera_maximo,
+            }
+
+executor_senhas = ExecutorSenhas(
+    workers=SENHA_EXECUTOR_WORKERS,
+    fila_maxima=SENHA_EXECUTOR_FILA_MAXIMA,
+    retry_after_segundos=SENHA_EXECUTOR_RETRY_AFTER_SEGUNDOS,
+)
+
+async def verificar_senha_async(senha, hash_senha) -> bool:
+    """Verifica a senha no executor dedicado, sem ocupar o threadpool da aplicação"""
+    
+    return await executor_senhas.executar(verificar_senha, senha, hash_senha)
+
+async def criar_hash_senha_async(senha) -> str:
+    """Cria o hash da senha no executor dedicado, sem ocupar o threadpool da aplicação"""
+    
+    return await executor_senhas.executar(criar_hash_senha, senha)
 
 class HashedPassword(str):
     """Classe para representar uma senha criptografada"""
@@ -33,4 +148,4 @@ class HashedPassword(str):
             raise ValueError("Senha inválida")
         
         hashed_senha = criar_hash_senha(v)
-        return cls(hashed_senha)
\ No newline at end of file
+        return cls(hashed_senha)
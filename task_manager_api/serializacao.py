@@ -0,0 +1,144 @@
+"""
+Serialização rápida das respostas de listagem.
+
+Com `response_model`, o FastAPI valida o retorno (criando uma instância do
+modelo de resposta por objeto), converte o resultado em dicts/listas
+Python (`dump_python(mode="json")`) e só então chama `json.dumps`.
+
+Aqui, para cada modelo de resposta, um `TypeAdapter` com o mesmo schema é
+compilado uma única vez. As colunas são lidas direto dos objetos vindos do
+banco, que já têm os tipos certos, e vão para bytes JSON em uma só
+chamada (`dump_json`). A saída é idêntica à do caminho padrão.
+
+As listagens também são renderizadas nos formatos negociados pelo `Accept`
+(MessagePack e JSON colunar, veja `formatos.py`).
+"""
+
+from typing import Any, Iterable
+import msgpack
+from typing_extensions import TypedDict
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import to_json
+from task_manager_api.config import SERIALIZACAO_RAPIDA
+from task_manager_api.formatos import (
+    COLUNAR,
+    MSGPACK,
+    Formato,
+    Negociacao,
+    cache_respostas,
+    comprimir,
+    montar_resposta,
+)
+from task_manager_api.metricas import medir
+from task_manager_api.serializers.tarefa_serializer import TarefaResponse
+from task_manager_api.serializers.usuario_serializer import UsuarioAdminResponse
+
+class RespostaJSONBytes(JSONResponse):
+    """
+    `JSONResponse` que aceita o corpo já serializado em bytes e o envia
+    sem nova conversão. Outros conteúdos são renderizados normalmente.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return super().render(content)
+
+class SerializadorLista:
+    """Serializa listas de objetos ORM no formato de um modelo de resposta"""
+    
+    def __init__(self, modelo: type[BaseModel]):
+        self.campos = tuple(modelo.model_fields)
+        linha = TypedDict(
+            f"{modelo.__name__}Linha",
+            {nome: campo.annotation for nome, campo in modelo.model_fields.items()}
+        )
+        self.adapter = TypeAdapter(list[linha])
+    
+    def _linhas(self, objetos: Iterable[Any]) -> list[dict]:
+        campos = self.campos
+        linhas = []
+        for objeto in objetos:
+            # Atributos já carregados são lidos do __dict__, sem passar
+            # pelo descriptor do SQLAlchemy; os expirados vêm do getattr
+            estado = objeto.__dict__
+            linhas.append({
+                campo: estado[campo] if campo in estado else getattr(objeto, campo)
+                for campo in campos
+            })
+        return linhas
+    
+    def _valores(self, objetos: Iterable[Any]) -> list[list]:
+        """As mesmas linhas, como listas de valores na ordem de `campos`"""
+        
+        campos = self.campos
+        valores = []
+        for objeto in objetos:
+            estado = objeto.__dict__
+            valores.append([estado[campo] if campo in estado else getattr(objeto, campo) for campo in campos])
+        return valores
+    
+    def renderizar(self, objetos: Iterable[Any]) -> bytes:
+        return self.adapter.dump_json(self._linhas(objetos))
+    
+    def renderizar_formato(self, objetos: Iterable[Any], formato: Formato, **envelope) -> bytes:
+        """
+        Renderiza no formato negociado. Com `envelope` (ex.: `proximo_cursor`
+        de uma página), o documento é um objeto com os itens em `itens`,
+        seguidos desses campos; sem ele, é a própria lista. No formato
+        colunar, é sempre um objeto, com os nomes dos campos em `campos`.
+        """
+        
+        if formato is COLUNAR:
+            documento = {"campos": self.campos, "itens": self._valores(objetos), **envelope}
+            return to_json(documento)
+        itens = self.adapter.dump_python(self._linhas(objetos), mode="json")
+        documento = {"itens": itens, **envelope} if envelope else itens
+        if formato is MSGPACK:
+            return msgpack.packb(documento)
+        return to_json(documento)
+    
+    def responder(self, objetos: Iterable[Any]) -> Any:
+        """
+        Retorna a resposta já renderizada ou, com `SERIALIZACAO_RAPIDA`
+        desligada, os próprios objetos para o caminho padrão do FastAPI.
+        """
+        
+        if not SERIALIZACAO_RAPIDA:
+            return objetos
+        with medir("serializacao"):
+            return RespostaJSONBytes(self.renderizar(objetos))
+
+    def responder_negociado(
+        self,
+        objetos: Iterable[Any],
+        negociacao: Negociacao,
+        etag: str,
+        **envelope
+    ) -> Response:
+        """
+        Renderiza no formato negociado, comprime (se negociado) e guarda o
+        corpo em `cache_respostas`, indexado pelo ETag da listagem.
+        """
+        
+        with medir("serializacao"):
+            corpo = self.renderizar_formato(objetos, negociacao.formato, **envelope)
+            codificado = comprimir(corpo, negociacao.codificacao)
+        cache_respostas.set(etag, negociacao, codificado)
+        return montar_resposta(codificado, negociacao.formato, etag)
+
+def responder_modelo(modelo: BaseModel) -> Any:
+    """
+    Envia uma instância já validada do modelo de resposta sem a nova
+    validação e conversão feitas pelo `response_model`.
+    """
+    
+    if not SERIALIZACAO_RAPIDA:
+        return modelo
+    with medir("serializacao"):
+        return RespostaJSONBytes(modelo.__pydantic_serializer__.to_json(modelo))
+
+LISTA_TAREFAS = SerializadorLista(TarefaResponse)
+LISTA_USUARIOS = SerializadorLista(UsuarioAdminResponse)
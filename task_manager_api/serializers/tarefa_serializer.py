@@ -1,6 +1,14 @@
 from typing import Optional
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
+from task_manager_api.models.tarefa import StatusEnum, PrioridadeEnum
+from task_manager_api.pagination import OrdenarPorEnum, OrdemEnum
+from task_manager_api.config import (
+    PAGINACAO_LIMITE_PADRAO,
+    PAGINACAO_LIMITE_MAXIMO,
+    BULK_TAMANHO_MAXIMO,
+    BUSCA_CONSULTA_TAMANHO_MAXIMO
+)
 
 class TarefaRequest(BaseModel):
     """Representa o modelo de criação da tarefa"""
@@ -28,4 +36,119 @@ class TarefaPatchRequest(BaseModel):
     titulo: Optional[str] = None
     descricao: Optional[str] = None
     status: Optional[str] = None
-    prioridade: Optional[str] = None
\ No newline at end of file
+    prioridade: Optional[str] = None
+
+class TarefaListagemQuery(BaseModel):
+    """Representa os parâmetros de filtro, ordenação e paginação da listagem de tarefas"""
+    
+    limite: int = Field(default=PAGINACAO_LIMITE_PADRAO, ge=1, le=PAGINACAO_LIMITE_MAXIMO)
+    cursor: Optional[str] = None
+    status: Optional[StatusEnum] = None
+    prioridade: Optional[PrioridadeEnum] = None
+    criada_apos: Optional[datetime] = None
+    criada_antes: Optional[datetime] = None
+    ordenar_por: OrdenarPorEnum = OrdenarPorEnum.ID
+    ordem: OrdemEnum = OrdemEnum.ASC
+
+class TarefaBuscaQuery(BaseModel):
+    """Representa os parâmetros da busca textual de tarefas"""
+    
+    q: str = Field(min_length=1, max_length=BUSCA_CONSULTA_TAMANHO_MAXIMO)
+    limite: int = Field(default=PAGINACAO_LIMITE_PADRAO, ge=1, le=PAGINACAO_LIMITE_MAXIMO)
+
+class TarefaAlteracoesQuery(BaseModel):
+    """Representa os parâmetros de GET /tarefas/changes"""
+    
+    desde: Optional[int] = Field(default=None, ge=0)
+    limite: int = Field(default=PAGINACAO_LIMITE_PADRAO, ge=1, le=PAGINACAO_LIMITE_MAXIMO)
+    cursor: Optional[str] = None
+
+class TarefaPaginaResponse(BaseModel):
+    """Representa uma página da listagem de tarefas"""
+    
+    itens: list[TarefaResponse]
+    proximo_cursor: Optional[str] = None
+
+class TarefaAlteracoesResponse(BaseModel):
+    """
+    Representa uma página de alterações das tarefas: as criadas ou alteradas
+    (estado atual) e os ids das removidas. `revisao` é informada na última
+    página e deve ser enviada como `desde` na próxima sincronização.
+    """
+    
+    alteradas: list[TarefaResponse]
+    removidas: list[int]
+    proximo_cursor: Optional[str] = None
+    revisao: Optional[int] = None
+
+class TarefaEventoResponse(BaseModel):
+    """
+    Representa os dados de um evento de GET /tarefas/events: a tarefa criada
+    ou alterada (estado atual), o id da removida ou, em `sincronizar`, a
+    revisão a partir da qual buscar as alterações (`desde`).
+    """
+    
+    revisao: int
+    tarefa: Optional[TarefaResponse] = None
+    id: Optional[int] = None
+    desde: Optional[int] = None
+
+class TarefaBulkRequest(BaseModel):
+    """Representa o modelo de criação de tarefas em lote"""
+    
+    itens: list[TarefaRequest] = Field(min_length=1, max_length=BULK_TAMANHO_MAXIMO)
+
+class TarefaBulkPatchItem(TarefaPatchRequest):
+    """Representa a atualização parcial de uma tarefa dentro de um lote"""
+    
+    id: int
+
+class TarefaBulkPatchRequest(BaseModel):
+    """Representa o modelo de atualização parcial de tarefas em lote"""
+    
+    itens: list[TarefaBulkPatchItem] = Field(min_length=1, max_length=BULK_TAMANHO_MAXIMO)
+
+class TarefaBulkDeleteRequest(BaseModel):
+    """Representa o modelo de remoção de tarefas em lote"""
+    
+    ids: list[int] = Field(min_length=1, max_length=BULK_TAMANHO_MAXIMO)
+
+class TarefaBatchRequest(BaseModel):
+    """
+    Representa os ids de GET/POST /tarefas/batch. Na query string, aceita
+    `ids=1,2,3` e `ids=1&ids=2`.
+    """
+    
+    ids: list[int] = Field(min_length=1, max_length=BULK_TAMANHO_MAXIMO)
+    
+    @field_validator("ids", mode="before")
+    @classmethod
+    def separar_por_virgula(cls, valor):
+        if isinstance(valor, str):
+            valor = [valor]
+        if isinstance(valor, list):
+            return [parte for item in valor for parte in (item.split(",") if isinstance(item, str) else [item])]
+        return valor
+
+class TarefaBulkResultado(BaseModel):
+    """Representa o resultado de um item de uma operação em lote"""
+    
+    indice: int
+    id: Optional[int] = None
+    status_code: int
+    detail: Optional[str] = None
+    tarefa: Optional[TarefaResponse] = None
+
+class TarefaBulkResponse(BaseModel):
+    """Representa o resultado de uma operação em lote"""
+    
+    sucessos: int
+    falhas: int
+    resultados: list[TarefaBulkResultado]
+
+class TarefaEstatisticasResponse(BaseModel):
+    """Representa a quantidade de tarefas de um usuário por status e por prioridade"""
+    
+    total: int
+    por_status: dict[str, int]
+    por_prioridade: dict[str, int]
@@ -42,4 +42,16 @@ class UsuarioSenhaPatchRequest(BaseModel):
     """Representa o modelo de atualização da senha do usuário"""
     
     senha: str
-    confirmar_senha: str
\ No newline at end of file
+    confirmar_senha: str
+
+class RemocaoUsuarioResponse(BaseModel):
+    """Representa o progresso da remoção de um usuário em segundo plano"""
+    
+    id: str
+    usuario_id: int
+    status: str
+    total_tarefas: int = 0
+    tarefas_removidas: int = 0
+    iniciada_em: datetime
+    concluida_em: Optional[datetime] = None
+    erro: Optional[str] = None
@@ -1,10 +1,12 @@
 from typing import Optional
-from jose import JWTError, jwt
 from fastapi import HTTPException, status
-from task_manager_api.config import SECRET_KEY, ALGORITHM
-from task_manager_api.security import verificar_senha
+from task_manager_api.security import verificar_senha_async
+from task_manager_api.services.token_service import decodificar_token
 from task_manager_api.services.usuario_service import UsuarioService
-from task_manager_api.models.usuario import Usuario
+from task_manager_api.models.usuario import Usuario, UsuarioAutenticado
+from task_manager_api.cache import token_cache
+from task_manager_api.database import executar_no_banco
+from task_manager_api.roteamento_banco import identificar_cliente
 
 CREDENCIAIS_INVALIDAS = HTTPException(
     status_code=status.HTTP_401_UNAUTHORIZED,
@@ -16,51 +18,77 @@ class AuthService:
     def __init__(self, usuario_service: UsuarioService):
         self.usuario_service = usuario_service
 
-    def autenticar_usuario(self, username: str, senha: str):
-        usuario = self.usuario_service.usuario_repository.get_usuario_por_username(username)
+    async def autenticar_usuario(self, username: str, senha: str):
+        usuario_repository = self.usuario_service.usuario_repository
+        usuario = await executar_no_banco(
+            usuario_repository.db_session,
+            usuario_repository.get_usuario_por_username,
+            username
+        )
         
         if not usuario:
             raise CREDENCIAIS_INVALIDAS
         
-        if not verificar_senha(senha, usuario.senha):
+        if not await verificar_senha_async(senha, usuario.senha):
             raise CREDENCIAIS_INVALIDAS
 
         return usuario
         
-    def validar_token(self, token: str):
-        try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            username = payload.get("sub")
-
-            if not username:
-                raise CREDENCIAIS_INVALIDAS
-
-            usuario = self.usuario_service.usuario_repository.get_usuario_por_username(username)
-            if not usuario:
-                raise CREDENCIAIS_INVALIDAS
-
-            return usuario
-
-        except JWTError:
+    async def validar_token(self, token: str) -> UsuarioAutenticado:
+        usuario_repository = self.usuario_service.usuario_repository
+        em_cache = token_cache.get(token)
+        if em_cache:
+            identificar_cliente(usuario_repository.db_session, em_cache.claims["sub"])
+            return em_cache.usuario
+        
+        geracao = token_cache.geracao
+        payload = decodificar_token(token)
+        username = payload.get("sub") if payload else None
+        if not username:
+            raise CREDENCIAIS_INVALIDAS
+        
+        # Antes da busca: logo depois de uma escrita do cliente, ela não vai à réplica
+        identificar_cliente(usuario_repository.db_session, username)
+        usuario_autenticado = await executar_no_banco(
+            usuario_repository.db_session,
+            self._buscar_usuario_autenticado,
+            username
+        )
+        if not usuario_autenticado:
             raise CREDENCIAIS_INVALIDAS
         
+        token_cache.set(token, payload, usuario_autenticado, geracao)
+        return usuario_autenticado
+    
+    def _buscar_usuario_autenticado(self, username: str) -> Optional[UsuarioAutenticado]:
+        """
+        Busca o usuário do token e encerra a transação de leitura na mesma
+        chamada: a conexão volta ao pool em vez de ficar presa à sessão até
+        o fim da requisição (ou durante um stream, como GET /tarefas/events).
+        """
+        
+        usuario_repository = self.usuario_service.usuario_repository
+        usuario = usuario_repository.get_usuario_por_username(username)
+        usuario_autenticado = UsuarioAutenticado.model_validate(usuario) if usuario else None
+        usuario_repository.db_session.rollback()
+        return usuario_autenticado
+        
     def refresh_token(self, token: str) -> str:
-        try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            username = payload.get("sub")
-            scope = payload.get("scope")
-
-            if not username or scope != "refresh_token":
-                raise CREDENCIAIS_INVALIDAS
-
-            usuario = self.usuario_service.usuario_repository.get_usuario_por_username(username)
-            if not usuario:
-                raise CREDENCIAIS_INVALIDAS
+        payload = decodificar_token(token)
+        if not payload:
+            raise CREDENCIAIS_INVALIDAS
+        
+        username = payload.get("sub")
+        scope = payload.get("scope")
 
-            return usuario
+        if not username or scope != "refresh_token":
+            raise CREDENCIAIS_INVALIDAS
 
-        except JWTError:
+        usuario = self.usuario_service.usuario_repository.get_usuario_por_username(username)
+        if not usuario:
             raise CREDENCIAIS_INVALIDAS
+
+        return usuario
         
     def get_usuario_se_alterar_senha_for_permitido(
         self,
@@ -73,28 +101,27 @@ class AuthService:
             raise HTTPException(404, "Usuário alvo não encontrado")
 
         if pwd_reset_token:
-            try:
-                payload = jwt.decode(pwd_reset_token, SECRET_KEY, algorithms=[ALGORITHM])
-
-                if payload.get("sub") != usuario_alvo.username:
-                    raise HTTPException(
-                        status_code=status.HTTP_403_FORBIDDEN,
-                        detail="Token inválido para o usuário alvo."
-                    )
-                
-                if payload.get("scope") != "pwd_reset":
-                    raise HTTPException(
-                        status_code=status.HTTP_403_FORBIDDEN,
-                        detail="Token inválido para redefinição de senha."
-                    )
-                
-                return usuario_alvo
-            except JWTError:
+            payload = decodificar_token(pwd_reset_token)
+            if payload is None:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Token inválido ou expirado."
                 )
 
+            if payload.get("sub") != usuario_alvo.username:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Token inválido para o usuário alvo."
+                )
+            
+            if payload.get("scope") != "pwd_reset":
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Token inválido para redefinição de senha."
+                )
+            
+            return usuario_alvo
+
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Alteração de senha não permitida."
@@ -0,0 +1,58 @@
+import json
+from datetime import datetime
+from typing import Iterator, Optional, Sequence
+from sqlalchemy.engine import Row
+from sqlmodel import Session
+from task_manager_api.database import engine_leitura_para
+from task_manager_api.repositories.tarefa_repository import TarefaRepository
+from task_manager_api.repositories.usuario_repository import UsuarioRepository
+from task_manager_api.serializers.tarefa_serializer import TarefaResponse
+from task_manager_api.serializers.usuario_serializer import UsuarioAdminResponse
+from task_manager_api.config import EXPORTACAO_TAMANHO_LOTE
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+def _serializar_valor(valor):
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+def _lote_para_ndjson(linhas: Sequence[Row], campos: list[str]) -> bytes:
+    """Serializa um lote de linhas direto para bytes, um objeto JSON por linha"""
+    
+    return "".join(
+        json.dumps(
+            {campo: getattr(linha, campo) for campo in campos},
+            ensure_ascii=False,
+            separators=(",", ":"),
+            default=_serializar_valor,
+        ) + "\n"
+        for linha in linhas
+    ).encode()
+
+class ExportacaoService:
+    """
+    Gera exportações NDJSON em streaming. Cada gerador abre a própria
+    sessão, pois é consumido pelo `StreamingResponse` depois que as
+    dependências da requisição já foram encerradas, no engine de leitura
+    (o de escrita se o cliente escreveu há pouco).
+    """
+    
+    def __init__(self, cliente: Optional[str] = None):
+        self.cliente = cliente
+    
+    def exportar_tarefas(self, usuario_id: int) -> Iterator[bytes]:
+        campos = list(TarefaResponse.model_fields)
+        with Session(engine_leitura_para(self.cliente)) as session:
+            lotes = TarefaRepository(session).iter_tarefas_por_usuario_id(
+                usuario_id,
+                EXPORTACAO_TAMANHO_LOTE
+            )
+            for linhas in lotes:
+                yield _lote_para_ndjson(linhas, campos)
+    
+    def exportar_usuarios(self) -> Iterator[bytes]:
+        campos = list(UsuarioAdminResponse.model_fields)
+        with Session(engine_leitura_para(self.cliente)) as session:
+            for linhas in UsuarioRepository(session).iter_usuarios(EXPORTACAO_TAMANHO_LOTE):
+                yield _lote_para_ndjson(linhas, campos)
@@ -0,0 +1,88 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from sqlmodel import Session
+from fastapi import HTTPException, status
+from task_manager_api.database import engine
+from task_manager_api.cache import token_cache
+from task_manager_api.repositories.usuario_repository import UsuarioRepository
+from task_manager_api.repositories.tarefa_repository import TarefaRepository
+from task_manager_api.serializers.usuario_serializer import RemocaoUsuarioResponse
+from task_manager_api.config import (
+    REMOCAO_USUARIO_TAMANHO_LOTE,
+    REMOCAO_USUARIO_PAUSA_SEGUNDOS,
+    REMOCAO_USUARIO_HISTORICO,
+)
+
+class RemocaoUsuarioService:
+    """
+    Remove usuários com muitas tarefas em segundo plano, em lotes curtos,
+    liberando o lock de escrita entre um lote e outro.
+    O progresso fica em memória (por worker).
+    """
+    
+    _remocoes: OrderedDict[str, RemocaoUsuarioResponse] = OrderedDict()
+    _lock = threading.Lock()
+    
+    def registrar(self, usuario_id: int) -> RemocaoUsuarioResponse:
+        remocao = RemocaoUsuarioResponse(
+            id=uuid.uuid4().hex,
+            usuario_id=usuario_id,
+            status="pendente",
+            iniciada_em=datetime.now(),
+        )
+        with self._lock:
+            self._remocoes[remocao.id] = remocao
+            while len(self._remocoes) > REMOCAO_USUARIO_HISTORICO:
+                self._remocoes.popitem(last=False)
+        return remocao
+    
+    def get_remocao(self, remocao_id: str) -> RemocaoUsuarioResponse:
+        with self._lock:
+            remocao = self._remocoes.get(remocao_id)
+        if not remocao:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Remoção não encontrada"
+            )
+        return remocao.model_copy()
+    
+    def executar(self, remocao_id: str) -> None:
+        """Executa a remoção registrada (chamado via BackgroundTasks)"""
+        
+        with self._lock:
+            remocao = self._remocoes[remocao_id]
+        
+        try:
+            with Session(engine) as session:
+                tarefa_repository = TarefaRepository(session)
+                usuario_repository = UsuarioRepository(session)
+                
+                remocao.total_tarefas = tarefa_repository.count_tarefas_por_usuario_id(remocao.usuario_id)
+                remocao.status = "executando"
+                
+                while True:
+                    removidas = tarefa_repository.delete_lote_tarefas_por_usuario_id(
+                        remocao.usuario_id,
+                        REMOCAO_USUARIO_TAMANHO_LOTE
+                    )
+                    remocao.tarefas_removidas += removidas
+                    if removidas < REMOCAO_USUARIO_TAMANHO_LOTE:
+                        break
+                    time.sleep(REMOCAO_USUARIO_PAUSA_SEGUNDOS)
+                
+                # Tarefas criadas durante a remoção saem junto com o usuário
+                usuario = usuario_repository.get_usuario_por_id(remocao.usuario_id)
+                if usuario:
+                    usuario_repository.delete_usuario(usuario)
+            
+            token_cache.invalidar_usuario(remocao.usuario_id)
+            remocao.status = "concluida"
+        except Exception as erro:
+            remocao.status = "erro"
+            remocao.erro = str(erro)
+            raise
+        finally:
+            remocao.concluida_em = datetime.now()
@@ -1,19 +1,16 @@
 from datetime import timedelta
-from sqlmodel import Session, select
-from task_manager_api.database import engine
-from task_manager_api.models.usuario import Usuario
+from task_manager_api.database import executar_no_banco
+from task_manager_api.repositories.usuario_repository import UsuarioRepository
 from task_manager_api.services.token_service import criar_access_token
+from task_manager_api.envio_email import Mensagem, fila_emails
 
 from task_manager_api.config import (
     RESET_TOKEN_EXPIRE_MINUTES,
-    PWD_RESET_URL,
-    smtp_sender
+    PWD_RESET_URL
 )
 
 MSG_RESET_SENHA = """\
-From: API <{sender}>
-To: {to}
-Assunto: Redefinição de senha
+Olá, {nome}.
 
 Use o link a seguir para redefinir sua senha:
 {url}?token={pwd_reset_token}
@@ -22,26 +19,21 @@ Este link expirará em {mens_expire} minutos.
 """
 
 
-def _enviar_email_debug(email: str, subject: str, msg: str):
-    """Simula envio de email escrevendo em arquivo"""
-    with open("email.log", "a") as f:
-        f.write(
-            f"--- EMAIL PARA {email} ---\n"
-            f"Subject: {subject}\n"
-            f"{msg}\n"
-            f"--- FIM DO EMAIL ---\n"
-        )
-
-
 class ResetSenhaService:
-    def enviar_reset(self, email: str):
-        """Busca o usuário e envia email com token"""
-
-        with Session(engine) as session:
-            usuario = session.exec(
-                select(Usuario).where(Usuario.email == email)
-            ).first()
-
+    def __init__(self, usuario_repository: UsuarioRepository):
+        self.usuario_repository = usuario_repository
+
+    async def enviar_reset(self, email: str):
+        """Busca o usuário e enfileira o email com o token"""
+
+        # A vaga é reservada antes da busca: a resposta (inclusive o 503)
+        # não revela se o email existe
+        with fila_emails.reservar() as enfileirar:
+            usuario = await executar_no_banco(
+                self.usuario_repository.db_session,
+                self.usuario_repository.get_usuario_por_email,
+                email
+            )
             if not usuario:
                 return  # Não revela que o email não existe
 
@@ -52,15 +44,14 @@ class ResetSenhaService:
             )
 
             msg = MSG_RESET_SENHA.format(
-                sender=smtp_sender,
-                to=usuario.nome,
+                nome=usuario.nome,
                 url=PWD_RESET_URL,
                 pwd_reset_token=token,
                 mens_expire=RESET_TOKEN_EXPIRE_MINUTES,
             )
 
-            _enviar_email_debug(
-                email=usuario.email,
-                subject="API - Redefinição de Senha",
-                msg=msg,
-            )
\ No newline at end of file
+            enfileirar(Mensagem(
+                destinatario=usuario.email,
+                assunto="API - Redefinição de Senha",
+                corpo=msg,
+            ))
@@ -1,9 +1,40 @@
+import time
+from datetime import datetime
+from typing import AsyncIterator, Optional
 from task_manager_api.repositories.tarefa_repository import TarefaRepository
-from task_manager_api.serializers.tarefa_serializer import TarefaPatchRequest
-from task_manager_api.models.tarefa import Tarefa
+from task_manager_api.serializers.tarefa_serializer import (
+    TarefaRequest,
+    TarefaPatchRequest,
+    TarefaResponse,
+    TarefaListagemQuery,
+    TarefaBuscaQuery,
+    TarefaAlteracoesQuery,
+    TarefaPaginaResponse,
+    TarefaAlteracoesResponse,
+    TarefaBulkPatchItem,
+    TarefaBulkResultado,
+    TarefaBulkResponse,
+    TarefaEstatisticasResponse,
+    TarefaEventoResponse
+)
+from task_manager_api.models.tarefa import Tarefa, StatusEnum, PrioridadeEnum
+from task_manager_api.pagination import (
+    codificar_cursor,
+    decodificar_cursor,
+    codificar_cursor_alteracoes,
+    decodificar_cursor_alteracoes
+)
+from task_manager_api.config import ESTATISTICAS_CONTADORES, EVENTOS_DURACAO_MAXIMA_SEGUNDOS
+from task_manager_api.busca import extrair_termos
+from task_manager_api.etag import etag_tarefa, checar_pre_condicao
+from task_manager_api.eventos_tarefas import EventoTarefa, hub_eventos
+from task_manager_api.database import executar_no_banco
+from sqlalchemy.orm.exc import StaleDataError
 from fastapi.exceptions import HTTPException
 from fastapi import status
 
+TAREFA_ALTERADA = "A tarefa foi alterada por outra requisição"
+
 class TarefaService:
     def __init__(
         self, 
@@ -18,6 +49,122 @@ class TarefaService:
         tarefas = self.tarefa_repository.get_tarefas_por_usuario_id(usuario_id)
         return tarefas
     
+    def get_versao_colecao(
+        self,
+        usuario_id: int
+    ) -> int:
+        versao = self.tarefa_repository.get_versao_colecao(usuario_id)
+        return versao
+    
+    def get_tarefas_paginadas(
+        self,
+        usuario_id: int,
+        filtros: TarefaListagemQuery
+    ) -> TarefaPaginaResponse:
+        cursor = None
+        if filtros.cursor:
+            cursor = decodificar_cursor(filtros.cursor, filtros.ordenar_por, filtros.ordem)
+        
+        # Busca um item a mais para saber se existe próxima página
+        tarefas = self.tarefa_repository.get_tarefas_paginadas(
+            usuario_id=usuario_id,
+            limite=filtros.limite + 1,
+            cursor=cursor,
+            status=filtros.status,
+            prioridade=filtros.prioridade,
+            criada_apos=filtros.criada_apos,
+            criada_antes=filtros.criada_antes,
+            ordenar_por=filtros.ordenar_por,
+            ordem=filtros.ordem
+        )
+        
+        proximo_cursor = None
+        if len(tarefas) > filtros.limite:
+            tarefas = tarefas[:filtros.limite]
+            ultima = tarefas[-1]
+            proximo_cursor = codificar_cursor(
+                filtros.ordenar_por,
+                filtros.ordem,
+                ultima.data_criacao,
+                ultima.id
+            )
+        
+        return TarefaPaginaResponse(
+            itens=[TarefaResponse.model_validate(tarefa, from_attributes=True) for tarefa in tarefas],
+            proximo_cursor=proximo_cursor
+        )
+    
+    def get_alteracoes(
+        self,
+        usuario_id: int,
+        filtros: TarefaAlteracoesQuery
+    ) -> TarefaAlteracoesResponse:
+        """
+        Tarefas criadas, alteradas e removidas depois da revisão `desde`, em
+        ordem de revisão. Sem `desde`, é a sincronização completa: todas as
+        tarefas atuais e, nas páginas seguintes, as removidas durante a
+        paginação.
+        """
+        
+        # Lida antes das alterações: toda revisão até ela já foi confirmada
+        # e estará na consulta seguinte
+        versao = self.tarefa_repository.get_versao_colecao(usuario_id)
+        if filtros.cursor:
+            revisao, tarefa_id, desde = decodificar_cursor_alteracoes(filtros.cursor)
+            apos = (revisao, tarefa_id)
+        elif filtros.desde is not None:
+            desde = filtros.desde
+            apos = (desde, None)
+        else:
+            # Sincronização completa: as remoções anteriores não interessam
+            desde = versao
+            apos = (-1, None)
+        
+        alteracoes = self.tarefa_repository.get_alteracoes(
+            usuario_id=usuario_id,
+            limite=filtros.limite + 1,
+            apos=apos,
+            removidas_desde=desde
+        )
+        
+        proximo_cursor = None
+        revisao = None
+        if len(alteracoes) > filtros.limite:
+            alteracoes = alteracoes[:filtros.limite]
+            ultima = alteracoes[-1]
+            proximo_cursor = codificar_cursor_alteracoes(ultima.revisao, ultima.id, desde)
+        else:
+            revisao = max([versao] + [alteracao.revisao for alteracao in alteracoes[-1:]])
+        
+        # O estado atual das tarefas: uma tarefa alterada depois da consulta
+        # acima volta em uma página seguinte, e uma removida, como remoção
+        tarefas = self._get_tarefas_por_ids([alteracao.id for alteracao in alteracoes if not alteracao.removida])
+        removidas = {alteracao.id for alteracao in alteracoes if alteracao.removida}
+        
+        return TarefaAlteracoesResponse(
+            alteradas=[
+                TarefaResponse.model_validate(tarefas[alteracao.id], from_attributes=True)
+                for alteracao in alteracoes
+                if not alteracao.removida and alteracao.id in tarefas
+            ],
+            # O SQLite pode reutilizar o id de uma tarefa removida
+            removidas=sorted(removidas - tarefas.keys()),
+            proximo_cursor=proximo_cursor,
+            revisao=revisao
+        )
+    
+    def buscar_tarefas(
+        self,
+        usuario_id: int,
+        filtros: TarefaBuscaQuery
+    ) -> list[Tarefa]:
+        termos = extrair_termos(filtros.q)
+        if not termos:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Informe ao menos uma palavra para a busca")
+        
+        tarefas = self.tarefa_repository.buscar_tarefas(usuario_id, termos, filtros.limite)
+        return tarefas
+    
     def get_tarefa_por_id(
         self, 
         tarefa_id: int,
@@ -32,18 +179,77 @@ class TarefaService:
         
         return tarefa
     
+    def get_tarefas_em_lote(
+        self,
+        tarefa_ids: list[int],
+        usuario_id: int
+    ) -> TarefaBulkResponse:
+        """
+        Busca as tarefas de `tarefa_ids` em uma única consulta. Cada id recebe
+        seu resultado: 200 com a tarefa, 404 ou 403, como em GET /tarefas/{id}.
+        """
+        
+        tarefas = self._get_tarefas_por_ids(tarefa_ids)
+        resultados = []
+        
+        for indice, tarefa_id in enumerate(tarefa_ids):
+            tarefa = tarefas.get(tarefa_id)
+            erro = self._checar_permissao(tarefa, usuario_id, "acessar")
+            if erro:
+                status_code, detail = erro
+                resultados.append(TarefaBulkResultado(
+                    indice=indice,
+                    id=tarefa_id,
+                    status_code=status_code,
+                    detail=detail
+                ))
+                continue
+            
+            resultados.append(TarefaBulkResultado(
+                indice=indice,
+                id=tarefa_id,
+                status_code=status.HTTP_200_OK,
+                tarefa=TarefaResponse.model_validate(tarefa, from_attributes=True)
+            ))
+        
+        return self._resposta_bulk(resultados)
+    
+    def get_estatisticas(
+        self,
+        usuario_id: int
+    ) -> TarefaEstatisticasResponse:
+        if ESTATISTICAS_CONTADORES:
+            linhas = self.tarefa_repository.get_contadores(usuario_id)
+        else:
+            linhas = self.tarefa_repository.contar_por_status_prioridade(usuario_id)
+        
+        # Combinações sem tarefas aparecem com 0
+        por_status = dict.fromkeys((item.value for item in StatusEnum), 0)
+        por_prioridade = dict.fromkeys((item.value for item in PrioridadeEnum), 0)
+        for status_tarefa, prioridade, quantidade in linhas:
+            por_status[status_tarefa] = por_status.get(status_tarefa, 0) + quantidade
+            por_prioridade[prioridade] = por_prioridade.get(prioridade, 0) + quantidade
+        
+        return TarefaEstatisticasResponse(
+            total=sum(por_status.values()),
+            por_status=por_status,
+            por_prioridade=por_prioridade
+        )
+    
     def add_tarefa(
         self, 
         tarefa: Tarefa
     ) -> Tarefa:
         nova_tarefa = self.tarefa_repository.add_update_tarefa(tarefa)
+        self._publicar("criada", nova_tarefa.usuario_id, nova_tarefa.revisao, tarefa=nova_tarefa)
         return nova_tarefa
     
     def update_tarefa(
         self, 
         tarefa_id: int,
         dados: TarefaPatchRequest,
-        usuario_id: int
+        usuario_id: int,
+        if_match: Optional[str] = None
     ) -> Tarefa:
         tarefa_existente = self.tarefa_repository.get_tarefa_por_id(tarefa_id)
         if not tarefa_existente:
@@ -52,25 +258,24 @@ class TarefaService:
         if tarefa_existente.usuario_id != usuario_id:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Você não tem permissão para atualizar esta tarefa")
         
-        if dados.titulo is not None:
-            tarefa_existente.titulo = dados.titulo
-
-        if dados.descricao is not None:
-            tarefa_existente.descricao = dados.descricao
-
-        if dados.status is not None:
-            tarefa_existente.status = dados.status
-
-        if dados.prioridade is not None:
-            tarefa_existente.prioridade = dados.prioridade
+        checar_pre_condicao(if_match, etag_tarefa(tarefa_existente.id, tarefa_existente.versao), TAREFA_ALTERADA)
+        revisao_anterior = tarefa_existente.revisao
+        self._aplicar_alteracoes(tarefa_existente, dados)
         
-        tarefa_atualizada = self.tarefa_repository.add_update_tarefa(tarefa_existente)
+        try:
+            tarefa_atualizada = self.tarefa_repository.add_update_tarefa(tarefa_existente)
+        except StaleDataError:
+            self._levantar_alteracao_concorrente(if_match)
+        # Sem alteração efetiva, a revisão não muda e não há evento
+        if tarefa_atualizada.revisao != revisao_anterior:
+            self._publicar("alterada", usuario_id, tarefa_atualizada.revisao, tarefa=tarefa_atualizada)
         return tarefa_atualizada
     
     def delete_tarefa(
         self, 
         tarefa_id: int,
-        usuario_id: int
+        usuario_id: int,
+        if_match: Optional[str] = None
     ) -> None:
         tarefa_existente = self.tarefa_repository.get_tarefa_por_id(tarefa_id)
         if not tarefa_existente:
@@ -79,4 +284,256 @@ class TarefaService:
         if tarefa_existente.usuario_id != usuario_id:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Você não tem permissão para deletar esta tarefa")
         
-        self.tarefa_repository.delete_tarefa(tarefa_existente)
\ No newline at end of file
+        checar_pre_condicao(if_match, etag_tarefa(tarefa_existente.id, tarefa_existente.versao), TAREFA_ALTERADA)
+        try:
+            revisao = self.tarefa_repository.delete_tarefa(tarefa_existente)
+        except StaleDataError:
+            self._levantar_alteracao_concorrente(if_match)
+        self._publicar("removida", usuario_id, revisao, id=tarefa_id)
+    
+    def add_tarefas(
+        self,
+        itens: list[TarefaRequest],
+        usuario_id: int
+    ) -> TarefaBulkResponse:
+        resultados = []
+        valores = []
+        indices = []
+        
+        for indice, item in enumerate(itens):
+            erro = self._validar_enums(item.status, item.prioridade)
+            if erro:
+                status_code, detail = erro
+                resultados.append(TarefaBulkResultado(
+                    indice=indice,
+                    status_code=status_code,
+                    detail=detail
+                ))
+                continue
+            
+            valores.append({
+                "titulo": item.titulo,
+                "descricao": item.descricao,
+                "status": StatusEnum(item.status),
+                "prioridade": PrioridadeEnum(item.prioridade),
+                "usuario_id": usuario_id,
+                "data_criacao": item.data_criacao or datetime.now(),
+            })
+            indices.append(indice)
+        
+        if valores:
+            novas_tarefas = self.tarefa_repository.add_tarefas(valores)
+            self._publicar_lote(usuario_id, novas_tarefas[0].revisao)
+            for indice, tarefa in zip(indices, novas_tarefas):
+                resultados.append(TarefaBulkResultado(
+                    indice=indice,
+                    id=tarefa.id,
+                    status_code=status.HTTP_201_CREATED,
+                    tarefa=TarefaResponse.model_validate(tarefa, from_attributes=True)
+                ))
+        
+        return self._resposta_bulk(resultados)
+    
+    def update_tarefas(
+        self,
+        itens: list[TarefaBulkPatchItem],
+        usuario_id: int
+    ) -> TarefaBulkResponse:
+        tarefas = self._get_tarefas_por_ids(item.id for item in itens)
+        resultados = []
+        alteradas = {}
+        
+        for indice, item in enumerate(itens):
+            erro = self._checar_permissao(tarefas.get(item.id), usuario_id, "atualizar")
+            if not erro:
+                erro = self._validar_enums(item.status, item.prioridade)
+            if erro:
+                status_code, detail = erro
+                resultados.append(TarefaBulkResultado(
+                    indice=indice,
+                    id=item.id,
+                    status_code=status_code,
+                    detail=detail
+                ))
+                continue
+            
+            tarefa = tarefas[item.id]
+            self._aplicar_alteracoes(tarefa, item)
+            alteradas[tarefa.id] = tarefa
+            resultados.append(TarefaBulkResultado(
+                indice=indice,
+                id=item.id,
+                status_code=status.HTTP_200_OK
+            ))
+        
+        # As respostas são montadas antes do commit, que expira os objetos
+        for resultado in resultados:
+            if resultado.status_code == status.HTTP_200_OK:
+                resultado.tarefa = TarefaResponse.model_validate(
+                    alteradas[resultado.id], from_attributes=True
+                )
+        
+        if alteradas:
+            try:
+                revisoes = self.tarefa_repository.update_tarefas(list(alteradas.values()))
+            except StaleDataError:
+                self._levantar_alteracao_concorrente(None)
+            if usuario_id in revisoes:
+                self._publicar_lote(usuario_id, revisoes[usuario_id])
+        
+        return self._resposta_bulk(resultados)
+    
+    def delete_tarefas(
+        self,
+        tarefa_ids: list[int],
+        usuario_id: int
+    ) -> TarefaBulkResponse:
+        tarefas = self._get_tarefas_por_ids(tarefa_ids)
+        resultados = []
+        removidas = set()
+        
+        for indice, tarefa_id in enumerate(tarefa_ids):
+            erro = self._checar_permissao(tarefas.get(tarefa_id), usuario_id, "deletar")
+            if erro:
+                status_code, detail = erro
+                resultados.append(TarefaBulkResultado(
+                    indice=indice,
+                    id=tarefa_id,
+                    status_code=status_code,
+                    detail=detail
+                ))
+                continue
+            
+            removidas.add(tarefa_id)
+            resultados.append(TarefaBulkResultado(
+                indice=indice,
+                id=tarefa_id,
+                status_code=status.HTTP_200_OK,
+                detail="Tarefa deletada com sucesso."
+            ))
+        
+        if removidas:
+            revisoes = self.tarefa_repository.delete_tarefas(list(removidas))
+            if usuario_id in revisoes:
+                self._publicar_lote(usuario_id, revisoes[usuario_id])
+        
+        return self._resposta_bulk(resultados)
+    
+    async def abrir_eventos(
+        self,
+        usuario_id: int,
+        ultimo_id: Optional[int],
+        expira_em: Optional[float]
+    ) -> AsyncIterator[str]:
+        """
+        Abre o stream de eventos do usuário, retomando depois de `ultimo_id`
+        (Last-Event-ID), até o token expirar (`expira_em`, timestamp) ou
+        `EVENTOS_DURACAO_MAXIMA_SEGUNDOS`. O banco só é usado aqui, antes
+        do stream, e apenas na retomada.
+        """
+        
+        versao = 0
+        if ultimo_id is not None:
+            versao = await executar_no_banco(
+                self.tarefa_repository.db_session,
+                self._versao_para_retomada,
+                usuario_id
+            )
+        duracao = EVENTOS_DURACAO_MAXIMA_SEGUNDOS
+        if expira_em is not None:
+            duracao = min(duracao, expira_em - time.time())
+        conexao, quadros = hub_eventos.conectar(usuario_id, ultimo_id, versao)
+        return hub_eventos.transmitir(conexao, quadros, duracao)
+    
+    def _versao_para_retomada(self, usuario_id: int) -> int:
+        """Lê a versão da coleção e devolve a conexão ao pool antes do stream."""
+        
+        versao = self.tarefa_repository.get_versao_colecao(usuario_id)
+        self.tarefa_repository.db_session.rollback()
+        return versao
+    
+    def _publicar(self, tipo: str, usuario_id: int, revisao: int, **dados) -> None:
+        """Publica o evento de uma escrita já confirmada."""
+        
+        if "tarefa" in dados:
+            dados["tarefa"] = TarefaResponse.model_validate(dados["tarefa"], from_attributes=True)
+        evento = TarefaEventoResponse(revisao=revisao, **dados)
+        hub_eventos.publicar(usuario_id, EventoTarefa(revisao, tipo, evento.model_dump_json(exclude_none=True)))
+    
+    def _publicar_lote(self, usuario_id: int, revisao: int) -> None:
+        """Operações em lote publicam só a revisão: o cliente busca as alterações."""
+        
+        self._publicar("sincronizar", usuario_id, revisao, desde=revisao - 1)
+    
+    def _get_tarefas_por_ids(self, tarefa_ids) -> dict[int, Tarefa]:
+        ids_unicos = list(dict.fromkeys(tarefa_ids))
+        tarefas = self.tarefa_repository.get_tarefas_por_ids(ids_unicos)
+        return {tarefa.id: tarefa for tarefa in tarefas}
+    
+    @staticmethod
+    def _levantar_alteracao_concorrente(if_match: Optional[str]) -> None:
+        """
+        Outra requisição alterou a tarefa entre a leitura e a gravação (a
+        versão no banco não é mais a carregada): 412 para quem enviou
+        If-Match, 409 para os demais.
+        """
+        
+        if if_match is not None:
+            raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail=TAREFA_ALTERADA)
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=TAREFA_ALTERADA)
+    
+    @staticmethod
+    def _checar_permissao(
+        tarefa: Optional[Tarefa],
+        usuario_id: int,
+        acao: str
+    ) -> Optional[tuple[int, str]]:
+        """Versão sem exceção das checagens de existência e propriedade."""
+        
+        if not tarefa:
+            return status.HTTP_404_NOT_FOUND, "Tarefa não encontrada"
+        
+        if tarefa.usuario_id != usuario_id:
+            return status.HTTP_403_FORBIDDEN, f"Você não tem permissão para {acao} esta tarefa"
+        
+        return None
+    
+    @staticmethod
+    def _validar_enums(
+        status_tarefa: Optional[str],
+        prioridade: Optional[str]
+    ) -> Optional[tuple[int, str]]:
+        if status_tarefa is not None and status_tarefa not in StatusEnum._value2member_map_:
+            return status.HTTP_422_UNPROCESSABLE_ENTITY, "Status inválido"
+        
+        if prioridade is not None and prioridade not in PrioridadeEnum._value2member_map_:
+            return status.HTTP_422_UNPROCESSABLE_ENTITY, "Prioridade inválida"
+        
+        return None
+    
+    @staticmethod
+    def _aplicar_alteracoes(
+        tarefa: Tarefa,
+        dados: TarefaPatchRequest
+    ) -> None:
+        if dados.titulo is not None:
+            tarefa.titulo = dados.titulo
+
+        if dados.descricao is not None:
+            tarefa.descricao = dados.descricao
+
+        if dados.status is not None:
+            tarefa.status = dados.status
+
+        if dados.prioridade is not None:
+            tarefa.prioridade = dados.prioridade
+    
+    @staticmethod
+    def _resposta_bulk(resultados: list[TarefaBulkResultado]) -> TarefaBulkResponse:
+        resultados.sort(key=lambda resultado: resultado.indice)
+        sucessos = sum(1 for resultado in resultados if resultado.status_code < 400)
+        return TarefaBulkResponse(
+            sucessos=sucessos,
+            falhas=len(resultados) - sucessos,
+            resultados=resultados
+        )
@@ -1,21 +1,23 @@
-from datetime import datetime, timedelta
-from dateutil import tz
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 from functools import partial
-from jose import jwt
 from task_manager_api.config import SECRET_KEY, ALGORITHM
 
+# python-jose (e ecdsa/rsa/pyasn1) é importado no primeiro uso de um token,
+# e não na inicialização da aplicação
+
 def criar_access_token(
     data: dict, 
     expires_delta: Optional[timedelta] = None, 
     scope: str = "access_token"
 ) -> str:
     """Cria um token de acesso"""
+    from jose import jwt
     to_encode = data.copy()
     if expires_delta:
-        expire = datetime.now(tz=tz.tzutc()) + expires_delta
+        expire = datetime.now(tz=timezone.utc) + expires_delta
     else:
-        expire = datetime.now(tz=tz.tzutc()) + timedelta(minutes=30)
+        expire = datetime.now(tz=timezone.utc) + timedelta(minutes=30)
     to_encode.update({"exp": expire, "scope": scope})
     encoded_jwt = jwt.encode(
         to_encode, 
@@ -24,4 +26,17 @@ def criar_access_token(
     )
     return encoded_jwt
 
-criar_refresh_token = partial(criar_access_token, scope="refresh_token")
\ No newline at end of file
+criar_refresh_token = partial(criar_access_token, scope="refresh_token")
+
+def decodificar_token(token: str) -> Optional[dict]:
+    """Claims do token, se a assinatura e a expiração forem válidas; senão None"""
+    from jose import JWTError, jwt
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+
+def expiracao_token(token: str) -> Optional[float]:
+    """Timestamp do `exp` de um token já validado (sem verificar a assinatura)"""
+    from jose import jwt
+    return jwt.get_unverified_claims(token).get("exp")
@@ -1,10 +1,25 @@
-from task_manager_api.serializers.usuario_serializer import UsuarioPatchRequest, UsuarioSenhaPatchRequest
+from typing import Optional
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+from task_manager_api.serializers.usuario_serializer import (
+    UsuarioPatchRequest,
+    UsuarioSenhaPatchRequest,
+    RemocaoUsuarioResponse
+)
 from task_manager_api.repositories.usuario_repository import UsuarioRepository
 from task_manager_api.repositories.tarefa_repository import TarefaRepository
-from task_manager_api.models.usuario import Usuario
-from task_manager_api.security import criar_hash_senha
+from task_manager_api.services.remocao_usuario_service import RemocaoUsuarioService
+from task_manager_api.models.usuario import Usuario, UsuarioAutenticado
+from task_manager_api.cache import token_cache
+from task_manager_api.security import criar_hash_senha_async
 from fastapi.exceptions import HTTPException
 from fastapi import status
+from task_manager_api.database import executar_no_banco
+
+USUARIO_ALTERADO = HTTPException(
+    status_code=status.HTTP_409_CONFLICT,
+    detail="O usuário foi alterado por outra requisição"
+)
 
 class UsuarioService:
     def __init__(
@@ -22,29 +37,46 @@ class UsuarioService:
         
     def checar_usuario_existente(
         self, 
-        username: str, 
-        email: str
+        username: Optional[str], 
+        email: Optional[str],
+        excluindo_id: Optional[int] = None
     ) -> None:
-        usuario_por_username = self.usuario_repository.get_usuario_por_username(username)
-        if usuario_por_username:
+        conflitos = self.usuario_repository.get_conflitos(username, email, excluindo_id)
+        self._levantar_conflito(conflitos)
+    
+    def _levantar_conflito(self, conflitos: set[str]) -> None:
+        if "username" in conflitos:
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Username já cadastrado")
-        
-        usuario_por_email = self.usuario_repository.get_usuario_por_email(email)
-        if usuario_por_email:
+        if "email" in conflitos:
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email já cadastrado")
+    
+    def _salvar_usuario(
+        self,
+        usuario: Usuario
+    ) -> Usuario:
+        """
+        Grava o usuário. Se outra requisição gravou o mesmo username/email
+        depois da checagem, a restrição de unicidade do banco falha e vira
+        o mesmo 409 da checagem; se alterou o próprio usuário depois da
+        leitura (versão diferente), também 409. Os tokens do usuário em
+        cache são invalidados, para valerem os dados gravados.
+        """
         
-    def checar_usuario_existente_excluindo_id(
-        self, 
-        username: str, 
-        email: str, usuario_id: int
-    ) -> None:
-        usuario_por_username = self.usuario_repository.get_usuario_por_username_excluindo_id(username, usuario_id)
-        if usuario_por_username:
-            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Username já cadastrado")
-        
-        usuario_por_email = self.usuario_repository.get_usuario_por_email_excluindo_id(email, usuario_id)
-        if usuario_por_email:
-            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email já cadastrado")
+        try:
+            usuario_salvo = self.usuario_repository.add_update_usuario(usuario)
+        except StaleDataError:
+            raise USUARIO_ALTERADO
+        except IntegrityError as erro:
+            mensagem = str(erro.orig).lower()
+            if "unique" not in mensagem and "duplicate" not in mensagem:
+                raise
+            self._levantar_conflito({campo for campo in ("username", "email") if campo in mensagem})
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Username ou email já cadastrado"
+            )
+        token_cache.invalidar_usuario(usuario_salvo.id)
+        return usuario_salvo
         
     def checar_usuario_is_admin(
         self,
@@ -75,7 +107,7 @@ class UsuarioService:
     def get_usuario_por_id(
         self,
         usuario_id: int,
-        usuario_logado: Usuario
+        usuario_logado: UsuarioAutenticado
     ) -> Usuario:
         usuario = self.usuario_repository.get_usuario_por_id(usuario_id)
         if not usuario:
@@ -87,11 +119,11 @@ class UsuarioService:
             self.checar_usuario_is_admin(usuario_logado)
         return usuario
     
-    def get_tarefas_por_usuario_id(
+    def checar_acesso_tarefas_usuario(
         self,
         usuario_id: int,
-        usuario_logado: Usuario
-    ) -> list[Usuario]:
+        usuario_logado: UsuarioAutenticado
+    ) -> None:
         usuario = self.usuario_repository.get_usuario_por_id(usuario_id)
         if not usuario:
             raise HTTPException(
@@ -99,37 +131,62 @@ class UsuarioService:
                 detail="Usuário não encontrado"
             )
         self.checar_usuario_is_admin(usuario_logado)
+    
+    def get_tarefas_por_usuario_id(
+        self,
+        usuario_id: int,
+        usuario_logado: UsuarioAutenticado
+    ) -> list[Usuario]:
+        self.checar_acesso_tarefas_usuario(usuario_id, usuario_logado)
         tarefa_repository = TarefaRepository(self.usuario_repository.db_session)
         tarefas = tarefa_repository.get_tarefas_por_usuario_id(usuario_id)
         return tarefas
         
-    def add_usuario(
+    async def add_usuario(
         self, 
         usuario: Usuario
     ) -> Usuario:
         self.validar_username_senha(usuario)
-        self.checar_usuario_existente(usuario.username, usuario.email)
-        usuario.senha = criar_hash_senha(usuario.senha)
-        novo_usuario = self.usuario_repository.add_update_usuario(usuario)
+        await executar_no_banco(
+            self.usuario_repository.db_session,
+            self.checar_usuario_existente,
+            usuario.username,
+            usuario.email
+        )
+        usuario.senha = await criar_hash_senha_async(usuario.senha)
+        novo_usuario = await executar_no_banco(
+            self.usuario_repository.db_session,
+            self._salvar_usuario,
+            usuario
+        )
         return novo_usuario
     
-    def add_admin(
+    async def add_admin(
         self,
         usuario: Usuario
     ) -> Usuario:
         self.validar_username_senha(usuario)
-        self.checar_usuario_existente(usuario.username, usuario.email)
+        await executar_no_banco(
+            self.usuario_repository.db_session,
+            self.checar_usuario_existente,
+            usuario.username,
+            usuario.email
+        )
         self.checar_usuario_is_admin(usuario)
-        usuario.senha = criar_hash_senha(usuario.senha)
+        usuario.senha = await criar_hash_senha_async(usuario.senha)
         usuario.is_admin = True
-        novo_usuario =  self.usuario_repository.add_update_usuario(usuario)
+        novo_usuario = await executar_no_banco(
+            self.usuario_repository.db_session,
+            self._salvar_usuario,
+            usuario
+        )
         return novo_usuario
     
     def update_usuario(
         self,
         usuario_id: int,
         dados: UsuarioPatchRequest,
-        usuario_logado: Usuario
+        usuario_logado: UsuarioAutenticado
     ) -> Usuario:
 
         usuario_existente = self.usuario_repository.get_usuario_por_id(usuario_id)
@@ -146,20 +203,21 @@ class UsuarioService:
                 detail="Você não tem permissão para atualizar este usuário."
             )
         
+        self.checar_usuario_existente(dados.username, dados.email, usuario_id)
+
         if dados.username is not None:
-            self.checar_usuario_existente_excluindo_id(dados.username, usuario_existente.email, usuario_id)
             usuario_existente.username = dados.username
 
         if dados.email is not None:
-            self.checar_usuario_existente_excluindo_id(usuario_existente.username, dados.email, usuario_id)
             usuario_existente.email = dados.email
 
         if dados.nome is not None:
             usuario_existente.nome = dados.nome
 
-        return self.usuario_repository.add_update_usuario(usuario_existente)
+        usuario_atualizado = self._salvar_usuario(usuario_existente)
+        return usuario_atualizado
     
-    def update_senha_usuario(
+    async def update_senha_usuario(
         self,
         usuario: Usuario,
         dados: UsuarioSenhaPatchRequest,
@@ -171,16 +229,44 @@ class UsuarioService:
                 detail="Senha e confirmar senha não coincidem."
             )
 
-        usuario.senha = criar_hash_senha(dados.senha)
+        usuario.senha = await criar_hash_senha_async(dados.senha)
         
-        return self.usuario_repository.add_update_usuario(usuario)
+        usuario_atualizado = await executar_no_banco(
+            self.usuario_repository.db_session,
+            self._salvar_usuario,
+            usuario
+        )
+        return usuario_atualizado
     
     def delete_usuario(
         self,
         usuario_id: int,
-        usuario_logado: Usuario
+        usuario_logado: UsuarioAutenticado
     ) -> None:
         
+        usuario_existente = self._get_usuario_para_remocao(usuario_id, usuario_logado)
+        try:
+            self.usuario_repository.delete_usuario(usuario_existente)
+        except StaleDataError:
+            # Alterado por outra requisição depois da leitura: nada foi removido
+            raise USUARIO_ALTERADO
+        token_cache.invalidar_usuario(usuario_id)
+    
+    def agendar_delete_usuario(
+        self,
+        usuario_id: int,
+        usuario_logado: UsuarioAutenticado
+    ) -> RemocaoUsuarioResponse:
+        
+        self._get_usuario_para_remocao(usuario_id, usuario_logado)
+        return RemocaoUsuarioService().registrar(usuario_id)
+    
+    def _get_usuario_para_remocao(
+        self,
+        usuario_id: int,
+        usuario_logado: UsuarioAutenticado
+    ) -> Usuario:
+        
         usuario_existente = self.usuario_repository.get_usuario_por_id(usuario_id)
         if not usuario_existente:
             raise HTTPException(
@@ -189,4 +275,4 @@ class UsuarioService:
             )
 
         self.checar_usuario_is_admin(usuario_logado)
-        self.usuario_repository.delete_usuario(usuario_existente)
\ No newline at end of file
+        return usuario_existente
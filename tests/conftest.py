@@ -0,0 +1,87 @@
+"""
+Fixtures compartilhadas pelos testes da API.
+
+O app usa o `database.db` do diretório atual: a sessão de testes roda em um
+diretório temporário, com um banco novo, e cada teste cria os próprios
+usuários (`criar_usuario`), sem depender dos dados dos demais.
+"""
+
+import itertools
+import os
+import shutil
+import tempfile
+from typing import NamedTuple
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+SENHA = "senha-dos-testes"
+_sequencia = itertools.count(1)
+
+class UsuarioTeste(NamedTuple):
+    id: int
+    username: str
+    email: str
+    headers: dict
+
+_diretorio_anterior = os.getcwd()
+_diretorio_banco = tempfile.mkdtemp(prefix="task_manager_testes_")
+
+def pytest_configure(config):
+    # Antes da coleta: o engine guarda o caminho absoluto do banco ao ser
+    # criado, na importação de task_manager_api.database
+    os.chdir(_diretorio_banco)
+
+def pytest_unconfigure(config):
+    os.chdir(_diretorio_anterior)
+    shutil.rmtree(_diretorio_banco, ignore_errors=True)
+
+@pytest.fixture(scope="session")
+def client():
+    from task_manager_api.app import app
+    
+    with TestClient(app) as client:
+        yield client
+
+@pytest.fixture(scope="session")
+def hash_senha():
+    from task_manager_api.security import criar_hash_senha
+    
+    # Um único hash para todos os usuários: o bcrypt fica fora dos testes
+    return criar_hash_senha(SENHA)
+
+@pytest.fixture
+def criar_usuario(client, hash_senha):
+    """Cria um usuário direto no banco e retorna os headers com um token dele."""
+    
+    from task_manager_api.database import engine
+    from task_manager_api.models.usuario import Usuario
+    from task_manager_api.services.token_service import criar_access_token
+    
+    def criar(is_admin: bool = False) -> UsuarioTeste:
+        username = f"usuario{next(_sequencia)}"
+        with Session(engine) as session:
+            usuario = Usuario(
+                username=username,
+                senha=hash_senha,
+                nome=username.capitalize(),
+                email=f"{username}@example.com",
+                is_admin=is_admin,
+            )
+            session.add(usuario)
+            session.commit()
+            session.refresh(usuario)
+            token = criar_access_token({"sub": username})
+            return UsuarioTeste(usuario.id, username, usuario.email, {"Authorization": f"Bearer {token}"})
+    
+    return criar
+
+@pytest.fixture
+def criar_tarefa(client):
+    def criar(usuario: UsuarioTeste, **dados) -> dict:
+        tarefa = {"titulo": "Tarefa", "status": "pendente", "prioridade": "media", **dados}
+        r = client.post("/tarefas", json=tarefa, headers=usuario.headers)
+        assert r.status_code == 201, r.text
+        return r.json()
+    
+    return criar
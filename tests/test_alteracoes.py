@@ -0,0 +1,101 @@
+def _alteracoes(client, usuario, **params) -> dict:
+    r = client.get("/tarefas/changes", params=params, headers=usuario.headers)
+    assert r.status_code == 200, r.text
+    return r.json()
+
+def _todas_as_paginas(client, usuario, **params) -> tuple[list[dict], list[int], int]:
+    alteradas, removidas = [], []
+    while True:
+        pagina = _alteracoes(client, usuario, **params)
+        alteradas += pagina["alteradas"]
+        removidas += pagina["removidas"]
+        if pagina["proximo_cursor"] is None:
+            return alteradas, removidas, pagina["revisao"]
+        # Só a última página informa a revisão
+        assert pagina["revisao"] is None
+        params = {"limite": params.get("limite"), "cursor": pagina["proximo_cursor"]}
+
+def test_sincronizacao_completa(client, criar_usuario, criar_tarefa):
+    ana = criar_usuario()
+    a = criar_tarefa(ana, titulo="a")
+    b = criar_tarefa(ana, titulo="b")
+    client.delete(f"/tarefas/{b['id']}", headers=ana.headers)
+    
+    pagina = _alteracoes(client, ana)
+    
+    # Sem `desde`: o estado atual, sem as remoções anteriores
+    assert [tarefa["id"] for tarefa in pagina["alteradas"]] == [a["id"]]
+    assert pagina["removidas"] == []
+    assert pagina["proximo_cursor"] is None
+    assert pagina["revisao"] == 3
+
+def test_alteracoes_desde_uma_revisao(client, criar_usuario, criar_tarefa):
+    ana = criar_usuario()
+    a = criar_tarefa(ana, titulo="a")
+    b = criar_tarefa(ana, titulo="b")
+    revisao = _alteracoes(client, ana)["revisao"]
+    
+    client.patch(f"/tarefas/{a['id']}", json={"titulo": "a2"}, headers=ana.headers)
+    # Criada antes da remoção: o SQLite reutiliza o maior id removido
+    c = criar_tarefa(ana, titulo="c")
+    client.delete(f"/tarefas/{b['id']}", headers=ana.headers)
+    
+    pagina = _alteracoes(client, ana, desde=revisao)
+    assert [(tarefa["id"], tarefa["titulo"]) for tarefa in pagina["alteradas"]] == [(a["id"], "a2"), (c["id"], "c")]
+    assert pagina["removidas"] == [b["id"]]
+    assert pagina["revisao"] == revisao + 3
+    
+    # Já sincronizado: nada novo, mesma revisão
+    vazia = _alteracoes(client, ana, desde=pagina["revisao"])
+    assert (vazia["alteradas"], vazia["removidas"], vazia["revisao"]) == ([], [], pagina["revisao"])
+
+def test_tarefa_alterada_varias_vezes_aparece_uma_vez(client, criar_usuario, criar_tarefa):
+    ana = criar_usuario()
+    a = criar_tarefa(ana)
+    revisao = _alteracoes(client, ana)["revisao"]
+    for titulo in ("x", "y", "z"):
+        client.patch(f"/tarefas/{a['id']}", json={"titulo": titulo}, headers=ana.headers)
+    
+    pagina = _alteracoes(client, ana, desde=revisao)
+    assert [tarefa["titulo"] for tarefa in pagina["alteradas"]] == ["z"]
+
+def test_remocoes_em_lote_geram_tombstones(client, criar_usuario, criar_tarefa):
+    ana = criar_usuario()
+    ids = [criar_tarefa(ana)["id"] for _ in range(3)]
+    revisao = _alteracoes(client, ana)["revisao"]
+    
+    client.request("DELETE", "/tarefas/bulk", json={"ids": ids[:2]}, headers=ana.headers)
+    
+    pagina = _alteracoes(client, ana, desde=revisao)
+    assert pagina["alteradas"] == []
+    assert pagina["removidas"] == sorted(ids[:2])
+
+def test_paginacao_por_cursor(client, criar_usuario, criar_tarefa):
+    ana = criar_usuario()
+    ids = [criar_tarefa(ana, titulo=str(i))["id"] for i in range(5)]
+    revisao = _alteracoes(client, ana)["revisao"]
+    client.delete(f"/tarefas/{ids[0]}", headers=ana.headers)
+    client.patch(f"/tarefas/{ids[1]}", json={"titulo": "alterada"}, headers=ana.headers)
+    
+    alteradas, removidas, final = _todas_as_paginas(client, ana, limite=2)
+    assert [tarefa["id"] for tarefa in alteradas] == ids[2:] + [ids[1]]
+    assert final == revisao + 2
+    
+    alteradas, removidas, final = _todas_as_paginas(client, ana, desde=revisao, limite=1)
+    assert [tarefa["id"] for tarefa in alteradas] == [ids[1]]
+    assert removidas == [ids[0]]
+    assert final == revisao + 2
+
+def test_alteracoes_sao_por_usuario(client, criar_usuario, criar_tarefa):
+    ana, bia = criar_usuario(), criar_usuario()
+    criar_tarefa(bia)
+    
+    pagina = _alteracoes(client, ana, desde=0)
+    assert (pagina["alteradas"], pagina["removidas"]) == ([], [])
+
+def test_cursor_invalido(client, criar_usuario):
+    ana = criar_usuario()
+    
+    r = client.get("/tarefas/changes", params={"cursor": "nao-e-um-cursor"}, headers=ana.headers)
+    assert r.status_code == 400
+    assert client.get("/tarefas/changes", params={"desde": -1}, headers=ana.headers).status_code == 422
@@ -0,0 +1,67 @@
+from task_manager_api.config import BULK_TAMANHO_MAXIMO
+
+def _tarefa(titulo: str, **dados) -> dict:
+    return {"titulo": titulo, "status": "pendente", "prioridade": "media", **dados}
+
+def test_criar_em_lote_resultado_por_item_na_ordem(client, criar_usuario):
+    ana = criar_usuario()
+    itens = [_tarefa("a"), _tarefa("b", status="invalido"), _tarefa("c", prioridade="urgente"), _tarefa("d")]
+    
+    r = client.post("/tarefas/bulk", json={"itens": itens}, headers=ana.headers)
+    
+    assert r.status_code == 200
+    corpo = r.json()
+    assert (corpo["sucessos"], corpo["falhas"]) == (2, 2)
+    resultados = corpo["resultados"]
+    assert [resultado["indice"] for resultado in resultados] == [0, 1, 2, 3]
+    assert [resultado["status_code"] for resultado in resultados] == [201, 422, 422, 201]
+    assert resultados[1]["detail"] == "Status inválido"
+    assert resultados[2]["detail"] == "Prioridade inválida"
+    assert [resultados[i]["tarefa"]["titulo"] for i in (0, 3)] == ["a", "d"]
+    assert all(resultados[i]["id"] == resultados[i]["tarefa"]["id"] for i in (0, 3))
+    
+    listadas = client.get("/tarefas", headers=ana.headers).json()["itens"]
+    assert [tarefa["titulo"] for tarefa in listadas] == ["a", "d"]
+
+def test_atualizar_em_lote_checa_cada_item(client, criar_usuario, criar_tarefa):
+    ana, bia = criar_usuario(), criar_usuario()
+    propria = criar_tarefa(ana, titulo="própria")
+    alheia = criar_tarefa(bia, titulo="alheia")
+    
+    r = client.patch("/tarefas/bulk", json={"itens": [
+        {"id": propria["id"], "status": "concluida"},
+        {"id": alheia["id"], "status": "concluida"},
+        {"id": 999_999, "status": "concluida"},
+        {"id": propria["id"], "prioridade": "nenhuma"},
+    ]}, headers=ana.headers)
+    
+    assert r.status_code == 200
+    resultados = r.json()["resultados"]
+    assert [resultado["status_code"] for resultado in resultados] == [200, 403, 404, 422]
+    assert resultados[0]["tarefa"]["status"] == "concluida"
+    assert client.get(f"/tarefas/{propria['id']}", headers=ana.headers).json()["status"] == "concluida"
+    assert client.get(f"/tarefas/{alheia['id']}", headers=bia.headers).json()["status"] == "pendente"
+
+def test_deletar_em_lote_remove_so_as_permitidas(client, criar_usuario, criar_tarefa):
+    ana, bia = criar_usuario(), criar_usuario()
+    propria = criar_tarefa(ana)
+    alheia = criar_tarefa(bia)
+    
+    r = client.request("DELETE", "/tarefas/bulk", json={"ids": [alheia["id"], propria["id"], 999_999]}, headers=ana.headers)
+    
+    corpo = r.json()
+    assert (corpo["sucessos"], corpo["falhas"]) == (1, 2)
+    assert [resultado["status_code"] for resultado in corpo["resultados"]] == [403, 200, 404]
+    assert client.get(f"/tarefas/{propria['id']}", headers=ana.headers).status_code == 404
+    assert client.get(f"/tarefas/{alheia['id']}", headers=bia.headers).status_code == 200
+
+def test_lote_vazio_ou_acima_do_maximo(client, criar_usuario):
+    ana = criar_usuario()
+    
+    assert client.post("/tarefas/bulk", json={"itens": []}, headers=ana.headers).status_code == 422
+    itens = [_tarefa("x")] * (BULK_TAMANHO_MAXIMO + 1)
+    assert client.post("/tarefas/bulk", json={"itens": itens}, headers=ana.headers).status_code == 422
+    assert client.get("/tarefas", headers=ana.headers).json()["itens"] == []
+
+def test_lote_exige_autenticacao(client):
+    assert client.post("/tarefas/bulk", json={"itens": [_tarefa("x")]}).status_code == 401
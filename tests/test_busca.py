@@ -0,0 +1,71 @@
+from sqlalchemy import text
+from task_manager_api.config import BUSCA_CONSULTA_TAMANHO_MAXIMO
+from task_manager_api.database import engine
+
+def _buscar(client, usuario, q: str) -> list[int]:
+    r = client.get("/tarefas/search", params={"q": q}, headers=usuario.headers)
+    assert r.status_code == 200, r.text
+    return [tarefa["id"] for tarefa in r.json()]
+
+def _ocorrencias(termo: str) -> int:
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT count(*) FROM tarefa_fts WHERE tarefa_fts MATCH :termo"), {"termo": termo}).scalar()
+
+def test_busca_no_titulo_e_na_descricao(client, criar_usuario, criar_tarefa):
+    ana = criar_usuario()
+    titulo = criar_tarefa(ana, titulo="Relatório trimestral")
+    descricao = criar_tarefa(ana, titulo="Outra", descricao="revisar o relatório")
+    criar_tarefa(ana, titulo="Sem relação")
+    
+    assert sorted(_buscar(client, ana, "relatorio")) == sorted([titulo["id"], descricao["id"]])
+    # Todos os termos precisam estar presentes; o título pesa mais
+    assert _buscar(client, ana, "RELATÓRIO trimestral") == [titulo["id"]]
+
+def test_busca_so_nas_tarefas_do_usuario(client, criar_usuario, criar_tarefa):
+    ana, bia = criar_usuario(), criar_usuario()
+    criar_tarefa(bia, titulo="orçamento anual")
+    
+    assert _buscar(client, ana, "orçamento") == []
+
+def test_indice_acompanha_alteracoes_e_remocoes(client, criar_usuario, criar_tarefa):
+    ana = criar_usuario()
+    tarefa = criar_tarefa(ana, titulo="comprar abacaxi")
+    
+    client.patch(f"/tarefas/{tarefa['id']}", json={"titulo": "comprar banana"}, headers=ana.headers)
+    assert _buscar(client, ana, "abacaxi") == []
+    assert _buscar(client, ana, "banana") == [tarefa["id"]]
+    
+    client.delete(f"/tarefas/{tarefa['id']}", headers=ana.headers)
+    assert _buscar(client, ana, "banana") == []
+
+def test_indice_acompanha_operacoes_em_lote(client, criar_usuario):
+    ana = criar_usuario()
+    ids = [
+        resultado["id"]
+        for resultado in client.post("/tarefas/bulk", json={"itens": [
+            {"titulo": "lote kiwi", "status": "pendente", "prioridade": "baixa"},
+            {"titulo": "lote kiwi", "status": "pendente", "prioridade": "baixa"},
+        ]}, headers=ana.headers).json()["resultados"]
+    ]
+    assert sorted(_buscar(client, ana, "kiwi")) == sorted(ids)
+    
+    client.patch("/tarefas/bulk", json={"itens": [{"id": ids[0], "titulo": "lote manga"}]}, headers=ana.headers)
+    client.request("DELETE", "/tarefas/bulk", json={"ids": [ids[1]]}, headers=ana.headers)
+    assert _buscar(client, ana, "kiwi") == []
+    assert _buscar(client, ana, "manga") == [ids[0]]
+
+def test_remocao_do_usuario_limpa_o_indice(client, criar_usuario, criar_tarefa):
+    admin, ana = criar_usuario(is_admin=True), criar_usuario()
+    criar_tarefa(ana, titulo="tarefa indexada")
+    # As palavras são indexadas com o prefixo do dono da tarefa
+    assert _ocorrencias(f"u{ana.id}_indexada") == 1
+    
+    assert client.delete(f"/usuarios/{ana.id}", headers=admin.headers).status_code == 200
+    assert _ocorrencias(f"u{ana.id}_indexada") == 0
+
+def test_consulta_sem_palavras_ou_longa_demais(client, criar_usuario):
+    ana = criar_usuario()
+    
+    assert client.get("/tarefas/search", params={"q": "!!! ---"}, headers=ana.headers).status_code == 422
+    assert client.get("/tarefas/search", params={"q": ""}, headers=ana.headers).status_code == 422
+    assert client.get("/tarefas/search", params={"q": "a" * (BUSCA_CONSULTA_TAMANHO_MAXIMO + 1)}, headers=ana.headers).status_code == 422
@@ -0,0 +1,60 @@
+import pytest
+from sqlmodel import Session
+from task_manager_api.database import engine
+from task_manager_api.models.usuario import Usuario
+from task_manager_api.repositories.usuario_repository import UsuarioRepository
+from tests.conftest import SENHA
+
+def _novo_usuario(username: str, email: str) -> dict:
+    return {"username": username, "nome": "Novo", "senha": SENHA, "email": email}
+
+@pytest.fixture
+def checagem_sem_conflitos(monkeypatch):
+    # A outra requisição grava depois da checagem: só a restrição do banco vê o conflito
+    monkeypatch.setattr(UsuarioRepository, "get_conflitos", lambda self, *args, **kwargs: set())
+
+@pytest.mark.parametrize("campo, detail", [
+    ("username", "Username já cadastrado"),
+    ("email", "Email já cadastrado"),
+])
+def test_cadastro_concorrente_duplicado_responde_409(client, criar_usuario, checagem_sem_conflitos, campo, detail):
+    ana = criar_usuario()
+    dados = _novo_usuario(f"{ana.username}-novo", f"novo-{ana.email}")
+    dados[campo] = getattr(ana, campo)
+    
+    r = client.post("/usuarios", json=dados)
+    
+    assert r.status_code == 409, r.text
+    assert r.json()["detail"] == detail
+
+def test_atualizacao_concorrente_duplicada_responde_409(client, criar_usuario, checagem_sem_conflitos):
+    ana, bia = criar_usuario(), criar_usuario()
+    
+    r = client.patch(f"/usuarios/{bia.id}", json={"email": ana.email}, headers=bia.headers)
+    
+    assert r.status_code == 409, r.text
+    assert r.json()["detail"] == "Email já cadastrado"
+    with Session(engine) as session:
+        assert session.get(Usuario, bia.id).email == bia.email
+
+def test_atualizacao_de_usuario_alterado_por_outra_requisicao_responde_409(client, criar_usuario, monkeypatch):
+    ana = criar_usuario()
+    get_conflitos = UsuarioRepository.get_conflitos
+    
+    def get_conflitos_e_alterar(self, *args, **kwargs):
+        conflitos = get_conflitos(self, *args, **kwargs)
+        # Outra requisição altera o usuário entre a leitura e a gravação
+        with Session(engine) as session:
+            usuario = session.get(Usuario, ana.id)
+            usuario.nome = "Alterado"
+            session.add(usuario)
+            session.commit()
+        return conflitos
+    
+    monkeypatch.setattr(UsuarioRepository, "get_conflitos", get_conflitos_e_alterar)
+    r = client.patch(f"/usuarios/{ana.id}", json={"nome": "Ana"}, headers=ana.headers)
+    
+    assert r.status_code == 409, r.text
+    assert r.json()["detail"] == "O usuário foi alterado por outra requisição"
+    with Session(engine) as session:
+        assert session.get(Usuario, ana.id).nome == "Alterado"
@@ -0,0 +1,63 @@
+import pytest
+from task_manager_api.database import engine, engine_leitura
+from task_manager_api.detector_consultas import limitar_consultas
+
+SEM_COMPRESSAO = {"Accept-Encoding": "identity"}
+
+def _consultas_de(relatorio, origem: str) -> int:
+    return sum(
+        quantidade
+        for consulta in relatorio.consultas.values()
+        for origem_consulta, quantidade in consulta.origens.items()
+        if origem in origem_consulta
+    )
+
+@pytest.fixture
+def autenticado(client):
+    """Token já em cache: os limites abaixo são os da rota, sem a autenticação."""
+    
+    def autenticar(usuario):
+        assert client.get("/usuarios/me", headers=usuario.headers).status_code == 200
+        return usuario
+    
+    return autenticar
+
+def test_patch_usuario(client, criar_usuario, autenticado):
+    ana = autenticado(criar_usuario())
+    
+    # Leitura do usuário, checagem de username/email, UPDATE e refresh
+    with limitar_consultas(4, engine, engine_leitura) as relatorio:
+        r = client.patch(
+            f"/usuarios/{ana.id}",
+            json={"username": f"{ana.username}-novo", "email": f"novo-{ana.email}", "nome": "Nova"},
+            headers=ana.headers
+        )
+    
+    assert r.status_code == 200, r.text
+    assert _consultas_de(relatorio, "UsuarioRepository.get_conflitos") == 1
+    assert sum(c.quantidade for c in relatorio.consultas.values() if c.sql.startswith("UPDATE")) == 1
+
+@pytest.mark.parametrize("quantidade_tarefas", [1, 25])
+def test_listar_tarefas_por_usuario_id(client, criar_usuario, criar_tarefa, autenticado, quantidade_tarefas):
+    admin, ana = autenticado(criar_usuario(is_admin=True)), criar_usuario()
+    for _ in range(quantidade_tarefas):
+        criar_tarefa(ana)
+    headers = {**admin.headers, **SEM_COMPRESSAO}
+    
+    # Usuário, versão da coleção e as tarefas, qualquer que seja a quantidade
+    with limitar_consultas(3, engine, engine_leitura):
+        r = client.get(f"/tarefas/usuarios/{ana.id}", headers=headers)
+    assert r.status_code == 200
+    assert len(r.json()) == quantidade_tarefas
+    
+    with limitar_consultas(2, engine, engine_leitura):
+        r = client.get(f"/tarefas/usuarios/{ana.id}", headers={**headers, "If-None-Match": r.headers["etag"]})
+    assert r.status_code == 304
+
+def test_limitar_consultas_falha_com_o_relatorio(client, criar_usuario, autenticado):
+    ana = autenticado(criar_usuario())
+    
+    with pytest.raises(AssertionError, match="no máximo 0 consultas") as erro:
+        with limitar_consultas(0, engine, engine_leitura):
+            client.get(f"/usuarios/{ana.id}", headers=ana.headers)
+    assert "UsuarioRepository.get_usuario_por_id" in str(erro.value)
@@ -0,0 +1,179 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from sqlmodel import Session
+from task_manager_api import envio_email
+from task_manager_api.envio_email import FilaEmails, Mensagem
+from task_manager_api.limite_requisicoes import limitador
+from task_manager_api.services import reset_senha_service
+from task_manager_api.services.reset_senha_service import ResetSenhaService
+
+def _mensagem(indice: int) -> Mensagem:
+    return Mensagem(f"usuario{indice}@example.com", "Assunto", f"corpo {indice}")
+
+class TransporteTeste:
+    """Registra os lotes recebidos; `falhas` decide o retorno de cada chamada."""
+    
+    def __init__(self, *falhas):
+        self.lotes: list[list[Mensagem]] = []
+        self.falhas = list(falhas)
+    
+    def enviar(self, mensagens: list[Mensagem]) -> list[Mensagem]:
+        self.lotes.append(list(mensagens))
+        falha = self.falhas.pop(0) if self.falhas else None
+        if isinstance(falha, Exception):
+            raise falha
+        if falha == "primeira":
+            # Ex.: 4xx para a primeira mensagem, as demais enviadas
+            return mensagens[:1]
+        return []
+
+def _fila(transporte, **opcoes) -> FilaEmails:
+    return FilaEmails(**{
+        "transporte": transporte,
+        "tamanho_maximo": 10,
+        "tamanho_lote": 2,
+        "tentativas": 3,
+        "espera_inicial_segundos": 0.01,
+        "espera_maxima_segundos": 0.015,
+        "retry_after_segundos": 7,
+        **opcoes
+    })
+
+@pytest.fixture
+def esperas(monkeypatch):
+    """Esperas entre as tentativas (sem o jitter), sem esperar de fato"""
+    
+    registradas = []
+    dormir = asyncio.sleep
+    
+    async def registrar(segundos, *args, **kwargs):
+        registradas.append(segundos)
+        await dormir(0)
+    
+    monkeypatch.setattr(envio_email.random, "uniform", lambda a, b: b)
+    monkeypatch.setattr(envio_email.asyncio, "sleep", registrar)
+    return registradas
+
+def _enviar(fila: FilaEmails, quantidade: int) -> None:
+    async def cenario():
+        fila.iniciar()
+        # Enfileiradas antes de a task rodar: saem em lotes de `tamanho_lote`
+        for indice in range(quantidade):
+            fila.enfileirar(_mensagem(indice))
+        await fila.encerrar(timeout_segundos=5)
+    
+    asyncio.run(cenario())
+
+def test_envio_em_lotes():
+    transporte = TransporteTeste()
+    fila = _fila(transporte)
+    
+    _enviar(fila, 5)
+    
+    assert [len(lote) for lote in transporte.lotes] == [2, 2, 1]
+    assert [m for lote in transporte.lotes for m in lote] == [_mensagem(indice) for indice in range(5)]
+    estatisticas = fila.estatisticas()
+    assert (estatisticas["enfileiradas"], estatisticas["enviadas"], estatisticas["lotes"]) == (5, 5, 3)
+
+def test_nova_tentativa_com_espera_exponencial(esperas):
+    transporte = TransporteTeste(OSError("conexão recusada"), "primeira")
+    fila = _fila(transporte, tamanho_lote=3, tentativas=4)
+    
+    _enviar(fila, 3)
+    
+    # Falha total, falha só da primeira mensagem e, por fim, o envio dela
+    assert transporte.lotes == [[_mensagem(0), _mensagem(1), _mensagem(2)]] * 2 + [[_mensagem(0)]]
+    assert esperas == [0.01, 0.015]
+    estatisticas = fila.estatisticas()
+    assert (estatisticas["enviadas"], estatisticas["descartadas"], estatisticas["tentativas_repetidas"]) == (3, 0, 2)
+
+def test_descarta_depois_das_tentativas(esperas):
+    transporte = TransporteTeste(*[OSError("fora do ar")] * 3)
+    fila = _fila(transporte)
+    
+    _enviar(fila, 1)
+    
+    assert len(transporte.lotes) == 3
+    assert esperas == [0.01, 0.015]
+    assert (fila.estatisticas()["enviadas"], fila.estatisticas()["descartadas"]) == (0, 1)
+
+def test_fila_cheia_responde_503():
+    async def cenario():
+        fila = _fila(TransporteTeste(), tamanho_maximo=2)
+        # Sem `iniciar`: nada consome a fila
+        with pytest.raises(HTTPException) as sem_fila:
+            fila.enfileirar(_mensagem(0))
+        fila._fila = asyncio.Queue(maxsize=2)
+        fila.enfileirar(_mensagem(0))
+        with fila.reservar():
+            with pytest.raises(HTTPException) as cheia:
+                fila.enfileirar(_mensagem(1))
+        # Reserva não usada: a vaga volta para a fila
+        fila.enfileirar(_mensagem(1))
+        return fila, sem_fila.value, cheia.value
+    
+    fila, sem_fila, cheia = asyncio.run(cenario())
+    
+    for erro in (sem_fila, cheia):
+        assert erro.status_code == 503
+        assert erro.headers == {"Retry-After": "7"}
+    estatisticas = fila.estatisticas()
+    assert (estatisticas["pendentes"], estatisticas["reservadas"], estatisticas["rejeitadas"]) == (2, 0, 2)
+
+class RepositorioTeste:
+    """Busca por email que, no meio da busca, deixa outra requisição encher a fila."""
+    
+    def __init__(self, fila: FilaEmails, loop: asyncio.AbstractEventLoop, existentes: set[str]):
+        self.db_session = Session()
+        self.fila = fila
+        self.loop = loop
+        self.existentes = existentes
+        self.aceitas_da_outra = 0
+    
+    def _outra_requisicao(self) -> None:
+        for indice in range(self.fila.tamanho_maximo):
+            try:
+                self.fila.enfileirar(_mensagem(100 + indice))
+                self.aceitas_da_outra += 1
+            except HTTPException:
+                return
+    
+    def get_usuario_por_email(self, email: str):
+        self.loop.call_soon_threadsafe(self._outra_requisicao)
+        if email in self.existentes:
+            return SimpleNamespace(username="ana", nome="Ana", email=email)
+        return None
+
+@pytest.mark.parametrize("email, enfileirado", [("ana@example.com", True), ("ninguem@example.com", False)])
+def test_fila_enchendo_durante_a_busca_nao_revela_o_email(monkeypatch, email, enfileirado):
+    async def cenario():
+        fila = _fila(TransporteTeste(), tamanho_maximo=2)
+        fila._fila = asyncio.Queue(maxsize=2)
+        repositorio = RepositorioTeste(fila, asyncio.get_running_loop(), {"ana@example.com"})
+        monkeypatch.setattr(reset_senha_service, "fila_emails", fila)
+        
+        await ResetSenhaService(repositorio).enviar_reset(email)
+        
+        return fila, repositorio
+    
+    fila, repositorio = asyncio.run(cenario())
+    
+    # A vaga reservada antes da busca não foi tomada pela outra requisição
+    assert repositorio.aceitas_da_outra == 1
+    assert fila.estatisticas()["pendentes"] == 1 + enfileirado
+    assert fila.estatisticas()["reservadas"] == 0
+
+def test_reset_senha_com_fila_cheia_responde_503_para_qualquer_email(client, criar_usuario, monkeypatch):
+    monkeypatch.setattr(limitador, "ativo", False)
+    cheia = _fila(TransporteTeste(), tamanho_maximo=1)
+    cheia._fila = asyncio.Queue(maxsize=1)
+    cheia.enfileirar(_mensagem(0))
+    monkeypatch.setattr(reset_senha_service, "fila_emails", cheia)
+    ana = criar_usuario()
+    
+    for email in (ana.email, "ninguem@example.com"):
+        r = client.post("/usuarios/reset-senha", json={"email": email})
+        assert r.status_code == 503, r.text
+        assert r.headers["retry-after"] == "7"
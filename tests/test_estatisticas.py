@@ -0,0 +1,71 @@
+import pytest
+from task_manager_api.repositories import tarefa_repository
+from task_manager_api.services import tarefa_service
+
+VAZIO = {
+    "total": 0,
+    "por_status": {"pendente": 0, "em_progresso": 0, "concluida": 0},
+    "por_prioridade": {"baixa": 0, "media": 0, "alta": 0},
+}
+
+def _escrever(client, usuario, criar_tarefa) -> None:
+    """Criações, alterações e remoções, individuais e em lote"""
+    
+    a = criar_tarefa(usuario, status="pendente", prioridade="alta")
+    b = criar_tarefa(usuario, status="em_progresso", prioridade="baixa")
+    criar_tarefa(usuario, status="concluida", prioridade="alta")
+    client.patch(f"/tarefas/{a['id']}", json={"status": "concluida"}, headers=usuario.headers)
+    client.delete(f"/tarefas/{b['id']}", headers=usuario.headers)
+    
+    lote = client.post("/tarefas/bulk", json={"itens": [
+        {"titulo": "l1", "status": "pendente", "prioridade": "media"},
+        {"titulo": "l2", "status": "pendente", "prioridade": "baixa"},
+        {"titulo": "l3", "status": "em_progresso", "prioridade": "media"},
+    ]}, headers=usuario.headers).json()["resultados"]
+    ids = [resultado["id"] for resultado in lote]
+    client.patch("/tarefas/bulk", json={"itens": [{"id": ids[0], "prioridade": "alta"}]}, headers=usuario.headers)
+    client.request("DELETE", "/tarefas/bulk", json={"ids": ids[1:]}, headers=usuario.headers)
+
+ESPERADO = {
+    "total": 3,
+    "por_status": {"pendente": 1, "em_progresso": 0, "concluida": 2},
+    "por_prioridade": {"baixa": 0, "media": 0, "alta": 3},
+}
+
+def test_estatisticas_sem_tarefas(client, criar_usuario):
+    ana = criar_usuario()
+    
+    assert client.get("/tarefas/stats", headers=ana.headers).json() == VAZIO
+
+def test_estatisticas_acompanham_as_escritas(client, criar_usuario, criar_tarefa):
+    ana = criar_usuario()
+    
+    _escrever(client, ana, criar_tarefa)
+    
+    assert client.get("/tarefas/stats", headers=ana.headers).json() == ESPERADO
+
+def test_contadores_iguais_ao_group_by(client, criar_usuario, criar_tarefa, monkeypatch):
+    # Usuário novo: sem tarefas, os contadores começam corretos (vazios)
+    ana = criar_usuario()
+    monkeypatch.setattr(tarefa_repository, "ESTATISTICAS_CONTADORES", True)
+    monkeypatch.setattr(tarefa_service, "ESTATISTICAS_CONTADORES", True)
+    
+    _escrever(client, ana, criar_tarefa)
+    
+    pelos_contadores = client.get("/tarefas/stats", headers=ana.headers).json()
+    monkeypatch.setattr(tarefa_service, "ESTATISTICAS_CONTADORES", False)
+    pelo_group_by = client.get("/tarefas/stats", headers=ana.headers).json()
+    assert pelos_contadores == pelo_group_by == ESPERADO
+
+@pytest.mark.parametrize("contadores", [False, True])
+def test_estatisticas_de_outro_usuario(client, criar_usuario, criar_tarefa, monkeypatch, contadores):
+    monkeypatch.setattr(tarefa_repository, "ESTATISTICAS_CONTADORES", contadores)
+    monkeypatch.setattr(tarefa_service, "ESTATISTICAS_CONTADORES", contadores)
+    admin, ana, bia = criar_usuario(is_admin=True), criar_usuario(), criar_usuario()
+    criar_tarefa(ana, status="pendente", prioridade="baixa")
+    
+    r = client.get(f"/tarefas/usuarios/{ana.id}/stats", headers=admin.headers)
+    assert r.status_code == 200
+    assert r.json()["total"] == 1
+    assert client.get(f"/tarefas/usuarios/{ana.id}/stats", headers=bia.headers).status_code == 403
+    assert client.get("/tarefas/usuarios/999999/stats", headers=admin.headers).status_code == 404
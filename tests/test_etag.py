@@ -0,0 +1,88 @@
+def _sem_compressao(usuario) -> dict:
+    return {**usuario.headers, "Accept-Encoding": "identity"}
+
+def test_tarefa_304_enquanto_nao_muda(client, criar_usuario, criar_tarefa):
+    ana = criar_usuario()
+    tarefa = criar_tarefa(ana)
+    
+    r = client.get(f"/tarefas/{tarefa['id']}", headers=ana.headers)
+    etag = r.headers["etag"]
+    
+    for if_none_match in (etag, f"W/{etag}", f'"outro", {etag}', "*"):
+        r = client.get(f"/tarefas/{tarefa['id']}", headers={**ana.headers, "If-None-Match": if_none_match})
+        assert r.status_code == 304
+        assert r.headers["etag"] == etag
+        assert r.content == b""
+    
+    client.patch(f"/tarefas/{tarefa['id']}", json={"titulo": "novo"}, headers=ana.headers)
+    r = client.get(f"/tarefas/{tarefa['id']}", headers={**ana.headers, "If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["etag"] != etag
+
+def test_304_nao_dispensa_a_checagem_de_permissao(client, criar_usuario, criar_tarefa):
+    ana, bia = criar_usuario(), criar_usuario()
+    tarefa = criar_tarefa(ana)
+    etag = client.get(f"/tarefas/{tarefa['id']}", headers=ana.headers).headers["etag"]
+    
+    r = client.get(f"/tarefas/{tarefa['id']}", headers={**bia.headers, "If-None-Match": etag})
+    assert r.status_code == 403
+
+def test_if_match_desatualizado_responde_412(client, criar_usuario, criar_tarefa):
+    ana = criar_usuario()
+    tarefa = criar_tarefa(ana)
+    antiga = client.get(f"/tarefas/{tarefa['id']}", headers=ana.headers).headers["etag"]
+    
+    r = client.patch(f"/tarefas/{tarefa['id']}", json={"titulo": "v2"}, headers={**ana.headers, "If-Match": antiga})
+    assert r.status_code == 200
+    atual = r.headers["etag"]
+    assert atual != antiga
+    
+    r = client.patch(f"/tarefas/{tarefa['id']}", json={"titulo": "v3"}, headers={**ana.headers, "If-Match": antiga})
+    assert r.status_code == 412
+    assert r.headers["etag"] == atual
+    assert client.get(f"/tarefas/{tarefa['id']}", headers=ana.headers).json()["titulo"] == "v2"
+    
+    r = client.delete(f"/tarefas/{tarefa['id']}", headers={**ana.headers, "If-Match": antiga})
+    assert r.status_code == 412
+    assert client.delete(f"/tarefas/{tarefa['id']}", headers={**ana.headers, "If-Match": atual}).status_code == 200
+
+def test_if_match_asterisco(client, criar_usuario, criar_tarefa):
+    ana = criar_usuario()
+    tarefa = criar_tarefa(ana)
+    
+    r = client.patch(f"/tarefas/{tarefa['id']}", json={"titulo": "x"}, headers={**ana.headers, "If-Match": "*"})
+    assert r.status_code == 200
+
+def test_listagem_304_ate_a_proxima_escrita(client, criar_usuario, criar_tarefa):
+    ana = criar_usuario()
+    tarefa = criar_tarefa(ana)
+    etag = client.get("/tarefas", headers=_sem_compressao(ana)).headers["etag"]
+    
+    r = client.get("/tarefas", headers={**_sem_compressao(ana), "If-None-Match": etag})
+    assert r.status_code == 304
+    
+    # Outros parâmetros: outra representação
+    r = client.get("/tarefas", params={"limite": 1}, headers={**_sem_compressao(ana), "If-None-Match": etag})
+    assert r.status_code == 200
+    
+    client.patch(f"/tarefas/{tarefa['id']}", json={"status": "concluida"}, headers=ana.headers)
+    r = client.get("/tarefas", headers={**_sem_compressao(ana), "If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.json()["itens"][0]["status"] == "concluida"
+
+def test_listagem_muda_com_escritas_em_lote(client, criar_usuario, criar_tarefa):
+    ana = criar_usuario()
+    tarefa = criar_tarefa(ana)
+    etag = client.get("/tarefas", headers=_sem_compressao(ana)).headers["etag"]
+    
+    client.request("DELETE", "/tarefas/bulk", json={"ids": [tarefa["id"]]}, headers=ana.headers)
+    
+    r = client.get("/tarefas", headers={**_sem_compressao(ana), "If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.json()["itens"] == []
+
+def test_usuario_me_304(client, criar_usuario):
+    ana = criar_usuario()
+    etag = client.get("/usuarios/me", headers=ana.headers).headers["etag"]
+    
+    assert client.get("/usuarios/me", headers={**ana.headers, "If-None-Match": etag}).status_code == 304
@@ -0,0 +1,157 @@
+import asyncio
+import json
+import pytest
+from task_manager_api.eventos_tarefas import EventoTarefa, HubEventos, hub_eventos
+from task_manager_api.services import tarefa_service
+
+@pytest.fixture(autouse=True)
+def stream_curto(monkeypatch):
+    # O TestClient só retorna quando o stream termina
+    monkeypatch.setattr(tarefa_service, "EVENTOS_DURACAO_MAXIMA_SEGUNDOS", 0.1)
+
+def _eventos(client, usuario, **headers) -> list[dict]:
+    r = client.get("/tarefas/events", headers={**usuario.headers, **headers})
+    assert r.status_code == 200, r.text
+    assert r.headers["content-type"].startswith("text/event-stream")
+    eventos = []
+    for quadro in r.text.split("\n\n"):
+        campos = dict(linha.split(": ", 1) for linha in quadro.splitlines() if not linha.startswith(":"))
+        if "event" in campos:
+            eventos.append({**campos, "data": json.loads(campos["data"])})
+    return eventos
+
+def test_stream_sem_retomada(client, criar_usuario, criar_tarefa):
+    ana = criar_usuario()
+    criar_tarefa(ana)
+    
+    r = client.get("/tarefas/events", headers=ana.headers)
+    assert r.text.startswith("retry: 3000\n\n")
+    assert _eventos(client, ana) == []
+
+def test_retomada_pelo_last_event_id(client, criar_usuario, criar_tarefa):
+    ana = criar_usuario()
+    a = criar_tarefa(ana, titulo="a")
+    client.patch(f"/tarefas/{a['id']}", json={"titulo": "a2"}, headers=ana.headers)
+    client.delete(f"/tarefas/{a['id']}", headers=ana.headers)
+    
+    eventos = _eventos(client, ana, **{"Last-Event-ID": "1"})
+    
+    assert [(evento["id"], evento["event"]) for evento in eventos] == [("2", "alterada"), ("3", "removida")]
+    assert eventos[0]["data"]["tarefa"]["titulo"] == "a2"
+    assert eventos[1]["data"] == {"revisao": 3, "id": a["id"]}
+
+def test_retomada_pelo_parametro_desde(client, criar_usuario, criar_tarefa):
+    ana = criar_usuario()
+    criar_tarefa(ana, titulo="a")
+    criar_tarefa(ana, titulo="b")
+    
+    r = client.get("/tarefas/events", params={"desde": 1}, headers=ana.headers)
+    assert "id: 2\nevent: criada\n" in r.text
+    # O Last-Event-ID da reconexão tem precedência
+    eventos = _eventos(client, ana, **{"Last-Event-ID": "2"})
+    assert eventos == []
+
+def test_sincronizar_quando_o_historico_nao_cobre(client, criar_usuario, criar_tarefa, monkeypatch):
+    # Vale para históricos criados a partir daqui (o do usuário novo)
+    monkeypatch.setattr(hub_eventos, "tamanho_historico", 2)
+    ana = criar_usuario()
+    for titulo in "abcd":
+        criar_tarefa(ana, titulo=titulo)
+    
+    eventos = _eventos(client, ana, **{"Last-Event-ID": "1"})
+    
+    # Sem id: o cliente continua em 1 e busca o resto em /tarefas/changes
+    assert eventos == [{"event": "sincronizar", "data": {"revisao": 4, "desde": 1}}]
+    assert [evento["id"] for evento in _eventos(client, ana, **{"Last-Event-ID": "2"})] == ["3", "4"]
+
+def test_operacoes_em_lote_publicam_sincronizar(client, criar_usuario, criar_tarefa):
+    ana = criar_usuario()
+    criar_tarefa(ana)
+    client.post("/tarefas/bulk", json={"itens": [
+        {"titulo": "x", "status": "pendente", "prioridade": "baixa"},
+        {"titulo": "y", "status": "pendente", "prioridade": "baixa"},
+    ]}, headers=ana.headers)
+    
+    eventos = _eventos(client, ana, **{"Last-Event-ID": "1"})
+    
+    assert eventos == [{"id": "2", "event": "sincronizar", "data": {"revisao": 2, "desde": 1}}]
+
+def test_retomada_inclui_evento_publicado_durante_a_leitura_da_versao(client, criar_usuario, criar_tarefa, monkeypatch):
+    ana = criar_usuario()
+    a = criar_tarefa(ana)
+    ler_versao = tarefa_service.TarefaService._versao_para_retomada
+    
+    def ler_versao_e_publicar(self, usuario_id: int) -> int:
+        versao = ler_versao(self, usuario_id)
+        # Escrita de outra requisição confirmada entre a leitura e `conectar`
+        dados = json.dumps({"revisao": versao + 1, "id": a["id"]})
+        hub_eventos.publicar(usuario_id, EventoTarefa(versao + 1, "removida", dados))
+        return versao
+    
+    monkeypatch.setattr(tarefa_service.TarefaService, "_versao_para_retomada", ler_versao_e_publicar)
+    eventos = _eventos(client, ana, **{"Last-Event-ID": "1"})
+    
+    assert [(evento["id"], evento["event"]) for evento in eventos] == [("2", "removida")]
+
+def test_eventos_exigem_autenticacao(client):
+    assert client.get("/tarefas/events").status_code == 401
+
+def _hub(tamanho_buffer: int = 10) -> HubEventos:
+    return HubEventos(
+        tamanho_buffer=tamanho_buffer,
+        tamanho_historico=10,
+        usuarios_com_historico=10,
+        heartbeat_segundos=0.05,
+        retry_milissegundos=1000
+    )
+
+def test_hub_entrega_ao_vivo_e_envia_heartbeat():
+    async def cenario():
+        hub = _hub()
+        hub.iniciar()
+        conexao, quadros = hub.conectar(1, None, 0)
+        hub.publicar(1, EventoTarefa(1, "criada", "{}"))
+        hub.publicar(2, EventoTarefa(1, "criada", "{}"))  # outro usuário
+        return [quadro async for quadro in hub.transmitir(conexao, quadros, 0.12)], hub
+    
+    quadros, hub = asyncio.run(cenario())
+    
+    assert quadros[:2] == ["retry: 1000\n\n", "id: 1\nevent: criada\ndata: {}\n\n"]
+    assert ": heartbeat\n\n" in quadros[2:]
+    assert hub.estatisticas()["conexoes"] == 0
+
+def test_hub_descarta_conexao_lenta():
+    async def cenario():
+        hub = _hub(tamanho_buffer=2)
+        hub.iniciar()
+        conexao, quadros = hub.conectar(1, None, 0)
+        for revisao in range(1, 4):
+            hub.publicar(1, EventoTarefa(revisao, "criada", "{}"))
+        await asyncio.sleep(0)
+        return conexao, [quadro async for quadro in hub.transmitir(conexao, quadros, 1)], hub
+    
+    conexao, quadros, hub = asyncio.run(cenario())
+    
+    # Buffer cheio: a conexão termina sem os eventos; o cliente retoma pelo histórico
+    assert conexao.descartada
+    assert quadros == ["retry: 1000\n\n"]
+    assert hub.estatisticas()["descartadas"] == 1
+
+def test_hub_retoma_eventos_posteriores_a_versao_lida():
+    async def cenario():
+        hub = _hub()
+        hub.iniciar()
+        for revisao in range(1, 4):
+            hub.publicar(1, EventoTarefa(revisao, "criada", "{}"))
+        await asyncio.sleep(0)
+        # Versão lida (2) antes da publicação da revisão 3
+        _, em_dia = hub.conectar(1, 2, 2)
+        _, atrasado = hub.conectar(1, 1, 2)
+        _, adiantado = hub.conectar(1, 3, 2)
+        return em_dia, atrasado, adiantado
+    
+    em_dia, atrasado, adiantado = asyncio.run(cenario())
+    
+    assert em_dia[1:] == ["id: 3\nevent: criada\ndata: {}\n\n"]
+    assert [quadro.split("\n")[0] for quadro in atrasado[1:]] == ["id: 2", "id: 3"]
+    assert adiantado[1:] == []
@@ -0,0 +1,70 @@
+import asyncio
+import threading
+import time
+import pytest
+from fastapi import HTTPException
+from task_manager_api import security
+from task_manager_api.limite_requisicoes import limitador
+from task_manager_api.security import ExecutorSenhas
+
+def test_executor_saturado_responde_503():
+    liberar = threading.Event()
+    
+    def bloquear(valor):
+        assert liberar.wait(5)
+        return valor
+    
+    async def cenario():
+        executor = ExecutorSenhas(workers=1, fila_maxima=1, retry_after_segundos=3)
+        # Uma em execução e uma na fila: a próxima é rejeitada sem ser enfileirada
+        primeira = asyncio.create_task(executor.executar(bloquear, 1))
+        segunda = asyncio.create_task(executor.executar(bloquear, 2))
+        await asyncio.sleep(0.05)
+        with pytest.raises(HTTPException) as erro:
+            await executor.executar(bloquear, 3)
+        pendentes = executor.estatisticas()["pendentes"]
+        
+        await asyncio.sleep(0.05)
+        liberar.set()
+        resultados = await asyncio.gather(primeira, segunda)
+        # Com vaga de novo, volta a aceitar
+        resultados.append(await executor.executar(bloquear, 4))
+        executor.encerrar()
+        return erro.value, pendentes, resultados, executor.estatisticas()
+    
+    erro, pendentes, resultados, estatisticas = asyncio.run(cenario())
+    
+    assert erro.status_code == 503
+    assert erro.headers == {"Retry-After": "3"}
+    assert pendentes == 2
+    assert resultados == [1, 2, 4]
+    assert (estatisticas["executadas"], estatisticas["rejeitadas"], estatisticas["pendentes"]) == (3, 1, 0)
+    # A segunda esperou a primeira (~0,1 s) antes de executar
+    assert estatisticas["tempo_espera_maximo"] >= 0.08
+    assert estatisticas["tempo_execucao_total"] >= 0.08
+
+def test_tempos_de_espera_e_execucao():
+    async def cenario():
+        executor = ExecutorSenhas(workers=2, fila_maxima=0, retry_after_segundos=1)
+        await asyncio.gather(*(executor.executar(time.sleep, 0.05) for _ in range(2)))
+        executor.encerrar()
+        return executor.estatisticas()
+    
+    estatisticas = asyncio.run(cenario())
+    
+    # Dois workers: nenhuma espera na fila, ~0,1 s de execução somada
+    assert estatisticas["executadas"] == 2
+    assert estatisticas["tempo_espera_maximo"] < 0.04
+    assert 0.09 <= estatisticas["tempo_execucao_total"] < 1
+
+def test_token_com_executor_saturado_responde_503(client, criar_usuario, monkeypatch):
+    monkeypatch.setattr(limitador, "ativo", False)
+    # Sem workers nem fila: toda operação de senha é rejeitada
+    monkeypatch.setattr(security, "executor_senhas", ExecutorSenhas(workers=0, fila_maxima=0, retry_after_segundos=2))
+    ana = criar_usuario()
+    
+    r = client.post("/token", data={"username": ana.username, "password": "qualquer"})
+    
+    assert r.status_code == 503, r.text
+    assert r.headers["retry-after"] == "2"
+    assert security.executor_senhas.estatisticas()["rejeitadas"] == 1
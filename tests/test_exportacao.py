@@ -0,0 +1,82 @@
+import json
+import pytest
+from sqlmodel import Session
+from task_manager_api.database import engine
+from task_manager_api.models.usuario import Usuario
+from task_manager_api.serializers.tarefa_serializer import TarefaResponse
+from task_manager_api.serializers.usuario_serializer import UsuarioAdminResponse
+from task_manager_api.services import exportacao_service
+
+@pytest.fixture(autouse=True)
+def lotes_pequenos(monkeypatch):
+    # Vários lotes (e vários pedaços do stream) mesmo com poucas linhas
+    monkeypatch.setattr(exportacao_service, "EXPORTACAO_TAMANHO_LOTE", 2)
+
+def _linhas(r) -> list[dict]:
+    """Objetos do NDJSON, checando o enquadramento: um objeto por linha, cada linha terminada em \\n"""
+    
+    assert r.status_code == 200, r.text
+    assert r.headers["content-type"] == "application/x-ndjson"
+    if not r.content:
+        return []
+    texto = r.content.decode()
+    assert texto.endswith("\n")
+    linhas = texto[:-1].split("\n")
+    assert all(linha and linha == linha.strip() for linha in linhas)
+    return [json.loads(linha) for linha in linhas]
+
+def test_exportacao_de_tarefas(client, criar_usuario, criar_tarefa):
+    ana, bia = criar_usuario(), criar_usuario()
+    criar_tarefa(ana, titulo="Reunião — ação", descricao=None, data_criacao="2024-03-01T08:00:00.000001")
+    criar_tarefa(ana, titulo="Linha 1\nLinha 2", descricao="com \"aspas\"", data_criacao="2024-03-01T08:00:00")
+    for indice in range(3):
+        criar_tarefa(ana, titulo=f"tarefa {indice}")
+    criar_tarefa(bia)
+    
+    exportadas = _linhas(client.get("/tarefas/export", headers=ana.headers))
+    
+    # Mesmos campos e valores da listagem (TarefaResponse)
+    listadas = client.get("/tarefas", params={"limite": 100}, headers=ana.headers).json()["itens"]
+    assert exportadas == listadas
+    assert all(list(linha) == list(TarefaResponse.model_fields) for linha in exportadas)
+    assert exportadas[0]["titulo"] == "Reunião — ação" and exportadas[0]["descricao"] is None
+
+def test_exportacao_de_tarefas_de_outro_usuario(client, criar_usuario, criar_tarefa):
+    admin, ana, bia = criar_usuario(is_admin=True), criar_usuario(), criar_usuario()
+    criar_tarefa(ana)
+    criar_tarefa(ana)
+    
+    exportadas = _linhas(client.get(f"/tarefas/usuarios/{ana.id}/export", headers=admin.headers))
+    
+    assert exportadas == client.get(f"/tarefas/usuarios/{ana.id}", headers=admin.headers).json()
+    assert client.get(f"/tarefas/usuarios/{ana.id}/export", headers=bia.headers).status_code == 403
+    assert client.get("/tarefas/usuarios/999999/export", headers=admin.headers).status_code == 404
+
+def test_exportacao_sem_tarefas(client, criar_usuario):
+    ana = criar_usuario()
+    
+    assert _linhas(client.get("/tarefas/export", headers=ana.headers)) == []
+
+def test_exportacao_de_usuarios(client, criar_usuario):
+    admin, ana = criar_usuario(is_admin=True), criar_usuario()
+    with Session(engine) as session:
+        usuario = session.get(Usuario, ana.id)
+        usuario.nome = "Ana Conceição 😀"
+        session.add(usuario)
+        session.commit()
+    
+    exportados = _linhas(client.get("/usuarios/export", headers=admin.headers))
+    
+    # Mesmos campos e valores da listagem de admins (UsuarioAdminResponse), sem a senha
+    listados = client.get("/usuarios", headers=admin.headers).json()
+    assert exportados == sorted(listados, key=lambda usuario: usuario["id"])
+    assert all(list(linha) == list(UsuarioAdminResponse.model_fields) for linha in exportados)
+    assert next(linha for linha in exportados if linha["id"] == ana.id)["nome"] == "Ana Conceição 😀"
+
+def test_exportacao_de_usuarios_exige_admin(client, criar_usuario):
+    ana = criar_usuario()
+    
+    assert client.get("/usuarios/export").status_code == 401
+    r = client.get("/usuarios/export", headers=ana.headers)
+    assert r.status_code == 403
+    assert r.headers["content-type"] == "application/json"
@@ -0,0 +1,153 @@
+import gzip
+import brotli
+import msgpack
+import pytest
+from task_manager_api.formatos import (
+    COLUNAR,
+    JSON,
+    MSGPACK,
+    CacheRespostas,
+    CorpoCodificado,
+    Negociacao,
+    cache_respostas,
+    comprimir,
+    negociar
+)
+from task_manager_api.config import COMPRESSAO_TAMANHO_MINIMO
+
+@pytest.mark.parametrize("accept, accept_encoding, esperado", [
+    (None, None, (JSON, None)),
+    ("*/*", "gzip, deflate", (JSON, "gzip")),
+    ("application/msgpack", None, (MSGPACK, None)),
+    ("application/x-msgpack", "br", (MSGPACK, "br")),
+    ("application/json;q=0.5, application/vnd.taskmanager.colunar+json", None, (COLUNAR, None)),
+    ("text/html", None, (JSON, None)),
+    ("application/*", None, (JSON, None)),
+    (None, "gzip, br", (JSON, "br")),
+    (None, "gzip;q=1, br;q=0.5", (JSON, "gzip")),
+    (None, "*", (JSON, "br")),
+    (None, "gzip;q=0.5, identity", (JSON, None)),
+    (None, "br;q=0, gzip;q=0", (JSON, None)),
+])
+def test_negociar(accept, accept_encoding, esperado):
+    assert negociar(accept, accept_encoding) == esperado
+
+def test_comprimir_a_partir_do_tamanho_minimo():
+    pequeno = b"x" * (COMPRESSAO_TAMANHO_MINIMO - 1)
+    grande = b"x" * COMPRESSAO_TAMANHO_MINIMO
+    
+    assert comprimir(pequeno, "gzip") == CorpoCodificado(pequeno, None)
+    assert comprimir(grande, None) == CorpoCodificado(grande, None)
+    assert gzip.decompress(comprimir(grande, "gzip").corpo) == grande
+    assert brotli.decompress(comprimir(grande, "br").corpo) == grande
+    # Bytes determinísticos (sem mtime no gzip)
+    assert comprimir(grande, "gzip") == comprimir(grande, "gzip")
+
+def test_cache_lru_limitado_em_bytes():
+    cache = CacheRespostas(bytes_maximos=10, bytes_por_item=6)
+    negociacao = Negociacao(MSGPACK, None)
+    
+    cache.set('"a"', negociacao, CorpoCodificado(b"12345", None))
+    cache.set('"b"', negociacao, CorpoCodificado(b"1234", None))
+    assert cache.get('"a"', negociacao) is not None  # "a" passa a ser o mais recente
+    cache.set('"c"', negociacao, CorpoCodificado(b"123", None))
+    cache.set('"grande"', negociacao, CorpoCodificado(b"1234567", None))
+    
+    assert cache.get('"b"', negociacao) is None
+    assert cache.get('"grande"', negociacao) is None
+    assert cache.get('"a"', Negociacao(MSGPACK, "gzip")) is None
+    assert cache.estatisticas() == {"entradas": 2, "bytes": 8, "hits": 1, "misses": 3}
+
+@pytest.fixture
+def ana(client, criar_usuario):
+    """Usuária com tarefas suficientes para a listagem ser comprimida"""
+    
+    usuario = criar_usuario()
+    itens = [
+        {"titulo": f"Tarefa {i}", "descricao": "descrição " * 10, "status": "pendente", "prioridade": "media"}
+        for i in range(20)
+    ]
+    client.post("/tarefas/bulk", json={"itens": itens}, headers=usuario.headers)
+    return usuario
+
+def _get(client, usuario, url="/tarefas", accept=None, accept_encoding="identity", **headers):
+    headers = {**usuario.headers, "Accept-Encoding": accept_encoding, **headers}
+    if accept:
+        headers["Accept"] = accept
+    return client.get(url, headers=headers)
+
+def test_formatos_representam_o_mesmo_documento(client, ana):
+    padrao = _get(client, ana)
+    assert padrao.headers["content-type"] == "application/json"
+    assert padrao.headers["vary"] == "Accept, Accept-Encoding"
+    documento = padrao.json()
+    
+    r = _get(client, ana, accept="application/msgpack")
+    assert r.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(r.content) == documento
+    
+    r = _get(client, ana, accept="application/vnd.taskmanager.colunar+json")
+    assert r.headers["content-type"] == "application/vnd.taskmanager.colunar+json"
+    colunar = r.json()
+    assert [dict(zip(colunar["campos"], valores)) for valores in colunar["itens"]] == documento["itens"]
+    assert colunar["proximo_cursor"] == documento["proximo_cursor"]
+    
+    for etag in (padrao.headers["etag"], r.headers["etag"]):
+        assert etag.startswith('"')
+    assert padrao.headers["etag"] != r.headers["etag"]
+
+@pytest.mark.parametrize("codificacao", ["gzip", "br"])
+def test_compressao_e_etag_fraco(client, ana, codificacao):
+    documento = _get(client, ana).json()
+    
+    r = _get(client, ana, accept_encoding=codificacao)
+    
+    assert r.headers["content-encoding"] == codificacao
+    assert r.headers["etag"].startswith('W/"')
+    assert r.json() == documento  # o httpx descomprime
+    # O ETag fraco vale no If-None-Match, com ou sem compressão
+    assert _get(client, ana, accept_encoding=codificacao, **{"If-None-Match": r.headers["etag"]}).status_code == 304
+    assert _get(client, ana, **{"If-None-Match": r.headers["etag"]}).status_code == 304
+
+def test_etag_de_um_formato_nao_vale_para_outro(client, ana):
+    etag = _get(client, ana, accept="application/msgpack").headers["etag"]
+    
+    assert _get(client, ana, accept="application/msgpack", **{"If-None-Match": etag}).status_code == 304
+    assert _get(client, ana, **{"If-None-Match": etag}).status_code == 200
+    assert _get(client, ana, accept="application/vnd.taskmanager.colunar+json", **{"If-None-Match": etag}).status_code == 200
+
+def test_cache_de_respostas(client, ana):
+    colunar = "application/vnd.taskmanager.colunar+json"
+    primeira = _get(client, ana, accept=colunar)
+    hits = cache_respostas.estatisticas()["hits"]
+    
+    segunda = _get(client, ana, accept=colunar)
+    assert segunda.content == primeira.content
+    assert segunda.headers["etag"] == primeira.headers["etag"]
+    assert cache_respostas.estatisticas()["hits"] == hits + 1
+    
+    # Outros parâmetros e outra compressão são outras entradas
+    assert len(_get(client, ana, "/tarefas?limite=2", accept=colunar).json()["itens"]) == 2
+    assert _get(client, ana, accept=colunar, accept_encoding="gzip").json() == primeira.json()
+    assert cache_respostas.estatisticas()["hits"] == hits + 1
+    
+    # Uma escrita muda o ETag: a entrada antiga não é mais usada
+    client.post("/tarefas", json={"titulo": "nova", "status": "pendente", "prioridade": "alta"}, headers=ana.headers)
+    terceira = _get(client, ana, accept=colunar)
+    assert terceira.headers["etag"] != primeira.headers["etag"]
+    assert len(terceira.json()["itens"]) == 21
+
+def test_listagem_do_admin_negociada(client, criar_usuario, ana):
+    admin, bia = criar_usuario(is_admin=True), criar_usuario()
+    url = f"/tarefas/usuarios/{ana.id}"
+    
+    r = _get(client, admin, url, accept="application/msgpack", accept_encoding="gzip")
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    assert len(msgpack.unpackb(r.content)) == 20
+    
+    r = _get(client, admin, url)
+    assert len(r.json()) == 20
+    assert _get(client, admin, url, **{"If-None-Match": r.headers["etag"]}).status_code == 304
+    assert _get(client, bia, url, accept="application/msgpack").status_code == 403
+    assert _get(client, admin, "/tarefas/usuarios/999999").status_code == 404
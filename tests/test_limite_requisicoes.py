@@ -0,0 +1,83 @@
+import time
+import pytest
+from task_manager_api.limite_requisicoes import (
+    ArmazenamentoMemoria,
+    LimitadorRequisicoes,
+    PoliticaLimite,
+    limitador
+)
+from tests.conftest import SENHA
+
+@pytest.fixture
+def limites(monkeypatch):
+    """Baldes novos, com as políticas informadas, no limitador do app."""
+    
+    def configurar(politicas: dict[str, dict[str, tuple[int, float]]]) -> None:
+        monkeypatch.setattr(limitador, "armazenamento", ArmazenamentoMemoria(1000))
+        monkeypatch.setattr(limitador, "ativo", True)
+        monkeypatch.setattr(limitador, "politicas", {
+            rota: {tipo: PoliticaLimite(*valores) for tipo, valores in por_tipo.items()}
+            for rota, por_tipo in politicas.items()
+        })
+    
+    return configurar
+
+def _login(client, username: str, senha: str = SENHA):
+    return client.post("/token", data={"username": username, "password": senha})
+
+def test_token_429_por_username_antes_da_senha(client, criar_usuario, limites):
+    limites({"token": {"username": (2, 1)}})
+    ana, bia = criar_usuario(), criar_usuario()
+    
+    assert _login(client, ana.username, "errada").status_code == 401
+    assert _login(client, ana.username).status_code == 200
+    
+    # Sem fichas, nem a senha correta é verificada
+    r = _login(client, ana.username)
+    assert r.status_code == 429
+    assert int(r.headers["retry-after"]) >= 1
+    # Outro username tem o próprio balde
+    assert _login(client, bia.username).status_code == 200
+
+def test_token_429_por_ip(client, criar_usuario, limites):
+    limites({"token": {"ip": (2, 1), "username": (10, 1)}})
+    usuarios = [criar_usuario() for _ in range(3)]
+    
+    status = [_login(client, usuario.username).status_code for usuario in usuarios]
+    assert status == [200, 200, 429]
+
+def test_fichas_sao_repostas_com_o_tempo(client, limites):
+    limites({"reset_senha": {"email": (1, 600)}})  # uma ficha a cada 0,1 s
+    dados = {"email": "reposicao@example.com"}
+    
+    assert client.post("/usuarios/reset-senha", json=dados).status_code == 200
+    r = client.post("/usuarios/reset-senha", json=dados)
+    assert r.status_code == 429
+    assert r.headers["retry-after"] == "1"
+    time.sleep(0.15)
+    assert client.post("/usuarios/reset-senha", json=dados).status_code == 200
+
+def test_reset_senha_429_por_email(client, criar_usuario, limites):
+    limites({"reset_senha": {"email": (1, 1)}})
+    ana = criar_usuario()
+    
+    assert client.post("/usuarios/reset-senha", json={"email": ana.email}).status_code == 200
+    r = client.post("/usuarios/reset-senha", json={"email": ana.email})
+    assert r.status_code == 429
+    assert "retry-after" in r.headers
+    # Emails inexistentes também são limitados (a resposta não revela se existem)
+    assert client.post("/usuarios/reset-senha", json={"email": "ninguem@example.com"}).status_code == 200
+    assert client.post("/usuarios/reset-senha", json={"email": "ninguem@example.com"}).status_code == 429
+
+def test_limites_desligados(client, criar_usuario, limites, monkeypatch):
+    limites({"token": {"username": (1, 1)}})
+    monkeypatch.setattr(limitador, "ativo", False)
+    ana = criar_usuario()
+    
+    assert [_login(client, ana.username).status_code for _ in range(3)] == [200, 200, 200]
+
+def test_politica_invalida():
+    with pytest.raises(ValueError):
+        LimitadorRequisicoes(ArmazenamentoMemoria(10), {"token": {"ip": (0, 1)}})
+    with pytest.raises(ValueError):
+        LimitadorRequisicoes(ArmazenamentoMemoria(10), {"token": {"ip": (1, 0)}})
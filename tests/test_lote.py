@@ -0,0 +1,60 @@
+import pytest
+from task_manager_api.config import BULK_TAMANHO_MAXIMO
+
+def test_resultado_por_id_na_ordem_enviada(client, criar_usuario, criar_tarefa):
+    ana, bia = criar_usuario(), criar_usuario()
+    a = criar_tarefa(ana, titulo="a")
+    b = criar_tarefa(ana, titulo="b")
+    alheia = criar_tarefa(bia)
+    ids = [b["id"], 999_999, alheia["id"], a["id"], b["id"]]
+    
+    r = client.get("/tarefas/batch", params={"ids": ",".join(map(str, ids))}, headers=ana.headers)
+    
+    assert r.status_code == 200
+    corpo = r.json()
+    assert (corpo["sucessos"], corpo["falhas"]) == (3, 2)
+    resultados = corpo["resultados"]
+    assert [(resultado["indice"], resultado["id"], resultado["status_code"]) for resultado in resultados] == [
+        (0, b["id"], 200), (1, 999_999, 404), (2, alheia["id"], 403), (3, a["id"], 200), (4, b["id"], 200)
+    ]
+    assert resultados[0]["tarefa"] == client.get(f"/tarefas/{b['id']}", headers=ana.headers).json()
+    assert resultados[1]["detail"] == "Tarefa não encontrada"
+    assert resultados[2]["tarefa"] is None
+
+def test_get_e_post_equivalentes(client, criar_usuario, criar_tarefa):
+    ana = criar_usuario()
+    ids = [criar_tarefa(ana)["id"] for _ in range(3)]
+    
+    por_virgula = client.get("/tarefas/batch", params={"ids": ",".join(map(str, ids))}, headers=ana.headers).json()
+    repetido = client.get(f"/tarefas/batch?ids={ids[0]}&ids={ids[1]},{ids[2]}", headers=ana.headers).json()
+    por_corpo = client.post("/tarefas/batch", json={"ids": ids}, headers=ana.headers).json()
+    
+    assert por_virgula == repetido == por_corpo
+    assert por_corpo["sucessos"] == 3
+
+@pytest.mark.parametrize("query", ["", "ids=", "ids=x", "ids=1,,2"])
+def test_ids_invalidos(client, criar_usuario, query):
+    ana = criar_usuario()
+    
+    assert client.get(f"/tarefas/batch?{query}", headers=ana.headers).status_code == 422
+
+def test_limite_de_ids(client, criar_usuario):
+    ana = criar_usuario()
+    
+    assert client.post("/tarefas/batch", json={"ids": []}, headers=ana.headers).status_code == 422
+    r = client.post("/tarefas/batch", json={"ids": list(range(1, BULK_TAMANHO_MAXIMO + 2))}, headers=ana.headers)
+    assert r.status_code == 422
+    r = client.post("/tarefas/batch", json={"ids": list(range(1, BULK_TAMANHO_MAXIMO + 1))}, headers=ana.headers)
+    assert r.status_code == 200
+
+def test_batch_nao_e_confundido_com_id(client, criar_usuario):
+    ana = criar_usuario()
+    
+    # A rota /batch é declarada antes de /{id}
+    r = client.get("/tarefas/batch?ids=1", headers=ana.headers)
+    assert r.status_code == 200
+    assert "resultados" in r.json()
+
+def test_batch_exige_autenticacao(client):
+    assert client.get("/tarefas/batch?ids=1").status_code == 401
+    assert client.post("/tarefas/batch", json={"ids": [1]}).status_code == 401
@@ -0,0 +1,35 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from task_manager_api import dependencies
+from task_manager_api.config import METRICAS_ATIVAS
+from task_manager_api.routers.metricas_router import router as metricas_router
+
+@pytest.mark.skipif(METRICAS_ATIVAS, reason="a rota só deixa de existir com a instrumentação desligada")
+def test_metrics_nao_montada_com_a_instrumentacao_desligada(client, criar_usuario):
+    admin = criar_usuario(is_admin=True)
+    
+    assert client.get("/metrics", headers=admin.headers).status_code == 404
+
+@pytest.fixture
+def client_metricas(client):
+    # O app da sessão é importado com a configuração padrão: a rota é
+    # montada em um app próprio (o banco é o mesmo)
+    app = FastAPI()
+    app.include_router(metricas_router)
+    return TestClient(app)
+
+def test_metrics_exige_admin(client_metricas, criar_usuario):
+    admin, ana = criar_usuario(is_admin=True), criar_usuario()
+    
+    assert client_metricas.get("/metrics").status_code == 401
+    assert client_metricas.get("/metrics", headers=ana.headers).status_code == 403
+    r = client_metricas.get("/metrics", headers=admin.headers)
+    assert r.status_code == 200
+    assert "task_manager_respostas_negociadas_hits" in r.text
+
+def test_metrics_aceita_o_token_do_coletor(client_metricas, monkeypatch):
+    monkeypatch.setattr(dependencies, "METRICAS_TOKEN", "token-do-coletor")
+    
+    assert client_metricas.get("/metrics", headers={"Authorization": "Bearer token-do-coletor"}).status_code == 200
+    assert client_metricas.get("/metrics", headers={"Authorization": "Bearer outro"}).status_code == 401
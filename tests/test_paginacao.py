@@ -0,0 +1,105 @@
+import base64
+import json
+import pytest
+from task_manager_api.pagination import OrdemEnum, OrdenarPorEnum, codificar_cursor_alteracoes
+
+# Várias tarefas com a mesma data: o id desempata a ordenação e o cursor
+TAREFAS = [
+    ("2024-01-01T10:00:00", "pendente", "alta"),
+    ("2024-01-01T09:00:00", "concluida", "baixa"),
+    ("2024-01-01T10:00:00", "pendente", "baixa"),
+    ("2024-01-01T10:00:00", "em_progresso", "alta"),
+    ("2024-01-01T08:00:00", "pendente", "alta"),
+    ("2024-01-01T09:00:00", "pendente", "media"),
+    ("2024-01-01T10:00:00", "concluida", "alta"),
+]
+
+@pytest.fixture
+def ana(criar_usuario, criar_tarefa):
+    usuario = criar_usuario()
+    for data_criacao, status, prioridade in TAREFAS:
+        criar_tarefa(usuario, data_criacao=data_criacao, status=status, prioridade=prioridade)
+    return usuario
+
+def _percorrer(client, usuario, **params) -> list[dict]:
+    """Todas as páginas da listagem, seguindo `proximo_cursor`"""
+    
+    itens, cursor = [], None
+    for _ in range(len(TAREFAS) + 1):
+        r = client.get("/tarefas", params={**params, **({"cursor": cursor} if cursor else {})}, headers=usuario.headers)
+        assert r.status_code == 200, r.text
+        pagina = r.json()
+        assert len(pagina["itens"]) <= params.get("limite", len(TAREFAS))
+        itens.extend(pagina["itens"])
+        cursor = pagina["proximo_cursor"]
+        if cursor is None:
+            return itens
+    pytest.fail("a paginação não terminou")
+
+def _esperado(client, usuario, ordenar_por, ordem, filtro=lambda tarefa: True) -> list[int]:
+    r = client.get("/tarefas", params={"limite": 100}, headers=usuario.headers)
+    tarefas = [tarefa for tarefa in r.json()["itens"] if filtro(tarefa)]
+    chave = (lambda t: t["id"]) if ordenar_por == "id" else (lambda t: (t["data_criacao"], t["id"]))
+    return [tarefa["id"] for tarefa in sorted(tarefas, key=chave, reverse=ordem == "desc")]
+
+@pytest.mark.parametrize("ordenar_por", [ordenar_por.value for ordenar_por in OrdenarPorEnum])
+@pytest.mark.parametrize("ordem", [ordem.value for ordem in OrdemEnum])
+@pytest.mark.parametrize("limite", [1, 2, 3])
+def test_paginas_sem_repeticoes_nem_lacunas(client, ana, ordenar_por, ordem, limite):
+    itens = _percorrer(client, ana, limite=limite, ordenar_por=ordenar_por, ordem=ordem)
+    
+    ids = [item["id"] for item in itens]
+    assert ids == _esperado(client, ana, ordenar_por, ordem)
+    assert len(set(ids)) == len(TAREFAS)
+
+@pytest.mark.parametrize("filtros, filtro", [
+    ({"status": "pendente"}, lambda t: t["status"] == "pendente"),
+    ({"prioridade": "alta"}, lambda t: t["prioridade"] == "alta"),
+    ({"status": "pendente", "prioridade": "alta"}, lambda t: (t["status"], t["prioridade"]) == ("pendente", "alta")),
+    ({"criada_apos": "2024-01-01T09:00:00"}, lambda t: t["data_criacao"] >= "2024-01-01T09:00:00"),
+    ({"criada_antes": "2024-01-01T10:00:00"}, lambda t: t["data_criacao"] < "2024-01-01T10:00:00"),
+    (
+        {"criada_apos": "2024-01-01T09:00:00", "criada_antes": "2024-01-01T10:00:00", "status": "pendente"},
+        lambda t: "2024-01-01T09:00:00" <= t["data_criacao"] < "2024-01-01T10:00:00" and t["status"] == "pendente"
+    ),
+])
+@pytest.mark.parametrize("ordenar_por, ordem", [("id", "asc"), ("data_criacao", "desc")])
+def test_filtros_combinados_com_o_cursor(client, ana, filtros, filtro, ordenar_por, ordem):
+    itens = _percorrer(client, ana, limite=1, ordenar_por=ordenar_por, ordem=ordem, **filtros)
+    
+    assert [item["id"] for item in itens] == _esperado(client, ana, ordenar_por, ordem, filtro)
+    assert itens
+
+def _base64(dados) -> str:
+    bruto = dados if isinstance(dados, bytes) else json.dumps(dados).encode()
+    return base64.urlsafe_b64encode(bruto).rstrip(b"=").decode()
+
+@pytest.mark.parametrize("cursor", [
+    "lixo",
+    "%%%",
+    _base64(b"\xff\xfe nao e json"),
+    _base64([1, 2]),
+    _base64({"o": "id", "d": "asc"}),
+    _base64({"o": "id", "d": "asc", "k": []}),
+    _base64({"o": "id", "d": "asc", "k": ["um"]}),
+    _base64({"o": "id", "d": "asc", "k": [1, 2]}),
+    _base64({"o": "id", "d": "asc", "k": None}),
+    # Gerado por outra ordenação
+    _base64({"o": "data_criacao", "d": "asc", "k": ["2024-01-01T10:00:00", 1]}),
+    _base64({"o": "id", "d": "desc", "k": [1]}),
+    # Cursor de GET /tarefas/changes
+    codificar_cursor_alteracoes(1, 1, 0),
+])
+def test_cursor_invalido_responde_400(client, ana, cursor):
+    r = client.get("/tarefas", params={"cursor": cursor, "ordenar_por": "id", "ordem": "asc"}, headers=ana.headers)
+    
+    assert r.status_code == 400, r.text
+    assert r.json()["detail"] == "Cursor inválido."
+
+@pytest.mark.parametrize("chave", [["nao-e-data", 1], ["2024-01-01T10:00:00"], ["2024-01-01T10:00:00", "x"], [1, 2]])
+def test_cursor_adulterado_por_data_responde_400(client, ana, chave):
+    cursor = _base64({"o": "data_criacao", "d": "asc", "k": chave})
+    
+    r = client.get("/tarefas", params={"cursor": cursor, "ordenar_por": "data_criacao", "ordem": "asc"}, headers=ana.headers)
+    
+    assert r.status_code == 400, r.text
@@ -0,0 +1,132 @@
+import pytest
+from sqlmodel import Session, func, select, text
+from task_manager_api.database import engine, engine_leitura
+from task_manager_api.detector_consultas import contar_consultas
+from task_manager_api.models.tarefa import ContadorTarefa, Tarefa, TarefaRemovida
+from task_manager_api.models.usuario import Usuario
+from task_manager_api.repositories import tarefa_repository
+from task_manager_api.services import remocao_usuario_service
+from task_manager_api.services.usuario_service import UsuarioService
+
+def _restantes(usuario_id: int) -> dict:
+    """Linhas que ainda pertencem ao usuário, por tabela"""
+    
+    with Session(engine) as session:
+        return {
+            "usuario": session.get(Usuario, usuario_id) is not None,
+            "tarefa": session.exec(select(func.count()).where(Tarefa.usuario_id == usuario_id)).one(),
+            "contador_tarefa": session.exec(
+                select(func.count()).where(ContadorTarefa.usuario_id == usuario_id)
+            ).one(),
+            "tarefa_removida": session.exec(
+                select(func.count()).where(TarefaRemovida.usuario_id == usuario_id)
+            ).one(),
+        }
+
+def _indexadas(ids: list[int]) -> int:
+    with Session(engine) as session:
+        consulta = text(f"SELECT count(*) FROM tarefa_fts WHERE rowid IN ({','.join(map(str, ids))})")
+        return session.exec(consulta).one()[0]
+
+@pytest.fixture
+def com_tarefas(client, criar_usuario, criar_tarefa, monkeypatch):
+    # Com os contadores, as tarefas também deixam linhas em contador_tarefa
+    monkeypatch.setattr(tarefa_repository, "ESTATISTICAS_CONTADORES", True)
+    
+    def criar(quantidade: int):
+        usuario = criar_usuario()
+        ids = [criar_tarefa(usuario, titulo=f"tarefa {indice}")["id"] for indice in range(quantidade)]
+        # Uma remoção deixa o registro em tarefa_removida
+        assert client.delete(f"/tarefas/{ids.pop()}", headers=usuario.headers).status_code == 200
+        restantes = _restantes(usuario.id)
+        assert restantes["contador_tarefa"] > 0 and restantes["tarefa_removida"] == 1
+        return usuario, ids
+    
+    return criar
+
+def test_remove_usuario_e_tarefas(client, criar_usuario, com_tarefas):
+    admin = criar_usuario(is_admin=True)
+    ana, ids = com_tarefas(4)
+    assert _indexadas(ids) == 3
+    
+    r = client.delete(f"/usuarios/{ana.id}", headers=admin.headers)
+    
+    assert r.status_code == 200, r.text
+    assert _restantes(ana.id) == {"usuario": False, "tarefa": 0, "contador_tarefa": 0, "tarefa_removida": 0}
+    assert _indexadas(ids) == 0
+    assert client.get("/tarefas", headers=ana.headers).status_code == 401
+
+def test_remocao_em_conjunto_nao_depende_da_quantidade_de_tarefas(client, criar_usuario, com_tarefas):
+    admin = criar_usuario(is_admin=True)
+    client.get("/usuarios/me", headers=admin.headers)
+    
+    consultas = []
+    for quantidade in (2, 30):
+        usuario, _ = com_tarefas(quantidade)
+        with contar_consultas(engine, engine_leitura) as relatorio:
+            assert client.delete(f"/usuarios/{usuario.id}", headers=admin.headers).status_code == 200
+        consultas.append(relatorio.total)
+    
+    assert consultas[0] == consultas[1]
+
+def test_remocao_exige_admin_e_usuario_existente(client, criar_usuario, com_tarefas):
+    admin, bia = criar_usuario(is_admin=True), criar_usuario()
+    ana, _ = com_tarefas(2)
+    
+    assert client.delete(f"/usuarios/{ana.id}", headers=bia.headers).status_code == 403
+    assert client.delete("/usuarios/999999", headers=admin.headers).status_code == 404
+    assert _restantes(ana.id)["tarefa"] == 1
+
+def test_remocao_de_usuario_alterado_por_outra_requisicao_responde_409(client, criar_usuario, com_tarefas, monkeypatch):
+    admin = criar_usuario(is_admin=True)
+    ana, ids = com_tarefas(3)
+    antes = _restantes(ana.id)
+    get_usuario_para_remocao = UsuarioService._get_usuario_para_remocao
+    
+    def get_e_alterar(self, usuario_id, usuario_logado):
+        usuario = get_usuario_para_remocao(self, usuario_id, usuario_logado)
+        # Outra requisição altera o usuário entre a leitura e a remoção
+        with Session(engine) as session:
+            alterado = session.get(Usuario, usuario_id)
+            alterado.nome = "Alterado"
+            session.add(alterado)
+            session.commit()
+        return usuario
+    
+    monkeypatch.setattr(UsuarioService, "_get_usuario_para_remocao", get_e_alterar)
+    r = client.delete(f"/usuarios/{ana.id}", headers=admin.headers)
+    
+    assert r.status_code == 409, r.text
+    assert r.json()["detail"] == "O usuário foi alterado por outra requisição"
+    # Uma transação só: as tarefas continuam lá
+    assert _restantes(ana.id) == antes
+    assert _indexadas(ids) == 2
+
+def test_remocao_em_segundo_plano(client, criar_usuario, com_tarefas, monkeypatch):
+    monkeypatch.setattr(remocao_usuario_service, "REMOCAO_USUARIO_TAMANHO_LOTE", 2)
+    monkeypatch.setattr(remocao_usuario_service, "REMOCAO_USUARIO_PAUSA_SEGUNDOS", 0)
+    admin = criar_usuario(is_admin=True)
+    ana, ids = com_tarefas(6)
+    
+    # O TestClient só retorna depois das BackgroundTasks
+    r = client.delete(f"/usuarios/{ana.id}", params={"em_segundo_plano": True}, headers=admin.headers)
+    
+    assert r.status_code == 202, r.text
+    remocao_id = r.json()["remocao_id"]
+    remocao = client.get(f"/usuarios/remocoes/{remocao_id}", headers=admin.headers).json()
+    assert remocao["status"] == "concluida"
+    assert (remocao["usuario_id"], remocao["total_tarefas"], remocao["tarefas_removidas"]) == (ana.id, 5, 5)
+    assert remocao["concluida_em"] is not None and remocao["erro"] is None
+    assert _restantes(ana.id) == {"usuario": False, "tarefa": 0, "contador_tarefa": 0, "tarefa_removida": 0}
+    assert _indexadas(ids) == 0
+
+def test_progresso_da_remocao_exige_admin(client, criar_usuario, com_tarefas):
+    admin, bia = criar_usuario(is_admin=True), criar_usuario()
+    ana, _ = com_tarefas(2)
+    remocao_id = client.delete(
+        f"/usuarios/{ana.id}", params={"em_segundo_plano": True}, headers=admin.headers
+    ).json()["remocao_id"]
+    
+    assert client.get(f"/usuarios/remocoes/{remocao_id}", headers=bia.headers).status_code == 403
+    assert client.get("/usuarios/remocoes/nao-existe", headers=admin.headers).status_code == 404
+    assert client.delete("/usuarios/999999", params={"em_segundo_plano": True}, headers=admin.headers).status_code == 404
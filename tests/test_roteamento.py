@@ -0,0 +1,74 @@
+import time
+from contextlib import contextmanager
+import pytest
+from task_manager_api.database import engine, engine_leitura
+from task_manager_api.detector_consultas import contar_consultas
+from task_manager_api.roteamento_banco import roteador
+
+pytestmark = pytest.mark.skipif(engine_leitura is engine, reason="sem engine de leitura configurado")
+
+@contextmanager
+def _por_engine():
+    with contar_consultas(engine) as escrita, contar_consultas(engine_leitura) as leitura:
+        yield escrita, leitura
+
+@pytest.fixture
+def autenticado(client, criar_usuario):
+    """Usuário sem escritas pela API, com o token já em cache"""
+    
+    def criar():
+        usuario = criar_usuario()
+        assert client.get("/usuarios/me", headers=usuario.headers).status_code == 200
+        return usuario
+    
+    return criar
+
+def test_get_le_do_engine_de_leitura(client, autenticado):
+    ana = autenticado()
+    
+    with _por_engine() as (escrita, leitura):
+        assert client.get("/tarefas", headers=ana.headers).status_code == 200
+    
+    assert (escrita.total, leitura.total > 0) == (0, True)
+
+def test_escrita_vai_ao_engine_de_escrita(client, autenticado):
+    ana = autenticado()
+    
+    with _por_engine() as (escrita, leitura):
+        r = client.post("/tarefas", json={"titulo": "a", "status": "pendente", "prioridade": "baixa"}, headers=ana.headers)
+    
+    assert r.status_code == 201
+    assert (escrita.total > 0, leitura.total) == (True, 0)
+
+def test_cliente_le_as_proprias_escritas_do_engine_de_escrita(client, autenticado, criar_tarefa, monkeypatch):
+    monkeypatch.setattr(roteador, "janela_segundos", 0.3)
+    ana, bia = autenticado(), autenticado()
+    tarefa = criar_tarefa(ana)
+    
+    with _por_engine() as (escrita, leitura):
+        r = client.get("/tarefas", headers=ana.headers)
+    assert (escrita.total > 0, leitura.total) == (True, 0)
+    assert [item["id"] for item in r.json()["itens"]] == [tarefa["id"]]
+    
+    # Outros clientes continuam no engine de leitura
+    with _por_engine() as (escrita, leitura):
+        client.get("/tarefas", headers=bia.headers)
+    assert (escrita.total, leitura.total > 0) == (0, True)
+    
+    # Passada a janela, o cliente volta ao engine de leitura
+    time.sleep(0.35)
+    with _por_engine() as (escrita, leitura):
+        client.get("/tarefas", headers=ana.headers)
+    assert (escrita.total, leitura.total > 0) == (0, True)
+
+@pytest.mark.parametrize("url", ["/tarefas", "/tarefas/search?q=tarefa", "/tarefas/changes"])
+def test_uma_decisao_de_roteamento_por_consulta(client, autenticado, url):
+    ana = autenticado()
+    antes = roteador.estatisticas()
+    
+    with _por_engine() as (escrita, leitura):
+        assert client.get(url, headers=ana.headers).status_code == 200
+    
+    depois = roteador.estatisticas()
+    assert depois["roteadas_leitura"] - antes["roteadas_leitura"] == leitura.total
+    assert depois["roteadas_escrita"] - antes["roteadas_escrita"] == escrita.total
@@ -0,0 +1,64 @@
+from datetime import datetime
+import pytest
+from sqlmodel import Session
+from task_manager_api import serializacao
+from task_manager_api.database import engine
+from task_manager_api.models.usuario import Usuario
+
+# A serialização rápida só vale para o JSON sem compressão (o caminho padrão)
+SEM_COMPRESSAO = {"Accept-Encoding": "identity"}
+
+@pytest.fixture
+def dados(client, criar_usuario, criar_tarefa):
+    admin, ana = criar_usuario(is_admin=True), criar_usuario()
+    with Session(engine) as session:
+        usuario = session.get(Usuario, ana.id)
+        usuario.nome = "Ana Conceição 😀 \"aspas\" \\ </script>"
+        usuario.data_criacao = datetime(2024, 2, 29, 23, 59, 59, 123456)
+        session.add(usuario)
+        session.commit()
+    criar_tarefa(ana, titulo="Reunião às 9h — ação", descricao=None, data_criacao="2024-03-01T08:00:00.000001")
+    criar_tarefa(ana, titulo="Tarefa", descricao="Linha 1\nLinha 2\t ", data_criacao="2024-03-01T08:00:00.999999")
+    criar_tarefa(ana, titulo="Sem microssegundos", data_criacao="2024-03-01T08:00:00")
+    return admin, ana
+
+def _corpo(client, monkeypatch, rapida: bool, url: str, headers: dict, **params):
+    monkeypatch.setattr(serializacao, "SERIALIZACAO_RAPIDA", rapida)
+    r = client.get(url, params=params, headers={**headers, **SEM_COMPRESSAO})
+    assert r.status_code == 200, r.text
+    return r.headers["content-type"], r.content
+
+@pytest.mark.parametrize("url, params", [
+    ("/tarefas", {"limite": 2, "ordenar_por": "id", "ordem": "asc"}),
+    ("/tarefas/changes", {"desde": 0}),
+    ("/tarefas/search", {"q": "reunião"}),
+])
+def test_tarefas_identicas_ao_caminho_padrao(client, dados, monkeypatch, url, params):
+    _, ana = dados
+    
+    padrao = _corpo(client, monkeypatch, False, url, ana.headers, **params)
+    rapida = _corpo(client, monkeypatch, True, url, ana.headers, **params)
+    
+    assert rapida == padrao
+    assert "Reunião às 9h — ação".encode() in padrao[1]
+
+def test_tarefas_por_usuario_identicas_ao_caminho_padrao(client, dados, monkeypatch):
+    admin, ana = dados
+    url = f"/tarefas/usuarios/{ana.id}"
+    
+    padrao = _corpo(client, monkeypatch, False, url, admin.headers)
+    rapida = _corpo(client, monkeypatch, True, url, admin.headers)
+    
+    assert rapida == padrao
+    assert b'"descricao":null' in padrao[1]
+    assert b'"2024-03-01T08:00:00.000001"' in padrao[1]
+
+def test_usuarios_identicos_ao_caminho_padrao(client, dados, monkeypatch):
+    admin, ana = dados
+    
+    padrao = _corpo(client, monkeypatch, False, "/usuarios", admin.headers)
+    rapida = _corpo(client, monkeypatch, True, "/usuarios", admin.headers)
+    
+    assert rapida == padrao
+    assert "Ana Conceição 😀".encode() in padrao[1]
+    assert b'"2024-02-29T23:59:59.123456"' in padrao[1]
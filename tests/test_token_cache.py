@@ -0,0 +1,95 @@
+from datetime import datetime
+from sqlmodel import Session
+from task_manager_api.cache import TokenCache, token_cache
+from task_manager_api.database import engine
+from task_manager_api.models.usuario import UsuarioAutenticado
+from task_manager_api.repositories.usuario_repository import UsuarioRepository
+from task_manager_api.services.auth_service import AuthService
+from task_manager_api.services.token_service import criar_access_token
+from task_manager_api.services.usuario_service import UsuarioService
+
+def _token(usuario) -> str:
+    return usuario.headers["Authorization"].removeprefix("Bearer ")
+
+def _rebaixar(usuario_id: int) -> None:
+    """Tira o admin do usuário pelo caminho de escrita do service."""
+    
+    with Session(engine) as session:
+        usuario_repository = UsuarioRepository(session)
+        usuario = usuario_repository.get_usuario_por_id(usuario_id)
+        usuario.is_admin = False
+        UsuarioService(usuario_repository)._salvar_usuario(usuario)
+
+def test_admin_rebaixado_perde_acesso_com_o_token_em_cache(client, criar_usuario):
+    admin, ana = criar_usuario(is_admin=True), criar_usuario()
+    assert client.get(f"/usuarios/{ana.id}", headers=admin.headers).status_code == 200
+    assert token_cache.get(_token(admin)).usuario.is_admin
+    
+    _rebaixar(admin.id)
+    
+    assert token_cache.get(_token(admin)) is None
+    assert client.get(f"/usuarios/{ana.id}", headers=admin.headers).status_code == 403
+
+def test_usuario_removido_perde_acesso_com_o_token_em_cache(client, criar_usuario):
+    admin, ana = criar_usuario(is_admin=True), criar_usuario()
+    assert client.get("/usuarios/me", headers=ana.headers).status_code == 200
+    assert token_cache.get(_token(ana)) is not None
+    
+    assert client.delete(f"/usuarios/{ana.id}", headers=admin.headers).status_code == 200
+    
+    assert token_cache.get(_token(ana)) is None
+    assert client.get("/usuarios/me", headers=ana.headers).status_code == 401
+
+def test_alteracao_de_senha_invalida_o_token_em_cache(client, criar_usuario):
+    ana = criar_usuario()
+    etag = client.get("/usuarios/me", headers=ana.headers).headers["etag"]
+    assert token_cache.get(_token(ana)) is not None
+    
+    reset = criar_access_token({"sub": ana.username}, scope="pwd_reset")
+    r = client.patch(
+        f"/usuarios/{ana.username}/senha",
+        params={"pwd_reset_token": reset},
+        json={"senha": "nova-senha", "confirmar_senha": "nova-senha"}
+    )
+    assert r.status_code == 200, r.text
+    
+    assert token_cache.get(_token(ana)) is None
+    # O próximo request busca o usuário de novo: a versão (e o ETag) mudou
+    assert client.get("/usuarios/me", headers=ana.headers).headers["etag"] != etag
+
+def test_busca_concorrente_com_invalidacao_nao_guarda_snapshot_antigo(client, criar_usuario, monkeypatch):
+    admin, ana = criar_usuario(is_admin=True), criar_usuario()
+    buscar = AuthService._buscar_usuario_autenticado
+    
+    def buscar_e_rebaixar(self, username: str):
+        snapshot = buscar(self, username)
+        # Escrita confirmada depois da leitura, antes de o snapshot ir ao cache
+        _rebaixar(admin.id)
+        return snapshot
+    
+    monkeypatch.setattr(AuthService, "_buscar_usuario_autenticado", buscar_e_rebaixar)
+    assert client.get(f"/usuarios/{ana.id}", headers=admin.headers).status_code == 200
+    monkeypatch.undo()
+    
+    assert token_cache.get(_token(admin)) is None
+    assert client.get(f"/usuarios/{ana.id}", headers=admin.headers).status_code == 403
+
+def test_cache_descarta_escrita_de_geracao_anterior():
+    cache = TokenCache(tamanho_maximo=10, ttl_segundos=60)
+    usuario = UsuarioAutenticado(
+        id=1,
+        username="ana",
+        nome="Ana",
+        email="ana@example.com",
+        is_admin=False,
+        data_criacao=datetime(2024, 1, 1),
+        versao=1
+    )
+    
+    geracao = cache.geracao
+    cache.invalidar_usuario(2)
+    cache.set("token", {"sub": "ana"}, usuario, geracao)
+    assert cache.get("token") is None
+    
+    cache.set("token", {"sub": "ana"}, usuario, cache.geracao)
+    assert cache.get("token").usuario == usuario